@@ -2,7 +2,14 @@ from flask import Flask
 from flask_restx import Api
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from app.extensions import db
+from sqlalchemy.orm import configure_mappers
+from app.database import init_db
+from app.extensions import password_hasher
+from app.metrics import request_metrics
+from app.nplusone import query_detector
+from app.revocation import revocation_list
+from app.services.amenity_index import amenity_index
+from app.services.cache import response_cache
 from app.api.v1.amenities import api as amenities_ns
 from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
@@ -22,11 +29,25 @@ def create_app(config_class="config.DevelopmentConfig"):
              "supports_credentials": True
          }})
     
-    # Initialize database
-    db.init_app(app)
+    # Initialize database (pool options, SQLite pragmas, checkout timing)
+    init_db(app)
+    
+    # bcrypt runs on its own bounded pool, off the request threads
+    password_hasher.init_app(app)
+    
+    # Cache for public read endpoints, invalidated by the facade's writes
+    response_cache.init_app(app)
+
+    # Bitmap index for the ?amenities= place filter, built on first use
+    amenity_index.init_app(app)
     
     # Initialize JWT
     jwt = JWTManager(app)
+    revocation_list.init_app(app)
+
+    @jwt.token_in_blocklist_loader
+    def is_token_revoked(jwt_header, jwt_payload):
+        return revocation_list.is_revoked(jwt_payload['jti'])
     
     api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API', doc='/api/v1/')
 
@@ -36,4 +57,14 @@ def create_app(config_class="config.DevelopmentConfig"):
     api.add_namespace(reviews_ns, path='/api/v1/reviews')
     api.add_namespace(amenities_ns, path='/api/v1/amenities')
 
+    # Backrefs such as Place.owner only exist once the mappers are
+    # configured; loader options reference them before the first query
+    configure_mappers()
+
+    # Per-route latency and SQL counters, exposed at /metrics
+    request_metrics.init_app(app)
+
+    # Opt-in N+1 query detection (log in development, raise in tests)
+    query_detector.init_app(app)
+
     return app
\ No newline at end of file
@@ -9,6 +9,7 @@ business logic and data access.
 Routes:
     - /amenities/         [GET, POST]: List all amenities or create a
     new one.
+    - /amenities/bulk     [POST]     : Create an array of amenities.
     - /amenities/<id>     [GET, PUT] : Get or update a specific amenity
     by ID.
 
@@ -36,6 +37,8 @@ from flask import request
 from flask_restx import Namespace
 from flask_restx import Resource
 from flask_restx import fields
+from app.api.v1.caching import cached
+from app.api.v1.conditional import conditional, not_modified, validators
 from app.services import facade
 
 api = Namespace('amenities', description='Amenity operations')
@@ -81,6 +84,7 @@ class AmenityList(Resource):
             return {'error': 'Invalid input: please check your data.'}, 400
 
     @api.response(200, 'List of amenities retrieved successfully')
+    @cached('amenities')
     def get(self):
         """
         Retrieve all amenities.
@@ -94,6 +98,37 @@ class AmenityList(Resource):
         return result, 200
 
 
+@api.route('/bulk')
+class AmenityBulk(Resource):
+    """
+    Resource for creating many amenities in one request.
+
+    Methods:
+        - POST: Create an array of amenities in one transaction.
+    """
+    @api.expect([amenity_model])
+    @api.response(201, 'Amenities successfully created')
+    @api.response(400, 'Invalid input data, with per-item errors')
+    def post(self):
+        """
+        Create an array of amenities.
+
+        Nothing is inserted unless every item is valid and every name is
+        new.
+
+        Returns:
+            Tuple (dict, int): Created count and ids with status 201, or
+            per-item errors with status 400.
+        """
+        try:
+            ids, errors = facade.create_amenities_bulk(api.payload)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if errors:
+            return {'errors': errors}, 400
+        return {'created': len(ids), 'ids': ids}, 201
+
+
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
     """
@@ -104,6 +139,7 @@ class AmenityResource(Resource):
         - PUT: Update an existing amenity's information.
     """
     @api.response(200, 'Amenity details retrieved successfully')
+    @api.response(304, 'Not modified since the cached copy')
     @api.response(404, 'Amenity not found')
     def get(self, amenity_id):
         """
@@ -114,12 +150,17 @@ class AmenityResource(Resource):
 
         Returns:
             Tuple (dict, int): Amenity data and status code 200, or error
-            message with status 404.
+            message with status 404. A 304 is returned when the client's
+            If-None-Match / If-Modified-Since still matches.
         """
         amenity = facade.get_amenity(amenity_id)
         if amenity is None:
             return {'message': 'Amenty not found'}, 404
-        return amenity.to_dict(), 200
+        etag, last_modified = validators(amenity_id, amenity.updated_at)
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
+        return conditional(amenity.to_dict(), etag, last_modified)
 
     @api.expect(amenity_model)
     @api.response(200, 'Amenity updated successfully')
@@ -0,0 +1,137 @@
+"""
+async_reads.py - Coroutine versions of the public GET endpoints of the
+places, reviews and amenities namespaces, served by app/asgi.py.
+
+They run inside a Flask request context built from the ASGI request, so
+query-string parsing, conditional GETs and error bodies are those of the
+Flask-RESTX resources; only the facade calls are awaited. Streamed lists
+are left to the Flask resources.
+"""
+from werkzeug.routing import Map, Rule
+
+from app.api.v1.conditional import conditional, not_modified, validators
+from app.api.v1.pagination import is_paginated, page_args, page_response
+from app.api.v1.places import fields_arg, filter_args
+
+
+async def place_list(facade):
+    try:
+        fields = fields_arg()
+        filters = filter_args()
+        if is_paginated():
+            limit, cursor = page_args()
+            places, next_cursor = await facade.get_places_page(
+                limit, cursor, fields=fields, **filters
+            )
+        else:
+            places = await facade.get_all_places(fields, **filters)
+            next_cursor = None
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+    result = [place.to_dict(fields) for place in places]
+    if is_paginated():
+        return page_response(result, next_cursor), 200
+    return result, 200
+
+
+async def place_detail(facade, place_id):
+    version = await facade.get_place_version(place_id)
+    if version is None:
+        return {'message': 'Place not found'}, 404
+    etag, last_modified = validators(place_id, *version)
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
+
+    place = await facade.get_place(place_id)
+    if place is None:
+        return {'message': 'Place not found'}, 404
+    return conditional(place.to_dict(), etag, last_modified)
+
+
+async def place_reviews(facade, place_id):
+    if not await facade.place_exists(place_id):
+        return {'error': 'Place not found'}, 404
+
+    if is_paginated():
+        try:
+            limit, cursor = page_args()
+            reviews, next_cursor = await facade.get_reviews_by_place_page(
+                place_id, limit, cursor
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return page_response(
+            [review.to_dict() for review in reviews], next_cursor
+        ), 200
+
+    reviews = await facade.get_reviews_by_place(place_id)
+    return [review.to_dict() for review in reviews], 200
+
+
+async def review_list(facade):
+    if is_paginated():
+        try:
+            limit, cursor = page_args()
+            reviews, next_cursor = await facade.get_reviews_page(limit,
+                                                                 cursor)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return page_response(
+            [review.to_dict() for review in reviews], next_cursor
+        ), 200
+
+    reviews = await facade.get_all_reviews()
+    return [review.to_dict() for review in reviews], 200
+
+
+async def review_detail(facade, review_id):
+    version = await facade.get_review_version(review_id)
+    if version is None:
+        return {'error': 'Review not found'}, 404
+    etag, last_modified = validators(review_id, *version)
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
+
+    review = await facade.get_review(review_id)
+    if not review:
+        return {'error': 'Review not found'}, 404
+    return conditional(review.to_dict(), etag, last_modified)
+
+
+async def amenity_list(facade):
+    amenities = await facade.get_all_amenities()
+    return [amenity.to_dict() for amenity in amenities], 200
+
+
+async def amenity_detail(facade, amenity_id):
+    amenity = await facade.get_amenity(amenity_id)
+    if amenity is None:
+        return {'message': 'Amenty not found'}, 404
+    etag, last_modified = validators(amenity_id, amenity.updated_at)
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
+    return conditional(amenity.to_dict(), etag, last_modified)
+
+
+# Paths answered by the coroutines above. A ``None`` endpoint marks
+# static paths that would otherwise match a converter (e.g. /places/nearby
+# as a place id) and belong to the Flask app.
+routes = Map([
+    Rule('/api/v1/places/', endpoint=place_list),
+    Rule('/api/v1/places/nearby', endpoint=None),
+    Rule('/api/v1/places/bulk', endpoint=None),
+    Rule('/api/v1/places/search', endpoint=None),
+    Rule('/api/v1/places/<place_id>', endpoint=place_detail),
+    Rule('/api/v1/places/<place_id>/', endpoint=place_detail),
+    Rule('/api/v1/places/<place_id>/reviews', endpoint=place_reviews),
+    Rule('/api/v1/reviews/', endpoint=review_list),
+    Rule('/api/v1/reviews/bulk', endpoint=None),
+    Rule('/api/v1/reviews/<review_id>', endpoint=review_detail),
+    Rule('/api/v1/amenities/', endpoint=amenity_list),
+    Rule('/api/v1/amenities/bulk', endpoint=None),
+    Rule('/api/v1/amenities/<amenity_id>', endpoint=amenity_detail),
+])
@@ -2,8 +2,12 @@
 Authentication endpoints for user login
 """
 
+from datetime import datetime, timezone
+
 from flask_restx import Namespace, Resource, fields
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import create_access_token, get_jwt, jwt_required
+from app.hashing import PasswordHasherBusy
+from app.revocation import revocation_list
 from app.services import facade
 
 api = Namespace('auth', description='Authentication operations')
@@ -22,6 +26,7 @@ class Login(Resource):
     @api.expect(login_model)
     @api.response(200, 'Login successful')
     @api.response(401, 'Invalid credentials')
+    @api.response(503, 'Too many concurrent logins, retry later')
     def post(self):
         """Authenticate user and return JWT token
         
@@ -38,22 +43,19 @@ class Login(Resource):
         email = credentials['email']
         password = credentials['password']
         
-        # Debug logging
-        print(f"🔍 Login attempt: email='{email}', password='{password}'")
-        
         # Get user by email
         user = facade.get_user_by_email(email)
-        
-        print(f"🔍 User found: {user is not None}")
-        if user:
-            print(f"🔍 User email: '{user.email}'")
-            print(f"🔍 Password verification: {user.verify_password(password)}")
-        
         if not user:
             return {'error': 'Invalid credentials'}, 401
         
-        # Verify password
-        if not user.verify_password(password):
+        # Verify password (on the bcrypt pool)
+        try:
+            valid = user.verify_password(password)
+        except PasswordHasherBusy:
+            return {'error': 'Server busy, please retry'}, 503, {
+                'Retry-After': '1'
+            }
+        if not valid:
             return {'error': 'Invalid credentials'}, 401
         
         # Create JWT token with user claims
@@ -67,4 +69,25 @@ class Login(Resource):
         
         return {
             'access_token': access_token
-        }, 200
\ No newline at end of file
+        }, 200
+
+
+@api.route('/logout')
+class Logout(Resource):
+    """Revoke the JWT used for this request"""
+
+    @jwt_required()
+    @api.response(200, 'Logout successful')
+    @api.response(401, 'Missing or revoked token')
+    def post(self):
+        """Revoke the current access token
+
+        The token's jti is stored until the token would have expired, so it
+        is rejected from now on even if a copy leaked.
+        """
+        claims = get_jwt()
+        expires_at = datetime.fromtimestamp(
+            claims['exp'], tz=timezone.utc
+        ).replace(tzinfo=None)
+        revocation_list.revoke(claims['jti'], expires_at)
+        return {'message': 'Logout successful'}, 200
@@ -0,0 +1,61 @@
+"""
+caching.py - Response caching for public read endpoints.
+"""
+from functools import wraps
+
+from flask import Response, make_response, request
+
+from app.api.v1.streaming import is_streaming
+from app.database import replica_router
+from app.extensions import db
+from app.services.cache import response_cache
+from app.session import REPLICA_KEY
+
+# Headers replayed from a cached response
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def cached(*tags):
+    """Serve a GET from the response cache, filling it on a miss.
+
+    ``tags`` may use the view's URL arguments, e.g. ``'place:{place_id}'``.
+    Only 200 responses are stored; a cached ETag/Last-Modified still lets
+    the client get a 304 without touching the database. Streamed
+    responses bypass the cache.
+
+    With read replicas, a client inside its read-your-writes window skips
+    the cache, and a response read from a replica is not stored: it may
+    predate a write whose invalidation already ran.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not response_cache.enabled or is_streaming():
+                return fn(*args, **kwargs)
+            if replica_router.replicas and replica_router.recently_wrote():
+                return fn(*args, **kwargs)
+
+            key = request.full_path
+            entry = response_cache.get(key)
+            if entry is not None:
+                body, headers = entry
+                response = Response(body, 200, headers=headers)
+                response.headers['X-Cache'] = 'HIT'
+                return response.make_conditional(request)
+
+            generation = response_cache.generation
+            result = fn(*args, **kwargs)
+            response = make_response(result)
+            if (response.status_code == 200
+                    and REPLICA_KEY not in db.session.info):
+                headers = [(name, response.headers[name])
+                           for name in CACHED_HEADERS
+                           if name in response.headers]
+                response_cache.set(
+                    key, (response.get_data(), headers),
+                    [tag.format(**kwargs) for tag in tags], generation
+                )
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,56 @@
+"""
+conditional.py - ETag / Last-Modified helpers for conditional GETs.
+
+Resources compute a cheap version (timestamps and counts) before loading
+anything else; when the client already holds that version the request is
+answered with 304 and the object graph is never serialized.
+"""
+import hashlib
+from datetime import datetime, timezone
+
+from flask import make_response, request
+
+
+def validators(*parts):
+    """Build (etag, last_modified) from version parts.
+
+    The ETag is a hash of every part; Last-Modified is the newest datetime
+    among them (None when there is none).
+    """
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    stamps = [p for p in parts if isinstance(p, datetime)]
+    last_modified = max(stamps).replace(tzinfo=timezone.utc) if stamps else None
+    return digest, last_modified
+
+
+def not_modified(etag, last_modified):
+    """Return a 304 response if the request's validators still match.
+
+    If-None-Match wins over If-Modified-Since, as RFC 9110 requires.
+    """
+    if request.if_none_match:
+        matched = request.if_none_match.contains(etag)
+    elif request.if_modified_since and last_modified is not None:
+        # HTTP dates have one-second resolution
+        matched = (last_modified.replace(microsecond=0)
+                   <= request.if_modified_since)
+    else:
+        matched = False
+    if not matched:
+        return None
+    response = make_response('', 304)
+    return with_validators(response, etag, last_modified)
+
+
+def with_validators(response, etag, last_modified):
+    """Attach ETag and Last-Modified headers to a response"""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+
+def conditional(data, etag, last_modified, status=200):
+    """Wrap serialized data in a JSON response carrying validators"""
+    response = make_response(data, status)
+    return with_validators(response, etag, last_modified)
@@ -0,0 +1,32 @@
+"""
+pagination.py - Helpers shared by the collection endpoints for keyset paging.
+"""
+from flask import request
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def is_paginated():
+    """Return True when the client asked for a page instead of the full list."""
+    return 'limit' in request.args or 'cursor' in request.args
+
+
+def page_args():
+    """Read ``limit`` and ``cursor`` from the query string.
+
+    Raises:
+        ValueError: If ``limit`` is not a positive integer.
+    """
+    try:
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, MAX_LIMIT), request.args.get('cursor') or None
+
+
+def page_response(items, next_cursor):
+    """Build the envelope returned for a paginated collection."""
+    return {'items': items, 'next_cursor': next_cursor}
@@ -1,12 +1,25 @@
 """
 places.py - API namespace for managing Place resources in the HBnB application.
 """
+import math
+
 from app.services import facade
+from app.api.v1.caching import cached
+from app.api.v1.conditional import conditional, not_modified, validators
+from app.api.v1.pagination import (
+    DEFAULT_LIMIT, is_paginated, page_args, page_response
+)
+from app.api.v1.streaming import is_streaming, stream_response
+from app.repositories.search_repository import SearchIndexMissing
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 api = Namespace('places', description='Place operations')
 
+# Largest number of ids accepted by ?amenities=
+MAX_AMENITY_FILTERS = 20
+
 # Define the models for related entities
 amenity_model = api.model('PlaceAmenity', {
     'id': fields.String(description='Amenity ID'),
@@ -72,33 +85,268 @@ class PlaceList(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
+    @api.doc(params={
+        'limit': 'Page size; enables cursor pagination',
+        'cursor': 'next_cursor returned by the previous page',
+        'fields': 'Comma-separated columns/relationships to return, '
+                  'e.g. id,title,price',
+        'min_price': 'Only places priced at or above this value',
+        'max_price': 'Only places priced at or below this value',
+        'bbox': 'Bounding box min_lon,min_lat,max_lon,max_lat',
+        'amenities': 'Comma-separated amenity ids the places must all have',
+        'stream': '1 to stream the list; Accept: application/x-ndjson '
+                  'streams NDJSON'
+    })
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid query parameters')
+    @cached('places')
     def get(self):
         """Retrieve a list of all places
         
         Public endpoint - no authentication required.
+        With limit/cursor, returns {"items": [...], "next_cursor": ...}.
+        With fields, only those columns are selected and serialized.
+        min_price/max_price and bbox filter in the database; amenities
+        keeps the places that have every listed amenity.
+        Without limit/cursor, ?stream=1 or Accept: application/x-ndjson
+        streams the list in batches instead of building it in memory.
         """
-        places = facade.get_all_places()
-        result = [place.to_dict() for place in places]
+        try:
+            fields = fields_arg()
+            filters = filter_args()
+            if not is_paginated() and is_streaming():
+                places = facade.stream_places(fields, **filters)
+                return stream_response(
+                    places, lambda place: place.to_dict(fields))
+            if is_paginated():
+                limit, cursor = page_args()
+                places, next_cursor = facade.get_places_page(
+                    limit, cursor, fields=fields, **filters
+                )
+            else:
+                places = facade.get_all_places(fields, **filters)
+                next_cursor = None
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        result = [place.to_dict(fields) for place in places]
+        if is_paginated():
+            return page_response(result, next_cursor), 200
         return result, 200
 
 
+@api.route('/bulk')
+class PlaceBulk(Resource):
+    """Resource class for creating many places in one request."""
+
+    @jwt_required()
+    @api.expect([place_model])
+    @api.response(201, 'Places successfully created')
+    @api.response(400, 'Invalid input data, with per-item errors')
+    def post(self):
+        """Create an array of places in one transaction
+
+        Requires JWT token. Every place is owned by the current user.
+        Nothing is inserted unless every item is valid.
+        """
+        try:
+            ids, errors = facade.create_places_bulk(
+                api.payload, get_jwt_identity()
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if errors:
+            return {'errors': errors}, 400
+        return {'created': len(ids), 'ids': ids}, 201
+
+
+def fields_arg():
+    """Parse ?fields=a,b,c into a list, or None when absent"""
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return fields
+
+
+def float_arg(name, required=False):
+    """Parse a numeric query parameter, or None when absent"""
+    raw = request.args.get(name)
+    if raw is None or raw == '':
+        if required:
+            raise ValueError(f'{name} is required')
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValueError(f'{name} must be a number')
+    if not math.isfinite(value):
+        raise ValueError(f'{name} must be a number')
+    return value
+
+
+def filter_args():
+    """Parse ?min_price=, ?max_price=, ?bbox= and ?amenities= into facade
+    filter kwargs"""
+    filters = {}
+    for name in ('min_price', 'max_price'):
+        value = float_arg(name)
+        if value is not None:
+            if value < 0:
+                raise ValueError(f'{name} cannot be negative')
+            filters[name] = value
+    if ('min_price' in filters and 'max_price' in filters
+            and filters['min_price'] > filters['max_price']):
+        raise ValueError('min_price cannot be greater than max_price')
+
+    raw_bbox = request.args.get('bbox')
+    if raw_bbox:
+        try:
+            min_lon, min_lat, max_lon, max_lat = (
+                float(v) for v in raw_bbox.split(',')
+            )
+        except ValueError:
+            raise ValueError('bbox must be min_lon,min_lat,max_lon,max_lat')
+        if not (-90 <= min_lat <= max_lat <= 90
+                and -180 <= min_lon <= max_lon <= 180):
+            raise ValueError('bbox is out of range')
+        filters['bbox'] = (min_lat, min_lon, max_lat, max_lon)
+
+    raw_amenities = request.args.get('amenities')
+    if raw_amenities is not None:
+        amenities = list(dict.fromkeys(
+            a.strip() for a in raw_amenities.split(',') if a.strip()
+        ))
+        if not amenities:
+            raise ValueError('amenities must list amenity ids')
+        if len(amenities) > MAX_AMENITY_FILTERS:
+            raise ValueError(
+                f'At most {MAX_AMENITY_FILTERS} amenities can be combined')
+        filters['amenities'] = amenities
+    return filters
+
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    """Resource class for searching places around a point."""
+
+    @api.doc(params={
+        'lat': 'Latitude of the center',
+        'lon': 'Longitude of the center',
+        'radius_km': 'Search radius in kilometers',
+        'limit': f'Maximum number of places (default {DEFAULT_LIMIT})',
+        'fields': 'Comma-separated columns/relationships to return'
+    })
+    @api.response(200, 'Places within the radius, nearest first')
+    @api.response(400, 'Invalid query parameters')
+    def get(self):
+        """Find places within radius_km of (lat, lon)
+
+        Public endpoint - no authentication required.
+        Each place carries a distance_km field.
+        """
+        try:
+            lat = float_arg('lat', required=True)
+            lon = float_arg('lon', required=True)
+            radius_km = float_arg('radius_km', required=True)
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                raise ValueError('lat/lon is out of range')
+            if radius_km <= 0:
+                raise ValueError('radius_km must be positive')
+            limit, _ = page_args()
+            fields = fields_arg()
+            matches = facade.get_places_nearby(
+                lat, lon, radius_km, limit, fields=fields
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        result = []
+        for place, distance in matches:
+            data = place.to_dict(fields)
+            data['distance_km'] = round(distance, 3)
+            result.append(data)
+        return result, 200
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    """Resource class for full-text search over places."""
+
+    @api.doc(params={
+        'q': 'Words to find in the title or description; the last word '
+             'may be a prefix',
+        'reviews': '1 to also match the texts of the places\' reviews',
+        'limit': f'Page size (default {DEFAULT_LIMIT})',
+        'cursor': 'next_cursor returned by the previous page',
+        'fields': 'Comma-separated columns/relationships to return'
+    })
+    @api.response(200, 'Matching places, most relevant first')
+    @api.response(400, 'Invalid query parameters')
+    @api.response(501, 'Full-text search is not available on this database')
+    @api.response(503, 'The search index has not been built yet')
+    @cached('places')
+    def get(self):
+        """Search places by keywords
+
+        Public endpoint - no authentication required.
+        Returns {"items": [...], "next_cursor": ...}; each place carries
+        its BM25 relevance as score.
+        """
+        reviews = request.args.get('reviews', '').lower() in ('1', 'true',
+                                                              'yes')
+        try:
+            limit, cursor = page_args()
+            fields = fields_arg()
+            matches, next_cursor = facade.search_places(
+                request.args.get('q', ''), limit, cursor, reviews=reviews,
+                fields=fields
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        except NotImplementedError as e:
+            return {'error': str(e)}, 501
+        except SearchIndexMissing as e:
+            return {'error': f'{e}; run reindex_search.py'}, 503
+
+        result = []
+        for place, score in matches:
+            data = place.to_dict(fields)
+            data['score'] = score
+            result.append(data)
+        return page_response(result, next_cursor), 200
+
+
 @api.route('/<place_id>/')
 @api.route('/<place_id>')
 class PlaceResource(Resource):
     """Resource class for handling a single place by ID."""
     
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(304, 'Not modified since the cached copy')
     @api.response(404, 'Place not found')
+    @cached('place:{place_id}')
     def get(self, place_id):
         """Get place details by ID
         
         Public endpoint - no authentication required.
+        Supports If-None-Match / If-Modified-Since; the version check is a
+        single query and the graph is only loaded when it changed.
         """
+        version = facade.get_place_version(place_id)
+        if version is None:
+            return {'message': 'Place not found'}, 404
+        etag, last_modified = validators(place_id, *version)
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
+
         place = facade.get_place(place_id)
         if place is None:
             return {'message': 'Place not found'}, 404
-        return place.to_dict(), 200
+        return conditional(place.to_dict(), etag, last_modified)
 
     @jwt_required()
     @api.expect(place_model)
@@ -165,16 +413,33 @@ class PlaceResource(Resource):
 class PlaceReviewList(Resource):
     """Resource class for handling reviews of a specific place."""
     
+    @api.doc(params={
+        'limit': 'Page size; enables cursor pagination',
+        'cursor': 'next_cursor returned by the previous page'
+    })
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get all reviews for a specific place
         
         Public endpoint - no authentication required.
+        With limit/cursor, returns {"items": [...], "next_cursor": ...}.
         """
-        place = facade.get_place(place_id)
-        if not place:
+        if not facade.place_exists(place_id):
             return {'error': 'Place not found'}, 404
-        
+
+        if is_paginated():
+            try:
+                limit, cursor = page_args()
+                reviews, next_cursor = facade.get_reviews_by_place_page(
+                    place_id, limit, cursor
+                )
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            return page_response(
+                [review.to_dict() for review in reviews], next_cursor
+            ), 200
+
         reviews = facade.get_reviews_by_place(place_id)
         return [review.to_dict() for review in reviews], 200
\ No newline at end of file
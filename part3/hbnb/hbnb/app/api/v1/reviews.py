@@ -2,6 +2,10 @@
 Module reviews.py - RESTful API endpoints for reviews
 """
 from app.services import facade
+from app.api.v1.caching import cached
+from app.api.v1.conditional import conditional, not_modified, validators
+from app.api.v1.pagination import is_paginated, page_args, page_response
+from app.api.v1.streaming import is_streaming, stream_response
 from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
@@ -42,8 +46,7 @@ class ReviewList(Resource):
             return {'error': 'place_id is required'}, 400
         
         # Check if place exists
-        place = facade.get_place(place_id)
-        if not place:
+        if not facade.place_exists(place_id):
             return {'error': 'Place not found'}, 404
         
         # Allow users to review any place including their own
@@ -62,31 +65,91 @@ class ReviewList(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
+    @api.doc(params={
+        'limit': 'Page size; enables cursor pagination',
+        'cursor': 'next_cursor returned by the previous page',
+        'stream': '1 to stream the list; Accept: application/x-ndjson '
+                  'streams NDJSON'
+    })
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
+    @cached('reviews')
     def get(self):
         """Retrieve all reviews
         
         Public endpoint - no authentication required.
+        With limit/cursor, returns {"items": [...], "next_cursor": ...}.
+        Otherwise ?stream=1 or Accept: application/x-ndjson streams the
+        list in batches.
         """
+        if is_paginated():
+            try:
+                limit, cursor = page_args()
+                reviews, next_cursor = facade.get_reviews_page(limit, cursor)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            return page_response(
+                [review.to_dict() for review in reviews], next_cursor
+            ), 200
+
+        if is_streaming():
+            return stream_response(facade.stream_reviews(),
+                                   lambda review: review.to_dict())
+
         reviews = facade.get_all_reviews()
         return [review.to_dict() for review in reviews], 200
 
 
+@api.route('/bulk')
+class ReviewBulk(Resource):
+    """Handles creating many reviews in one request."""
+
+    @jwt_required()
+    @api.expect([review_model])
+    @api.response(201, 'Reviews successfully created')
+    @api.response(400, 'Invalid input data, with per-item errors')
+    def post(self):
+        """Create an array of reviews in one transaction
+
+        Requires JWT token. Every review is written by the current user.
+        Nothing is inserted unless every item is valid.
+        """
+        try:
+            ids, errors = facade.create_reviews_bulk(
+                api.payload, get_jwt_identity()
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if errors:
+            return {'errors': errors}, 400
+        return {'created': len(ids), 'ids': ids}, 201
+
+
 @api.route('/<review_id>')
 class ReviewResource(Resource):
     """Handles operations on a single review resource by ID."""
     
     @api.response(200, 'Review details retrieved successfully')
+    @api.response(304, 'Not modified since the cached copy')
     @api.response(404, 'Review not found')
     def get(self, review_id):
         """Get a review by its ID
         
         Public endpoint - no authentication required.
+        Supports If-None-Match / If-Modified-Since.
         """
+        version = facade.get_review_version(review_id)
+        if version is None:
+            return {'error': 'Review not found'}, 404
+        etag, last_modified = validators(review_id, *version)
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
+
         review = facade.get_review(review_id)
         if not review:
             return {'error': 'Review not found'}, 404
-        return review.to_dict(), 200
+        return conditional(review.to_dict(), etag, last_modified)
 
     @jwt_required()
     @api.expect(review_model)
@@ -160,16 +223,33 @@ class ReviewResource(Resource):
 class PlaceReviewList(Resource):
     """Handles retrieval of reviews related to a specific place."""
     
+    @api.doc(params={
+        'limit': 'Page size; enables cursor pagination',
+        'cursor': 'next_cursor returned by the previous page'
+    })
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get all reviews for a specific place
         
         Public endpoint - no authentication required.
+        With limit/cursor, returns {"items": [...], "next_cursor": ...}.
         """
-        place = facade.get_place(place_id)
-        if not place:
+        if not facade.place_exists(place_id):
             return {'error': 'Place not found'}, 404
-        
+
+        if is_paginated():
+            try:
+                limit, cursor = page_args()
+                reviews, next_cursor = facade.get_reviews_by_place_page(
+                    place_id, limit, cursor
+                )
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            return page_response(
+                [review.to_dict() for review in reviews], next_cursor
+            ), 200
+
         reviews = facade.get_reviews_by_place(place_id)
         return [review.to_dict() for review in reviews], 200
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+streaming.py - Chunked JSON array / NDJSON output for large collections.
+"""
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON = 'application/x-ndjson'
+# Serialized items joined into one chunk before it is written out
+CHUNK_ITEMS = 100
+
+
+def wants_ndjson():
+    """Return True when the Accept header prefers NDJSON over JSON."""
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON])
+    return best == NDJSON
+
+
+def is_streaming():
+    """Return True when the client asked for a streamed collection, with
+    ``?stream=1`` or ``Accept: application/x-ndjson``."""
+    if wants_ndjson():
+        return True
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def stream_response(rows, serialize):
+    """Stream ``rows`` as a JSON array, or as NDJSON when the client asked
+    for it, serializing each one with ``serialize``.
+
+    ``rows`` should be a lazy iterator (e.g. a yield_per query) so only a
+    batch of rows and one chunk of output are held in memory at a time.
+    """
+    ndjson = wants_ndjson()
+    dumps = current_app.json.dumps
+
+    def generate():
+        chunk = []
+        first = True
+        if not ndjson:
+            yield '['
+        for row in rows:
+            item = dumps(serialize(row))
+            if ndjson:
+                chunk.append(item + '\n')
+            else:
+                chunk.append(item if first else ',' + item)
+                first = False
+            if len(chunk) >= CHUNK_ITEMS:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+        if not ndjson:
+            yield ']\n'
+
+    return Response(stream_with_context(generate()),
+                    mimetype=NDJSON if ndjson else 'application/json')
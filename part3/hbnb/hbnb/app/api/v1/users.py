@@ -8,7 +8,10 @@ This module defines the RESTful routes for user-related operations such as:
 The endpoints are exposed under the '/users/' namespace using Flask-RESTx.
 """
 
+from app.hashing import PasswordHasherBusy
 from app.services import facade
+from app.api.v1.pagination import is_paginated, page_args, page_response
+from app.api.v1.streaming import is_streaming, stream_response
 from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
@@ -34,6 +37,7 @@ class UserList(Resource):
     @api.response(201, 'User successfully created')
     @api.response(400, 'Email already registered')
     @api.response(400, 'Invalid input data')
+    @api.response(503, 'Too many concurrent registrations, retry later')
     def post(self):
         """Register a new user.
 
@@ -57,6 +61,10 @@ class UserList(Resource):
             new_user = facade.create_user(user_data)
         except ValueError as e:
             return {'error': str(e)}, 400
+        except PasswordHasherBusy:
+            return {'error': 'Server busy, please retry'}, 503, {
+                'Retry-After': '1'
+            }
         except Exception:
             return {'error': 'Internal server error'}, 500
 
@@ -64,6 +72,13 @@ class UserList(Resource):
                 'last_name': new_user.last_name, 'email': new_user.email}, 201
 
     @jwt_required()
+    @api.doc(params={
+        'limit': 'Page size; enables cursor pagination',
+        'cursor': 'next_cursor returned by the previous page',
+        'stream': '1 to stream the list; Accept: application/x-ndjson '
+                  'streams NDJSON'
+    })
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
         """Retrieve a list of all registered users.
         
@@ -71,15 +86,34 @@ class UserList(Resource):
 
         Returns:
             tuple: A list of dictionaries representing users, and a 200
-            status code.
+            status code. When limit or cursor is given, the list is
+            wrapped as {"items": [...], "next_cursor": ...}. Otherwise
+            ?stream=1 or Accept: application/x-ndjson streams the list.
         """
+        if is_paginated():
+            try:
+                limit, cursor = page_args()
+                users, next_cursor = facade.get_users_page(limit, cursor)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            return page_response(
+                [self._serialize(user) for user in users], next_cursor
+            ), 200
+
+        if is_streaming():
+            return stream_response(facade.stream_users(), self._serialize)
+
         users = facade.get_all_users()
-        return [{
+        return [self._serialize(user) for user in users], 200
+
+    @staticmethod
+    def _serialize(user):
+        return {
             'id': user.id,
             'first_name': user.first_name,
             'last_name': user.last_name,
             'email': user.email
-        } for user in users], 200
+        }
 
 
 @api.route('/<user_id>')
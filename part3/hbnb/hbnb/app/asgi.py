@@ -0,0 +1,145 @@
+"""
+asgi.py - Async serving mode for the public read endpoints.
+
+    uvicorn asgi:app --workers 4
+
+GET and HEAD requests for places, reviews and amenities (see
+app/api/v1/async_reads.py) are answered on the event loop through
+AsyncHBnBFacade and an async engine (aiosqlite, asyncmy), so a slow query
+only suspends its own request instead of holding a worker thread. Every
+other request (writes, auth, users, nearby and full-text search, streamed
+lists, the Swagger UI, /metrics) is handed to the Flask app unchanged
+through asgiref's WSGI adapter, which runs it on a thread pool.
+
+The async requests still go through the Flask app's before/after request
+hooks (CORS, metrics, N+1 detection) inside a request context built from
+the ASGI scope. The response cache and the read replicas are only used by
+the Flask side.
+"""
+import io
+import sys
+
+from asgiref.wsgi import WsgiToAsgi
+from flask_restx.representations import output_json
+from werkzeug.exceptions import HTTPException
+
+from app import create_app
+from app.api.v1.async_reads import routes
+from app.api.v1.streaming import is_streaming
+from app.database import create_async_db_engine
+from app.services.async_facade import AsyncHBnBFacade
+
+ASYNC_METHODS = ('GET', 'HEAD')
+
+
+def wsgi_environ(scope) -> dict:
+    """Minimal WSGI environ for an ASGI HTTP scope without a body"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for raw_name, raw_value in scope.get('headers', ()):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        value = raw_value.decode('latin-1')
+        environ[name] = (f'{environ[name]},{value}' if name in environ
+                         else value)
+    return environ
+
+
+class AsyncReadApp:
+    """ASGI application: async read endpoints in front of the Flask app"""
+
+    def __init__(self, flask_app, facade) -> None:
+        self.flask_app = flask_app
+        self.facade = facade
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.routes = routes.bind('localhost')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] == 'http' and scope['method'] in ASYNC_METHODS:
+            handler, kwargs = self._match(scope['path'])
+            if handler is not None:
+                response = await self._dispatch(handler, kwargs, scope)
+                if response is not None:
+                    return await self._send(response, scope, send)
+        return await self.wsgi(scope, receive, send)
+
+    def _match(self, path):
+        try:
+            return self.routes.match(path, method='GET')
+        except HTTPException:
+            # Not found, redirects (missing slash)...: Flask answers those
+            return None, {}
+
+    async def _dispatch(self, handler, kwargs, scope):
+        """Run ``handler`` the way Flask runs a view, or return None when
+        the request is for a streamed list"""
+        app = self.flask_app
+        with app.request_context(wsgi_environ(scope)):
+            if is_streaming():
+                return None
+            try:
+                try:
+                    rv = app.preprocess_request()
+                    if rv is None:
+                        rv = await handler(self.facade, **kwargs)
+                        if isinstance(rv, tuple):
+                            # Serialized as a Flask-RESTX resource would
+                            rv = output_json(*rv)
+                except Exception as e:
+                    rv = app.handle_user_exception(e)
+                response = app.process_response(app.make_response(rv))
+            except Exception as e:
+                response = app.handle_exception(e)
+            finally:
+                await self.facade.remove_session()
+            return response
+
+    async def _send(self, response, scope, send):
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.lower().encode('latin-1'),
+                         value.encode('latin-1'))
+                        for name, value in response.headers.items()],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'' if scope['method'] == 'HEAD' else response.get_data(),
+        })
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.facade.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config_class="config.DevelopmentConfig"):
+    """Build the Flask app and wrap it with the async read endpoints"""
+    flask_app = create_app(config_class)
+    facade = AsyncHBnBFacade(create_async_db_engine(flask_app))
+    return AsyncReadApp(flask_app, facade)
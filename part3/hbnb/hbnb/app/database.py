@@ -0,0 +1,251 @@
+"""
+database.py - Engine setup: pool class, SQLite pragmas and pool metrics.
+
+Pool sizing comes from SQLALCHEMY_ENGINE_OPTIONS in the config classes.
+On top of that, init_db():
+
+- gives pooled engines a QueuePool that records how long each checkout
+  waited for a free connection (hbnb_db_pool_checkout_wait_seconds), the
+  first thing to look at when requests queue behind a small pool;
+- runs SQLITE_PRAGMAS on every new connection to a SQLite file, so
+  development gets WAL (readers no longer wait behind the writer),
+  synchronous=NORMAL, a busy timeout instead of instant "database is
+  locked" errors, and memory-mapped reads;
+- registers SQLALCHEMY_REPLICA_URIS as binds ``replica0``, ``replica1``...
+  and lets ``replica_router`` send the reads of GET requests to one of
+  them (see app/session.py for which statements qualify).
+
+Replicas lag behind the primary, so a client that has just written keeps
+reading from the primary for READ_YOUR_WRITES_SECONDS. The window is
+tracked per JWT identity in this process and, for other workers and
+anonymous clients, with a cookie set on the write response.
+
+create_async_db_engine() builds the asyncio engine of the ASGI mode
+(app/asgi.py) on the same database with the same pool sizing and pragmas.
+QUERY_DELAY_SECONDS (benchmarks only) adds a fixed wait before every
+statement of both kinds of engine, to measure how each mode copes with a
+slow database: the sync engine blocks its thread, the async engine only
+suspends its request.
+"""
+import asyncio
+import random
+import time
+
+from flask import request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.util import await_only
+
+from app.extensions import db
+from app.metrics import request_metrics
+from app.services.cache import LRUCache
+from app.session import REPLICA_KEY
+
+REPLICA_BIND_PREFIX = 'replica'
+READ_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+DEFAULT_WINDOW = 5.0
+DEFAULT_COOKIE = 'hbnb_read_primary'
+RECENT_WRITERS = 10000
+# asyncio driver used for each backend by create_async_db_engine()
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'mysql': 'asyncmy',
+                 'postgresql': 'asyncpg'}
+# Engine options carried over to the async engine; connect_args are
+# specific to the sync driver
+ASYNC_ENGINE_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout',
+                        'pool_recycle', 'pool_pre_ping')
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that measures the wait for each connection checkout"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            request_metrics.pool_checkout_wait.observe(
+                time.perf_counter() - start)
+
+
+def is_sqlite_file(url) -> bool:
+    url = make_url(url)
+    return (url.get_backend_name() == 'sqlite'
+            and url.database not in (None, '', ':memory:'))
+
+
+def _set_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+    return on_connect
+
+
+def _delay_statements(delay, asynchronous=False):
+    def before_cursor_execute(conn, cursor, statement, parameters, context,
+                              executemany):
+        if asynchronous:
+            # Runs in the greenlet of an async execution: yield to the loop
+            await_only(asyncio.sleep(delay))
+        else:
+            time.sleep(delay)
+    return before_cursor_execute
+
+
+def _engine_options(url, options) -> dict:
+    options = dict(options)
+    # In-memory SQLite is switched to StaticPool by Flask-SQLAlchemy
+    if url and 'poolclass' not in options:
+        backend = make_url(url).get_backend_name()
+        if backend != 'sqlite' or is_sqlite_file(url):
+            options['poolclass'] = TimedQueuePool
+    return options
+
+
+class ReplicaRouter:
+    """Chooses, per request, whether reads may go to a replica"""
+
+    def __init__(self) -> None:
+        self.replicas = ()
+        self.window = DEFAULT_WINDOW
+        self.cookie = DEFAULT_COOKIE
+        self._writers = LRUCache(RECENT_WRITERS, ttl=self.window)
+
+    def init_app(self, app, replicas) -> None:
+        self.replicas = tuple(replicas)
+        self.window = app.config.get('READ_YOUR_WRITES_SECONDS',
+                                     DEFAULT_WINDOW)
+        self.cookie = app.config.get('READ_YOUR_WRITES_COOKIE',
+                                     DEFAULT_COOKIE)
+        self._writers = LRUCache(RECENT_WRITERS, ttl=self.window)
+        if not self.replicas:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def recently_wrote(self) -> bool:
+        """True while the current client is inside its read-your-writes
+        window"""
+        until = request.cookies.get(self.cookie)
+        try:
+            if until is not None and float(until) > time.time():
+                return True
+        except ValueError:
+            pass
+        identity = self._identity(verify=True)
+        return identity is not None and self._writers.get(identity, False)
+
+    def _identity(self, verify: bool):
+        try:
+            if verify:
+                verify_jwt_in_request(optional=True)
+            return get_jwt_identity()
+        except Exception:
+            # No usable token: the client is treated as anonymous
+            return None
+
+    def _before_request(self) -> None:
+        if request.method in READ_METHODS and not self.recently_wrote():
+            db.session.info[REPLICA_KEY] = random.choice(self.replicas)
+
+    def _after_request(self, response):
+        if request.method in READ_METHODS or response.status_code >= 400:
+            return response
+        identity = self._identity(verify=False)
+        if identity is not None:
+            self._writers.set(identity, True)
+        response.set_cookie(self.cookie, str(time.time() + self.window),
+                            max_age=int(self.window) + 1, httponly=True,
+                            samesite='Lax')
+        return response
+
+    def _teardown_request(self, exc=None) -> None:
+        db.session.info.pop(REPLICA_KEY, None)
+
+
+replica_router = ReplicaRouter()
+
+
+def init_db(app) -> None:
+    """Initialize ``db`` for ``app`` with the tuned engine options and
+    the replica binds"""
+    url = app.config.get('SQLALCHEMY_DATABASE_URI')
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = _engine_options(url, options)
+
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    replicas = []
+    for index, replica_url in enumerate(
+            app.config.get('SQLALCHEMY_REPLICA_URIS') or ()):
+        key = f'{REPLICA_BIND_PREFIX}{index}'
+        binds[key] = {'url': replica_url,
+                      **_engine_options(replica_url, options)}
+        replicas.append(key)
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+    db.init_app(app)
+    # Replicas own no tables: without this, the metadata Flask-SQLAlchemy
+    # made for each bind would send create_all() of every later app
+    # looking for them
+    for key in replicas:
+        db.metadatas.pop(key, None)
+    replica_router.init_app(app, replicas)
+
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    delay = app.config.get('QUERY_DELAY_SECONDS') or 0
+    with app.app_context():
+        for engine in db.engines.values():
+            if pragmas and is_sqlite_file(engine.url):
+                event.listen(engine, 'connect', _set_pragmas(pragmas))
+            if delay:
+                event.listen(engine, 'before_cursor_execute',
+                             _delay_statements(delay))
+
+
+def async_url(url):
+    """``url`` with the asyncio driver of its backend"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No asyncio driver known for {backend}')
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}')
+
+
+def create_async_db_engine(app):
+    """Async engine on the database of ``db.engine``, or on
+    ASYNC_DATABASE_URI when it is set"""
+    with app.app_context():
+        url = make_url(app.config.get('ASYNC_DATABASE_URI')
+                       or async_url(db.engine.url))
+    if url.get_backend_name() == 'sqlite' and not is_sqlite_file(url):
+        raise ValueError('An in-memory SQLite database cannot be shared '
+                         'with the async engine')
+    options = {
+        name: value
+        for name, value in (app.config.get('SQLALCHEMY_ENGINE_OPTIONS')
+                            or {}).items()
+        if name in ASYNC_ENGINE_OPTIONS
+    }
+    if is_sqlite_file(url):
+        # aiosqlite defaults to opening a connection per checkout
+        options['poolclass'] = AsyncAdaptedQueuePool
+    engine = create_async_engine(url, **options)
+
+    # Events are registered on the sync facade of the async engine
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    if pragmas and is_sqlite_file(url):
+        event.listen(engine.sync_engine, 'connect', _set_pragmas(pragmas))
+    delay = app.config.get('QUERY_DELAY_SECONDS') or 0
+    if delay:
+        event.listen(engine.sync_engine, 'before_cursor_execute',
+                     _delay_statements(delay, asynchronous=True))
+    if app.config.get('METRICS_ENABLED', True):
+        request_metrics.watch_engine(engine.sync_engine)
+    return engine
@@ -1,3 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
+from app.hashing import PasswordHasher
+from app.session import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+password_hasher = PasswordHasher()
@@ -0,0 +1,121 @@
+"""
+geo.py - Geohash helpers used to index and search places by location.
+
+A geohash interleaves longitude and latitude bits into a base32 string, so
+points that share a prefix lie in the same grid cell. Storing it in an
+indexed column turns "places in this cell" into a B-tree range scan; the
+exact distance check is then only run on the few candidate rows.
+"""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 12
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+# Upper bound of the range scan for a prefix: sorts after every base32 char
+PREFIX_END = '~'
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """Return the geohash of a point"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Return the (height, width) of a cell in degrees"""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometers"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (math.sin(d_phi / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _wrap_lon(longitude):
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+def _clamp_lat(latitude):
+    return max(-90.0, min(90.0, latitude))
+
+
+def nearby_cells(latitude, longitude, radius_km):
+    """Return the geohash prefixes whose cells cover a circle.
+
+    The precision is the finest one whose cells are at least ``radius_km``
+    high and wide, so the cell holding the center and its 8 neighbours
+    contain the whole circle. Returns None when the circle is too large
+    for any prefix to help (the caller then scans without a cell filter).
+    """
+    lat_scale = KM_PER_DEGREE
+    lon_scale = KM_PER_DEGREE * math.cos(math.radians(
+        min(89.9, abs(latitude) + radius_km / KM_PER_DEGREE)
+    ))
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        if height * lat_scale >= radius_km and width * lon_scale >= radius_km:
+            break
+    else:
+        return None
+    cells = set()
+    for d_lat in (-height, 0.0, height):
+        for d_lon in (-width, 0.0, width):
+            cells.add(encode(_clamp_lat(latitude + d_lat),
+                             _wrap_lon(longitude + d_lon), precision))
+    return sorted(cells)
+
+
+def bbox_cells(min_lat, min_lon, max_lat, max_lon, max_cells=64):
+    """Return geohash prefixes covering a bounding box.
+
+    Uses the finest precision that needs at most ``max_cells`` prefixes,
+    or None when even single-character cells would exceed that.
+    """
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor(max_lat / height) - math.floor(min_lat / height) + 1
+        cols = math.floor(max_lon / width) - math.floor(min_lon / width) + 1
+        if rows * cols <= max_cells:
+            break
+    else:
+        return None
+    # Corners are added explicitly so rounding never drops an edge cell
+    cells = {encode(lat, lon, precision)
+             for lat in (min_lat, max_lat) for lon in (min_lon, max_lon)}
+    lat = min_lat
+    for _ in range(rows):
+        lon = min_lon
+        for _ in range(cols):
+            cells.add(encode(_clamp_lat(min(lat, max_lat)),
+                             min(lon, max_lon), precision))
+            lon += width
+        lat += height
+    return sorted(cells)
@@ -0,0 +1,120 @@
+"""
+hashing.py - Runs bcrypt work on a small dedicated thread pool.
+
+bcrypt is slow on purpose, so a burst of logins or registrations must not
+be allowed to occupy every request thread. At most ``workers`` hashes run
+at once and at most ``queue_size`` more may wait; anything beyond that is
+rejected straight away with PasswordHasherBusy so the API can answer 503.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full or a hash takes too long"""
+
+
+class PasswordHasher:
+    # Upper bounds (seconds) of the hash latency histogram
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self) -> None:
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self.timeout = None
+        self.workers = 0
+        self.queue_size = 0
+        self._reset_metrics()
+
+    def init_app(self, app) -> None:
+        """Create the pool from PASSWORD_HASH_* settings"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.queue_size = app.config.get('PASSWORD_HASH_QUEUE', 32)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 5.0)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='bcrypt'
+        )
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._reset_metrics()
+
+    def _reset_metrics(self) -> None:
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(self.LATENCY_BUCKETS)
+
+    def run(self, fn, *args):
+        """Run ``fn(*args)`` on the pool and return its result.
+
+        Without init_app (scripts, shells) the call runs inline.
+
+        Raises:
+            PasswordHasherBusy: The queue is full or the result did not
+            arrive within PASSWORD_HASH_TIMEOUT seconds.
+        """
+        if self._executor is None:
+            return fn(*args)
+
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy('Password hashing queue is full')
+        with self._lock:
+            self.pending += 1
+
+        try:
+            future = self._executor.submit(self._timed, fn, *args)
+        except RuntimeError:
+            self._finish(slots)
+            raise
+        # The slot is held until the work really ends, even after a timeout
+        future.add_done_callback(lambda _: self._finish(slots))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordHasherBusy('Password hashing timed out')
+
+    def _timed(self, fn, *args):
+        with self._lock:
+            self.running += 1
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.latency_sum += elapsed
+                for i, bound in enumerate(self.LATENCY_BUCKETS):
+                    if elapsed <= bound:
+                        self.latency_buckets[i] += 1
+                        break
+
+    def _finish(self, slots) -> None:
+        with self._lock:
+            self.pending -= 1
+        slots.release()
+
+    def metrics(self) -> dict:
+        """Snapshot of queue depth and hash latency counters"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'queue_depth': self.pending - self.running,
+                'running': self.running,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'latency_sum': self.latency_sum,
+                'latency_buckets': dict(zip(self.LATENCY_BUCKETS,
+                                            self.latency_buckets)),
+            }
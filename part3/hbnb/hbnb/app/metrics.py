@@ -0,0 +1,329 @@
+"""
+metrics.py - Request and SQL metrics in the Prometheus text format.
+
+Request hooks time every request and label it with the matched URL rule
+(never the raw path, so ids do not explode the label set), the method and
+the status. SQLAlchemy engine events count statements and their time, both
+in total and per request. Everything lives in process memory; ``/metrics``
+renders it together with the bcrypt pool and response cache counters. Each
+worker process exposes its own numbers, as usual for Prometheus.
+
+Recording a request costs a few dictionary updates under a lock, so the
+hooks can stay on in production.
+"""
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+from app.extensions import db, password_hasher
+from app.services.cache import response_cache
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Upper bounds of the histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5,
+                     1.0, 5.0, 10.0)
+UNMATCHED_ROUTE = 'unmatched'
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\')
+                         .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1) -> None:
+        with self._lock:
+            self._values[label_values] = (
+                self._values.get(label_values, 0) + amount)
+
+    def value(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        if not values and not self.labels:
+            values = {(): 0}
+        for label_values, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labels, label_values), value
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, *label_values, amount=1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [
+                    [0] * (len(self.buckets) + 1), 0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, *label_values) -> int:
+        with self._lock:
+            entry = self._values.get(label_values)
+            return sum(entry[0]) if entry else 0
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(counts), total)
+                      for key, (counts, total) in self._values.items()}
+        bounds = self.buckets + (float('inf'),)
+        for label_values, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield (self.name + '_bucket',
+                       _format_labels(self.labels, label_values,
+                                      [('le', _format_value(float(bound)))]),
+                       cumulative)
+            labels = _format_labels(self.labels, label_values)
+            yield self.name + '_sum', labels, total
+            yield self.name + '_count', labels, cumulative
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        self.request_duration = Histogram(
+            'hbnb_http_request_duration_seconds',
+            'Time spent handling a request',
+            ('method', 'route', 'status'))
+        self.request_size = Histogram(
+            'hbnb_http_request_size_bytes', 'Size of request bodies',
+            ('method', 'route'), SIZE_BUCKETS)
+        self.response_size = Histogram(
+            'hbnb_http_response_size_bytes',
+            'Size of response bodies (streamed responses are not counted)',
+            ('method', 'route'), SIZE_BUCKETS)
+        self.in_flight = Gauge(
+            'hbnb_http_requests_in_flight', 'Requests being handled')
+        self.request_statements = Histogram(
+            'hbnb_db_statements_per_request',
+            'SQL statements executed by one request',
+            ('method', 'route'), STATEMENT_BUCKETS)
+        self.request_db_time = Histogram(
+            'hbnb_db_time_per_request_seconds',
+            'Time one request spent waiting for SQL statements',
+            ('method', 'route'))
+        self.statements = Counter(
+            'hbnb_db_statements_total', 'SQL statements executed')
+        self.statement_time = Counter(
+            'hbnb_db_statement_seconds_total',
+            'Time spent executing SQL statements')
+        self.pool_checkout_wait = Histogram(
+            'hbnb_db_pool_checkout_wait_seconds',
+            'Time spent waiting for a pooled database connection',
+            buckets=POOL_WAIT_BUCKETS)
+        self.collectors = [
+            self.request_duration, self.request_size, self.response_size,
+            self.in_flight, self.request_statements, self.request_db_time,
+            self.statements, self.statement_time, self.pool_checkout_wait,
+        ]
+
+    def init_app(self, app) -> None:
+        """Register the request hooks, engine listeners and ``/metrics``
+        when METRICS_ENABLED is set"""
+        self._reset()
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule(app.config.get('METRICS_PATH', '/metrics'),
+                         'metrics', self.render_response)
+        with app.app_context():
+            for engine in db.engines.values():
+                self.watch_engine(engine)
+
+    def watch_engine(self, engine) -> None:
+        if not event.contains(engine, 'before_cursor_execute',
+                              self._before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute',
+                         self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute',
+                         self._after_cursor_execute)
+
+    # ---------- SQL ----------
+    def _before_cursor_execute(self, conn, cursor, statement, parameters,
+                               context, executemany):
+        # Kept on the execution context, which a failed statement simply
+        # drops, rather than on the pooled connection
+        context._metrics_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters,
+                              context, executemany):
+        start = getattr(context, '_metrics_query_start', None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        self.statements.inc()
+        self.statement_time.inc(amount=elapsed)
+        if has_request_context() and 'metrics_start' in g:
+            g.metrics_statements += 1
+            g.metrics_db_time += elapsed
+
+    # ---------- Requests ----------
+    def _before_request(self) -> None:
+        g.metrics_start = time.perf_counter()
+        g.metrics_statements = 0
+        g.metrics_db_time = 0.0
+        self.in_flight.inc()
+
+    def _after_request(self, response):
+        g.metrics_status = response.status_code
+        # None for streamed bodies, whose size is unknown here
+        g.metrics_response_size = response.content_length
+        return response
+
+    def _teardown_request(self, exc=None) -> None:
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return
+        self.in_flight.dec()
+        elapsed = time.perf_counter() - start
+        method = request.method
+        route = (request.url_rule.rule if request.url_rule is not None
+                 else UNMATCHED_ROUTE)
+        status = str(g.pop('metrics_status', 500))
+        self.request_duration.observe(elapsed, method, route, status)
+        self.request_size.observe(request.content_length or 0, method, route)
+        response_size = g.pop('metrics_response_size', None)
+        if response_size is not None:
+            self.response_size.observe(response_size, method, route)
+        self.request_statements.observe(g.metrics_statements, method, route)
+        self.request_db_time.observe(g.metrics_db_time, method, route)
+
+    # ---------- Exposition ----------
+    def _extra_samples(self):
+        """Gauges and counters read from other components at render time"""
+        hasher = password_hasher.metrics()
+        yield ('hbnb_password_hash_queue_depth', 'gauge',
+               'Hashes waiting for a bcrypt worker', hasher['queue_depth'])
+        yield ('hbnb_password_hash_running', 'gauge',
+               'Hashes being computed', hasher['running'])
+        yield ('hbnb_password_hash_completed_total', 'counter',
+               'Hashes computed', hasher['completed'])
+        yield ('hbnb_password_hash_rejected_total', 'counter',
+               'Hashes rejected because the queue was full',
+               hasher['rejected'])
+        cache = response_cache.stats()
+        yield ('hbnb_response_cache_entries', 'gauge',
+               'Responses held in the cache', cache['entries'])
+        yield ('hbnb_response_cache_hits_total', 'counter',
+               'Requests answered from the cache', cache['hits'])
+        yield ('hbnb_response_cache_misses_total', 'counter',
+               'Cacheable requests that missed', cache['misses'])
+        yield ('hbnb_response_cache_invalidations_total', 'counter',
+               'Tag invalidations after writes', cache['invalidations'])
+
+    def _hash_latency_samples(self):
+        """The bcrypt pool's latency histogram, whose buckets the hasher
+        counts itself"""
+        name = 'hbnb_password_hash_seconds'
+        hasher = password_hasher.metrics()
+        yield f'# HELP {name} Time spent computing one bcrypt hash'
+        yield f'# TYPE {name} histogram'
+        cumulative = 0
+        for bound, count in sorted(hasher['latency_buckets'].items()):
+            cumulative += count
+            le = _format_value(float(bound))
+            yield f'{name}_bucket{{le="{le}"}} {cumulative}'
+        yield f'{name}_bucket{{le="+Inf"}} {hasher["completed"]}'
+        yield f'{name}_sum {_format_value(hasher["latency_sum"])}'
+        yield f'{name}_count {hasher["completed"]}'
+
+    def _pool_samples(self):
+        """Per-engine pool occupancy, for engines with a sized pool"""
+        gauges = (
+            ('hbnb_db_pool_size', 'Connections the pool keeps open',
+             'size'),
+            ('hbnb_db_pool_checked_out', 'Connections in use',
+             'checkedout'),
+            ('hbnb_db_pool_overflow', 'Connections open beyond the pool size',
+             'overflow'),
+        )
+        engines = [(bind or 'default', engine)
+                   for bind, engine in db.engines.items()
+                   if hasattr(engine.pool, 'checkedout')]
+        for name, help_text, method in gauges:
+            yield f'# HELP {name} {help_text}'
+            yield f'# TYPE {name} gauge'
+            for bind, engine in engines:
+                value = getattr(engine.pool, method)()
+                yield f'{name}{{bind="{bind}"}} {value}'
+
+    def render(self) -> str:
+        lines = []
+        for collector in self.collectors:
+            lines.append(f'# HELP {collector.name} {collector.help}')
+            lines.append(f'# TYPE {collector.name} {collector.kind}')
+            for name, labels, value in collector.samples():
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        for name, kind, help_text, value in self._extra_samples():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.append(f'{name} {_format_value(value)}')
+        lines.extend(self._hash_latency_samples())
+        lines.extend(self._pool_samples())
+        return '\n'.join(lines) + '\n'
+
+    def render_response(self):
+        return Response(self.render(), content_type=CONTENT_TYPE)
+
+
+request_metrics = Metrics()
@@ -1,6 +1,8 @@
 import uuid
 from datetime import datetime
 
+from sqlalchemy.orm import declared_attr
+
 from app.extensions import db
 
 
@@ -16,12 +18,23 @@ class BaseModel(db.Model):
         onupdate=datetime.utcnow,
     )
 
-    def to_dict(self):
+    @declared_attr
+    def __table_args__(cls):
+        # Backs keyset pagination, which orders by (created_at, id)
+        return (
+            db.Index(f"ix_{cls.__tablename__}_created_at_id", "created_at", "id"),
+        )
+
+    def to_dict(self, fields=None):
+        """Serialize columns; ``fields`` restricts the output to those names"""
         data = {}
-        for c in self.__table__.columns:
-            value = getattr(self, c.name)
+        names = fields if fields is not None else self.__table__.columns.keys()
+        for name in names:
+            if name not in self.__table__.columns:
+                continue
+            value = getattr(self, name)
             # Convert datetime to ISO format string
             if isinstance(value, datetime):
                 value = value.isoformat()
-            data[c.name] = value
+            data[name] = value
         return data
@@ -1,7 +1,10 @@
+from datetime import datetime
+
+from app import geo
 from app.extensions import db
 from app.models.base_model import BaseModel
 from sqlalchemy.orm import relationship
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, event
 from app.models.amenity import place_amenity
 
 
@@ -10,10 +13,16 @@ class Place(BaseModel):
 
     title = db.Column(db.String(128), nullable=False)
     description = db.Column(db.String(1024))
-    price = db.Column(db.Integer, nullable=False)
+    price = db.Column(db.Integer, nullable=False, index=True)
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
     country = db.Column(db.String(100))
+    # Rating aggregates, kept in sync by the facade's review write paths
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    avg_rating = db.Column(db.Float)
+    # Derived from latitude/longitude on flush; indexed for nearby/bbox search
+    geohash = db.Column(db.String(geo.PRECISION), index=True)
 
     owner_id = db.Column(
         db.String(60),
@@ -33,12 +42,44 @@ class Place(BaseModel):
         back_populates="places"
     )
 
-    def to_dict(self):
-        """Override to_dict to include amenities, reviews, and owner info"""
-        data = super().to_dict()
-        
+    # Relationships that can be requested through a sparse fieldset
+    RELATIONS = ('owner', 'amenities', 'reviews')
+
+    def apply_rating_delta(self, count_delta: int, rating_delta: int) -> None:
+        """Adjust the rating aggregates after a review write"""
+        self.review_count = (self.review_count or 0) + count_delta
+        self.rating_sum = (self.rating_sum or 0) + rating_delta
+        if self.review_count > 0:
+            self.avg_rating = self.rating_sum / self.review_count
+        else:
+            self.avg_rating = None
+
+    @classmethod
+    def validate_fields(cls, fields):
+        """Raise ValueError if a requested field is neither a column nor a
+        serialized relationship"""
+        unknown = [
+            f for f in fields
+            if f not in cls.__table__.columns and f not in cls.RELATIONS
+        ]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    def to_dict(self, fields=None):
+        """Override to_dict to include amenities, reviews, and owner info
+
+        With ``fields``, only the listed columns and relationships are
+        serialized, so relationships that were not loaded are never touched.
+        """
+        data = super().to_dict(fields)
+        data.pop('geohash', None)
+        if fields is not None:
+            wanted = set(fields)
+        else:
+            wanted = set(self.RELATIONS)
+
         # Add owner information
-        if hasattr(self, 'owner') and self.owner:
+        if 'owner' in wanted and self.owner:
             data['owner'] = {
                 'id': self.owner.id,
                 'first_name': self.owner.first_name,
@@ -47,11 +88,15 @@ class Place(BaseModel):
             }
         
         # Add amenities (just id and name)
-        data['amenities'] = [
-            {'id': amenity.id, 'name': amenity.name}
-            for amenity in self.amenities
-        ]
-        
+        if 'amenities' in wanted:
+            data['amenities'] = [
+                {'id': amenity.id, 'name': amenity.name}
+                for amenity in self.amenities
+            ]
+
+        if 'reviews' not in wanted:
+            return data
+
         # Add reviews (with user info)
         data['reviews'] = []
         for review in self.reviews:
@@ -67,3 +112,24 @@ class Place(BaseModel):
             data['reviews'].append(review_data)
         
         return data
+
+
+# Lets the amenity index re-read the places changed by other workers
+db.Index("ix_places_updated_at", Place.updated_at)
+
+
+@event.listens_for(Place, "before_insert")
+@event.listens_for(Place, "before_update")
+def _set_geohash(mapper, connection, target):
+    """Keep the geohash column in sync with the coordinates"""
+    if target.latitude is None or target.longitude is None:
+        target.geohash = None
+    else:
+        target.geohash = geo.encode(target.latitude, target.longitude)
+
+
+@event.listens_for(Place.amenities, "append")
+@event.listens_for(Place.amenities, "remove")
+def _touch_on_amenity_change(target, value, initiator):
+    """Link rows carry no timestamp, so bump the place's own version"""
+    target.updated_at = datetime.utcnow()
@@ -39,3 +39,8 @@ class Review(BaseModel):
             }
         
         return data
+
+
+# Serves WHERE place_id = ? ORDER BY created_at, id (reviews of one place)
+db.Index("ix_reviews_place_id_created_at", Review.place_id,
+         Review.created_at, Review.id)
@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from app.extensions import db
+
+
+class RevokedToken(db.Model):
+    """A revoked JWT, kept only until the token would have expired anyway"""
+    __tablename__ = "revoked_tokens"
+
+    jti = db.Column(db.String(36), primary_key=True)
+    revoked_at = db.Column(db.DateTime, nullable=False,
+                           default=datetime.utcnow, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
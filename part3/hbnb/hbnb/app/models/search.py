@@ -0,0 +1,85 @@
+"""
+search.py - Full-text indexes over place titles/descriptions and review
+texts, queried by SearchRepository.
+
+On SQLite they are FTS5 tables, created and dropped together with the
+places and reviews tables. They hold their own copy of the text, so the
+facade's write paths keep them in sync. The rowid of each document is
+derived from the id of its row (search_rowid), so a write can replace or
+delete it without scanning the index, and VACUUM (which renumbers the
+implicit rowids of the places and reviews tables) cannot break the link.
+
+On MySQL they are FULLTEXT indexes on the tables themselves, which InnoDB
+maintains.
+"""
+import hashlib
+
+from sqlalchemy import (DDL, Column, Float, Integer, MetaData, String, Table,
+                        Text, event)
+
+from app.extensions import db
+from app.models.place import Place
+from app.models.review import Review
+
+# Stemmed, case- and accent-insensitive matching
+TOKENIZER = 'porter unicode61 remove_diacritics 2'
+
+# Kept out of db.metadata: create_all() must not create them as plain tables
+fts_metadata = MetaData()
+
+# ``rank`` is the hidden FTS5 column holding the bm25() score of a match
+places_fts = Table(
+    'places_fts', fts_metadata,
+    Column('rowid', Integer, primary_key=True),
+    Column('place_id', String(60)),
+    Column('title', Text),
+    Column('description', Text),
+    Column('rank', Float),
+)
+reviews_fts = Table(
+    'reviews_fts', fts_metadata,
+    Column('rowid', Integer, primary_key=True),
+    Column('place_id', String(60)),
+    Column('text', Text),
+    Column('rank', Float),
+)
+
+# IF NOT EXISTS: also run by SearchRepository on databases created before
+# the indexes existed. The rank option weights a title match ten times a
+# description match (place_id is not indexed).
+PLACES_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5("
+    f"place_id UNINDEXED, title, description, tokenize='{TOKENIZER}')",
+    "INSERT INTO places_fts(places_fts, rank) "
+    "VALUES ('rank', 'bm25(0, 10.0, 1.0)')",
+)
+REVIEWS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5("
+    f"place_id UNINDEXED, text, tokenize='{TOKENIZER}')",
+)
+
+
+def search_rowid(obj_id: str) -> int:
+    """FTS5 rowid of the document of the row ``obj_id``: 63 bits of its
+    hash, so a collision is negligible at millions of rows"""
+    digest = hashlib.blake2b(obj_id.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') >> 1
+
+
+def _create_with(table, statements, fts) -> None:
+    """Create (and drop) ``fts`` together with ``table`` on SQLite"""
+    for statement in statements:
+        event.listen(table, 'after_create',
+                     DDL(statement).execute_if(dialect='sqlite'))
+    event.listen(table, 'before_drop',
+                 DDL(f'DROP TABLE IF EXISTS {fts.name}')
+                 .execute_if(dialect='sqlite'))
+
+
+_create_with(Place.__table__, PLACES_FTS_DDL, places_fts)
+_create_with(Review.__table__, REVIEWS_FTS_DDL, reviews_fts)
+
+db.Index('ft_places_title_description', Place.title, Place.description,
+         mysql_prefix='FULLTEXT').ddl_if(dialect='mysql')
+db.Index('ft_reviews_text', Review.text,
+         mysql_prefix='FULLTEXT').ddl_if(dialect='mysql')
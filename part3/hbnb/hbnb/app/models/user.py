@@ -1,9 +1,14 @@
-from app.extensions import db
+from app.extensions import db, password_hasher
 from app.models.base_model import BaseModel
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 import bcrypt
 
 
+def normalize_email(email: str) -> str:
+    """Canonical form used for storage and lookups"""
+    return email.strip().lower()
+
+
 class User(BaseModel):
     __tablename__ = "users"
 
@@ -25,16 +30,27 @@ class User(BaseModel):
         cascade="all, delete-orphan"
     )
 
+    @validates('email')
+    def _normalize_email(self, key, email):
+        # Stored lower-cased so the unique index also enforces
+        # case-insensitive uniqueness and lookups are a single probe
+        return normalize_email(email) if email else email
+
     def hash_password(self, password: str) -> None:
-        """Hash the user's password"""
-        self.password = bcrypt.hashpw(
-            password.encode('utf-8'), 
-            bcrypt.gensalt()
+        """Hash the user's password
+
+        Runs on the bcrypt pool; raises PasswordHasherBusy when it is full.
+        """
+        self.password = password_hasher.run(
+            bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt()
         ).decode('utf-8')
 
     def verify_password(self, password: str) -> bool:
-        """Verify a password against the hash"""
-        return bcrypt.checkpw(
-            password.encode('utf-8'), 
+        """Verify a password against the hash
+
+        Runs on the bcrypt pool; raises PasswordHasherBusy when it is full.
+        """
+        return password_hasher.run(
+            bcrypt.checkpw, password.encode('utf-8'),
             self.password.encode('utf-8')
         )
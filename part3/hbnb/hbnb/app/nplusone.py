@@ -0,0 +1,136 @@
+"""
+nplusone.py - Flags requests that run the same SQL shape over and over.
+
+An N+1 pattern (a lazy load per row while serializing a list) shows up as
+one statement shape executed once per row. With NPLUSONE_MODE set to
+``log`` or ``raise``, every statement of a request is normalized (bound
+values, IN lists and whitespace collapsed) and counted; once a shape runs
+more than NPLUSONE_THRESHOLD times the request is reported with its route,
+the statement and the application line that issued it. ``raise`` makes
+the request fail with NPlusOneError, which is how the test suite catches
+serialization regressions. Off by default.
+
+Deliberate loops (e.g. locking rows one by one) can be wrapped in
+``with query_detector.allowed():``.
+"""
+import os
+import re
+import traceback
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from app.extensions import db
+
+MODES = ('off', 'log', 'raise')
+DEFAULT_THRESHOLD = 5
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,?)+\)', re.IGNORECASE)
+_POSTCOMPILE = re.compile(r'\(?__\[POSTCOMPILE_\w+\]\)?')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACE = re.compile(r'\s+')
+
+
+class NPlusOneError(Exception):
+    """Raised (in ``raise`` mode) when a request repeats a query shape"""
+
+
+def normalize(statement: str) -> str:
+    """Reduce a statement to its shape, so the same query with different
+    parameters maps to the same string"""
+    shape = _POSTCOMPILE.sub('(?)', statement)
+    shape = _STRING.sub('?', shape)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('IN (?)', shape)
+    return _SPACE.sub(' ', shape).strip()
+
+
+def call_site() -> str:
+    """Innermost frame of the application (outside this module) on the
+    current stack, as ``path:line in function``"""
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(APP_DIR) and filename != __file__:
+            path = os.path.relpath(filename, os.path.dirname(APP_DIR))
+            return f'{path}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+class NPlusOneDetector:
+    def __init__(self) -> None:
+        self.mode = 'off'
+        self.threshold = DEFAULT_THRESHOLD
+
+    def init_app(self, app) -> None:
+        """Hook the detector into ``app`` unless NPLUSONE_MODE is off"""
+        self.mode = app.config.get('NPLUSONE_MODE', 'off')
+        if self.mode not in MODES:
+            raise ValueError(f"NPLUSONE_MODE must be one of {MODES}")
+        self.threshold = app.config.get('NPLUSONE_THRESHOLD',
+                                        DEFAULT_THRESHOLD)
+        if self.mode == 'off':
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        with app.app_context():
+            for engine in db.engines.values():
+                if not event.contains(engine, 'before_cursor_execute',
+                                      self._before_cursor_execute):
+                    event.listen(engine, 'before_cursor_execute',
+                                 self._before_cursor_execute)
+
+    @contextmanager
+    def allowed(self):
+        """Do not count the statements run inside the block"""
+        if not has_request_context():
+            yield
+            return
+        g.nplusone_paused = g.get('nplusone_paused', 0) + 1
+        try:
+            yield
+        finally:
+            g.nplusone_paused -= 1
+
+    def _before_request(self) -> None:
+        g.nplusone_counts = {}
+        g.nplusone_sites = {}
+        g.nplusone_paused = 0
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters,
+                               context, executemany):
+        if not has_request_context() or 'nplusone_counts' not in g:
+            return
+        if g.nplusone_paused:
+            return
+        shape = normalize(statement)
+        count = g.nplusone_counts.get(shape, 0) + 1
+        g.nplusone_counts[shape] = count
+        if count == self.threshold + 1:
+            # Only the first repeat over the limit pays for a stack walk
+            g.nplusone_sites[shape] = call_site()
+
+    def _after_request(self, response):
+        counts = g.pop('nplusone_counts', None)
+        if not counts:
+            return response
+        sites = g.pop('nplusone_sites', {})
+        offenders = [(shape, count) for shape, count in counts.items()
+                     if count > self.threshold]
+        if not offenders:
+            return response
+        route = request.url_rule.rule if request.url_rule else request.path
+        details = '; '.join(
+            f'{count}x "{shape}" at {sites.get(shape, "unknown")}'
+            for shape, count in offenders
+        )
+        message = f'N+1 queries in {request.method} {route}: {details}'
+        if self.mode == 'raise':
+            raise NPlusOneError(message)
+        current_app.logger.warning(message)
+        return response
+
+
+query_detector = NPlusOneDetector()
@@ -4,5 +4,6 @@ from app.repositories.sqlalchemy_repository import SQLAlchemyRepository
 
 
 class AmenityRepository(SQLAlchemyRepository):
-    def __init__(self, session=None) -> None:
-        super().__init__(Amenity, session=session or db.session)
+    def __init__(self, session=None, auto_commit: bool = True) -> None:
+        super().__init__(Amenity, session=session or db.session,
+                         auto_commit=auto_commit)
@@ -0,0 +1,51 @@
+from typing import Any, List, Optional, Sequence, Tuple, Type
+
+from app.extensions import db
+from app.repositories.sqlalchemy_repository import (
+    select_page, select_rows, split_page
+)
+
+
+class AsyncRepository:
+    """Read-only counterpart of SQLAlchemyRepository on an AsyncSession.
+
+    The statements come from the same builders, so both modes run the same
+    SQL. Relationships are never lazy loaded under asyncio: everything the
+    caller serializes must be covered by ``options``.
+    """
+
+    def __init__(self, model: Type[db.Model], session) -> None:
+        self.model = model
+        self.session = session
+
+    async def get(self, obj_id: str,
+                  options: Sequence[Any] = ()) -> Optional[db.Model]:
+        return await self.session.get(self.model, obj_id, options=options)
+
+    async def list(
+        self,
+        options: Sequence[Any] = (),
+        criteria: Sequence[Any] = (),
+        order_by: Sequence[Any] = (),
+        **filters: Any,
+    ) -> List[db.Model]:
+        query = select_rows(self.model, options, criteria, order_by,
+                            **filters)
+        return list(await self.session.scalars(query))
+
+    async def page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        options: Sequence[Any] = (),
+        criteria: Sequence[Any] = (),
+        **filters: Any,
+    ) -> Tuple[List[db.Model], Optional[str]]:
+        """Keyset page, see SQLAlchemyRepository.page"""
+        query = select_page(self.model, limit, cursor, options, criteria,
+                            **filters)
+        return split_page(list(await self.session.scalars(query)), limit)
+
+    async def one_or_none(self, statement):
+        """Run a row-returning statement such as select_place_version()"""
+        return (await self.session.execute(statement)).one_or_none()
@@ -1,7 +1,83 @@
-from app.repositories.sqlalchemy_repository import SQLAlchemyRepository
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import aliased
+
+from app.extensions import db
+from app.models.amenity import Amenity, place_amenity
 from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.repositories.sqlalchemy_repository import SQLAlchemyRepository
+
+
+def select_place_version(place_id: str):
+    """SELECT behind PlaceRepository.version: the place's and its owner's
+    updated_at, then the review count and the newest review, reviewer and
+    amenity updated_at, then the amenity count (deleting an amenity drops
+    its links without touching any place)"""
+    owner = aliased(User)
+    reviewer = aliased(User)
+    review_count = select(func.count(Review.id)).where(
+        Review.place_id == Place.id).scalar_subquery()
+    reviews_updated = select(func.max(Review.updated_at)).where(
+        Review.place_id == Place.id).scalar_subquery()
+    reviewers_updated = select(func.max(reviewer.updated_at)).join(
+        Review, Review.user_id == reviewer.id).where(
+        Review.place_id == Place.id).scalar_subquery()
+    amenities_updated = select(func.max(Amenity.updated_at)).join(
+        place_amenity, place_amenity.c.amenity_id == Amenity.id).where(
+        place_amenity.c.place_id == Place.id).scalar_subquery()
+    amenity_count = select(func.count(place_amenity.c.amenity_id)).where(
+        place_amenity.c.place_id == Place.id).scalar_subquery()
+    return select(
+        Place.updated_at,
+        owner.updated_at,
+        review_count,
+        reviews_updated,
+        reviewers_updated,
+        amenities_updated,
+        amenity_count,
+    ).outerjoin(owner, owner.id == Place.owner_id).where(
+        Place.id == place_id)
+
+
+class PlaceRepository(SQLAlchemyRepository):
+    def __init__(self, session=None, auto_commit: bool = True) -> None:
+        super().__init__(Place, session=session or db.session,
+                         auto_commit=auto_commit)
+
+    def version(self, place_id: str):
+        """Return the timestamps and counts that change whenever the
+        serialized place graph changes, in one query, or None if the place
+        does not exist."""
+        return self.session.execute(
+            select_place_version(place_id)).one_or_none()
+
+    def coordinates(self, criteria=()):
+        """Return (id, latitude, longitude) of the places matching
+        ``criteria``, without loading any object"""
+        return self.session.execute(
+            select(Place.id, Place.latitude, Place.longitude).where(
+                *criteria)).all()
 
+    def recompute_ratings(self) -> int:
+        """Rebuild review_count, rating_sum and avg_rating from the reviews
+        table in one transaction. Returns the number of places rated."""
+        stats = self.session.query(
+            Review.place_id, func.count(Review.id), func.sum(Review.rating)
+        ).group_by(Review.place_id).all()
 
-class PlaceRepository(BaseRepository):
-    def __init__(self):
-        super().__init__(Place)
+        self.session.execute(
+            update(Place).values(review_count=0, rating_sum=0, avg_rating=None)
+        )
+        if stats:
+            self.session.execute(update(Place), [
+                {
+                    'id': place_id,
+                    'review_count': count,
+                    'rating_sum': total,
+                    'avg_rating': total / count,
+                }
+                for place_id, count, total in stats
+            ])
+        self._commit()
+        return len(stats)
@@ -1,7 +1,25 @@
-from app.repositories.sqlalchemy_repository import SQLAlchemyRepository
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from app.extensions import db
 from app.models.review import Review
+from app.models.user import User
+from app.repositories.sqlalchemy_repository import SQLAlchemyRepository
+
+
+def select_review_version(review_id: str):
+    """SELECT behind ReviewRepository.version"""
+    author = aliased(User)
+    return select(Review.updated_at, author.updated_at).outerjoin(
+        author, author.id == Review.user_id).where(Review.id == review_id)
+
 
+class ReviewRepository(SQLAlchemyRepository):
+    def __init__(self, session=None, auto_commit: bool = True) -> None:
+        super().__init__(Review, session=session or db.session,
+                         auto_commit=auto_commit)
 
-class ReviewRepository(BaseRepository):
-    def __init__(self):
-        super().__init__(Review)
+    def version(self, review_id: str):
+        """Return (review.updated_at, author.updated_at) or None"""
+        return self.session.execute(
+            select_review_version(review_id)).one_or_none()
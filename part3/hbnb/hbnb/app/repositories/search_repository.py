@@ -0,0 +1,254 @@
+import base64
+import json
+import re
+import weakref
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import (Select, and_, bindparam, column, delete, func,
+                        insert, literal_column, or_, select, table, text,
+                        union_all)
+from sqlalchemy.dialects.mysql import match
+
+from app.extensions import db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.search import (PLACES_FTS_DDL, REVIEWS_FTS_DDL, places_fts,
+                               reviews_fts, search_rowid)
+
+# Words of a query beyond which it is rejected
+MAX_TERMS = 16
+# Share of a place's score given by its best matching review
+REVIEW_WEIGHT = 0.5
+# Documents written per executemany when rebuilding the index
+REBUILD_BATCH_SIZE = 1000
+WORD = re.compile(r'\w+')
+
+# Engines whose FTS5 tables are known to exist
+_fts_ready = weakref.WeakSet()
+
+
+class SearchIndexMissing(Exception):
+    """Raised when searching a database whose index was never built"""
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a search query into words; operators and quotes are dropped
+    so any input is a valid match expression.
+
+    Raises:
+        ValueError: If the query has no word or too many.
+    """
+    terms = WORD.findall(query or '')
+    if not terms:
+        raise ValueError('q must contain at least one word')
+    if len(terms) > MAX_TERMS:
+        raise ValueError(f'q must not have more than {MAX_TERMS} words')
+    return terms
+
+
+def match_expression(dialect: str, terms: Sequence[str]) -> str:
+    """Every term is required and the last one is a prefix, so results
+    follow the user while they type"""
+    if dialect == 'mysql':
+        return ' '.join(f'+{term}' for term in terms) + '*'
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+
+def encode_search_cursor(score: float, place_id: str) -> str:
+    raw = json.dumps([score, place_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        score, place_id = json.loads(raw)
+        return float(score), str(place_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Invalid cursor')
+
+
+def _fts5_hits(fts, expression: str) -> Select:
+    """(place_id, score) of the documents of ``fts`` matching
+    ``expression``; bm25() is negative, best first"""
+    return select(fts.c.place_id, (-fts.c.rank).label('score')).where(
+        literal_column(fts.name).op('MATCH')(expression))
+
+
+def select_search(dialect: str, query: str, limit: int,
+                  cursor: Optional[str] = None,
+                  reviews: bool = False) -> Select:
+    """SELECT behind SearchRepository.search: (place_id, score) by
+    descending score, then place id, one extra row to know whether another
+    page exists.
+
+    A place scores its BM25 relevance plus REVIEW_WEIGHT times that of its
+    best matching review when ``reviews`` is set, so places only mentioned
+    in reviews are found too.
+    """
+    expression = match_expression(dialect, search_terms(query))
+    if dialect == 'sqlite':
+        place_hits = _fts5_hits(places_fts, expression)
+        review_hits = _fts5_hits(reviews_fts, expression).subquery()
+    elif dialect == 'mysql':
+        relevance = match(Place.title, Place.description,
+                          against=expression).in_boolean_mode()
+        place_hits = select(Place.id.label('place_id'),
+                            relevance.label('score')).where(relevance > 0)
+        relevance = match(Review.text, against=expression).in_boolean_mode()
+        review_hits = select(Review.place_id.label('place_id'),
+                             relevance.label('score')).where(
+            relevance > 0).subquery()
+    else:
+        raise NotImplementedError(f'Full-text search is not available on '
+                                  f'{dialect}')
+
+    parts = [place_hits]
+    if reviews:
+        parts.append(select(
+            review_hits.c.place_id,
+            (func.max(review_hits.c.score) * REVIEW_WEIGHT).label('score')
+        ).group_by(review_hits.c.place_id))
+    hits = union_all(*parts).subquery('hits')
+    ranked = select(
+        hits.c.place_id, func.sum(hits.c.score).label('score')
+    ).group_by(hits.c.place_id).subquery('ranked')
+
+    statement = select(ranked.c.place_id, ranked.c.score)
+    if cursor:
+        score, place_id = decode_search_cursor(cursor)
+        statement = statement.where(or_(
+            ranked.c.score < score,
+            and_(ranked.c.score == score, ranked.c.place_id > place_id),
+        ))
+    return statement.order_by(ranked.c.score.desc(),
+                              ranked.c.place_id).limit(limit + 1)
+
+
+def _value(document: Any, name: str) -> Any:
+    if isinstance(document, dict):
+        return document.get(name)
+    return getattr(document, name)
+
+
+class SearchRepository:
+    """Full-text search over places, and the upkeep of its index.
+
+    The index methods take Place/Review instances or the column dicts of
+    the bulk paths, stage their changes in the session's transaction, and
+    do nothing on MySQL, whose FULLTEXT indexes follow the tables.
+    """
+
+    def __init__(self, session=None) -> None:
+        self.session = session or db.session
+
+    @property
+    def dialect(self) -> str:
+        return db.engine.dialect.name
+
+    def search(self, query: str, limit: int, cursor: Optional[str] = None,
+               reviews: bool = False) -> Tuple[List[Tuple[str, float]],
+                                               Optional[str]]:
+        """Return ([(place_id, score)], next_cursor), best match first.
+
+        Raises:
+            ValueError: If the query or the cursor is invalid.
+            NotImplementedError: On a database without full-text search.
+            SearchIndexMissing: If the FTS5 tables do not exist yet.
+        """
+        if not self.is_built():
+            raise SearchIndexMissing('The search index has not been built')
+        rows = self.session.execute(select_search(
+            self.dialect, query, limit, cursor, reviews)).all()
+        hits = [(place_id, score) for place_id, score in rows[:limit]]
+        if len(rows) <= limit:
+            return hits, None
+        place_id, score = hits[-1]
+        return hits, encode_search_cursor(score, place_id)
+
+    def is_built(self) -> bool:
+        """False on a SQLite database whose FTS5 tables were never
+        created; init_db.py or reindex_search.py builds them"""
+        if self.dialect != 'sqlite' or db.engine in _fts_ready:
+            return True
+        master = table('sqlite_master', column('name'))
+        found = self.session.execute(
+            select(func.count()).select_from(master).where(
+                master.c.name.in_(('places_fts', 'reviews_fts')))).scalar()
+        if found < 2:
+            return False
+        _fts_ready.add(db.engine)
+        return True
+
+    def index_places(self, places: Iterable[Any]) -> None:
+        """Add or replace the documents of ``places``"""
+        rows = [{'rowid': search_rowid(_value(place, 'id')),
+                 'place_id': _value(place, 'id'),
+                 'title': _value(place, 'title'),
+                 'description': _value(place, 'description') or ''}
+                for place in places]
+        self._write(insert(places_fts).prefix_with('OR REPLACE'), rows)
+
+    def index_reviews(self, reviews: Iterable[Any]) -> None:
+        """Add or replace the documents of ``reviews``"""
+        rows = [{'rowid': search_rowid(_value(review, 'id')),
+                 'place_id': _value(review, 'place_id'),
+                 'text': _value(review, 'text')}
+                for review in reviews]
+        self._write(insert(reviews_fts).prefix_with('OR REPLACE'), rows)
+
+    def remove_places(self, place_ids: Iterable[str]) -> None:
+        """Remove the documents of places, and of their reviews, about to
+        be deleted"""
+        place_ids = list(place_ids)
+        if not place_ids or self.dialect != 'sqlite':
+            return
+        review_ids = self.session.scalars(
+            select(Review.id).where(Review.place_id.in_(place_ids))).all()
+        self._remove(places_fts, place_ids)
+        self._remove(reviews_fts, review_ids)
+
+    def remove_reviews(self, review_ids: Iterable[str]) -> None:
+        self._remove(reviews_fts, list(review_ids))
+
+    def rebuild(self) -> int:
+        """Reindex every place and review from their tables; returns the
+        number of documents written"""
+        if self.dialect != 'sqlite':
+            return 0
+        self._ensure_tables()
+        self.session.execute(delete(places_fts))
+        self.session.execute(delete(reviews_fts))
+        written = 0
+        for model, columns, index in (
+                (Place, (Place.id, Place.title, Place.description),
+                 self.index_places),
+                (Review, (Review.id, Review.place_id, Review.text),
+                 self.index_reviews)):
+            rows = self.session.execute(
+                select(*columns).order_by(model.id).execution_options(
+                    yield_per=REBUILD_BATCH_SIZE))
+            for batch in rows.partitions():
+                index([row._asdict() for row in batch])
+                written += len(batch)
+        return written
+
+    def _remove(self, fts, obj_ids: List[str]) -> None:
+        self._write(delete(fts).where(fts.c.rowid == bindparam('doc')),
+                    [{'doc': search_rowid(obj_id)} for obj_id in obj_ids])
+
+    def _write(self, statement, rows: List[dict]) -> None:
+        if not rows or self.dialect != 'sqlite':
+            return
+        self._ensure_tables()
+        self.session.execute(statement, rows)
+
+    def _ensure_tables(self) -> None:
+        """Create the FTS5 tables on a database that predates them, once
+        per engine"""
+        engine = db.engine
+        if engine in _fts_ready:
+            return
+        for statement in PLACES_FTS_DDL + REVIEWS_FTS_DDL:
+            self.session.execute(text(statement))
+        _fts_ready.add(engine)
@@ -1,34 +1,202 @@
-from typing import Any, Dict, List, Optional, Type
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import Select, and_, insert, or_, select
 
 from app.extensions import db
 
 
+def encode_cursor(instance: db.Model) -> str:
+    """Build an opaque cursor pointing just after ``instance``."""
+    raw = json.dumps([instance.created_at.isoformat(), instance.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Return the ``(created_at, id)`` pair stored in a cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        created_at, obj_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(obj_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+def select_rows(
+    model: Type[db.Model],
+    options: Sequence[Any] = (),
+    criteria: Sequence[Any] = (),
+    order_by: Sequence[Any] = (),
+    **filters: Any,
+) -> Select:
+    """SELECT statement behind ``list``; shared with AsyncRepository so
+    both session types run the same SQL."""
+    query = select(model)
+    if options:
+        query = query.options(*options)
+    if criteria:
+        query = query.where(*criteria)
+    if filters:
+        query = query.filter_by(**filters)
+    if order_by:
+        query = query.order_by(*order_by)
+    return query
+
+
+def select_page(
+    model: Type[db.Model],
+    limit: int,
+    cursor: Optional[str] = None,
+    options: Sequence[Any] = (),
+    criteria: Sequence[Any] = (),
+    **filters: Any,
+) -> Select:
+    """SELECT statement behind ``page``: the keyset predicate on the last
+    row of the previous page, ordered by ``(created_at, id)``, with one
+    extra row to know whether another page exists."""
+    query = select_rows(model, options, criteria, **filters)
+    if cursor:
+        created_at, obj_id = decode_cursor(cursor)
+        query = query.where(or_(
+            model.created_at > created_at,
+            and_(model.created_at == created_at, model.id > obj_id),
+        ))
+    return query.order_by(model.created_at, model.id).limit(limit + 1)
+
+
+def split_page(rows: List[db.Model],
+               limit: int) -> Tuple[List[db.Model], Optional[str]]:
+    """Turn the rows fetched by ``select_page`` into (page, next_cursor)"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
+
+
+# Session.info key holding the nesting depth of open units of work
+UNIT_OF_WORK_KEY = "unit_of_work_depth"
+
+
 class SQLAlchemyRepository:
-    def __init__(self, model: Type[db.Model], session=None) -> None:
+    """Generic repository over one model.
+
+    Writes commit immediately unless ``auto_commit`` is False or a unit of
+    work is open on the session (see HBnBFacade.unit_of_work); the changes
+    are then left in the session for the owner of the transaction to
+    commit or roll back.
+    """
+
+    def __init__(self, model: Type[db.Model], session=None,
+                 auto_commit: bool = True) -> None:
         self.model = model
         self.session = session or db.session
+        self.auto_commit = auto_commit
+
+    def in_unit_of_work(self) -> bool:
+        return self.session.info.get(UNIT_OF_WORK_KEY, 0) > 0
+
+    def _commit(self) -> None:
+        if self.auto_commit and not self.in_unit_of_work():
+            self.session.commit()
+
+    def get(
+        self,
+        obj_id: str,
+        options: Sequence[Any] = (),
+        for_update: bool = False,
+    ) -> Optional[db.Model]:
+        """Fetch by primary key; ``for_update`` locks the row (and refreshes
+        it) until the transaction ends."""
+        if for_update:
+            return self.session.get(
+                self.model, obj_id, options=options,
+                with_for_update=True, populate_existing=True
+            )
+        return self.session.get(self.model, obj_id, options=options)
 
-    def get(self, obj_id: str) -> Optional[db.Model]:
-        return self.model.query.get(obj_id)
+    def list(
+        self,
+        options: Sequence[Any] = (),
+        criteria: Sequence[Any] = (),
+        order_by: Sequence[Any] = (),
+        **filters: Any,
+    ) -> List[db.Model]:
+        query = select_rows(self.model, options, criteria, order_by,
+                            **filters)
+        return list(self.session.scalars(query))
 
-    def list(self, **filters: Any) -> List[db.Model]:
-        query = self.model.query
-        if filters:
-            query = query.filter_by(**filters)
-        return list(query.all())
+    def page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        options: Sequence[Any] = (),
+        criteria: Sequence[Any] = (),
+        **filters: Any,
+    ) -> Tuple[List[db.Model], Optional[str]]:
+        """Return up to ``limit`` rows ordered by ``(created_at, id)``.
+
+        Rows are selected with a keyset predicate on the last row of the
+        previous page, so every page costs one index range scan no matter
+        how deep it is. The second element is the cursor of the next page,
+        or None when there are no more rows.
+        """
+        query = select_page(self.model, limit, cursor, options, criteria,
+                            **filters)
+        return split_page(list(self.session.scalars(query)), limit)
+
+    def stream(
+        self,
+        batch_size: int,
+        options: Sequence[Any] = (),
+        criteria: Sequence[Any] = (),
+        **filters: Any,
+    ) -> Iterator[db.Model]:
+        """Yield every matching row ordered by ``(created_at, id)``.
+
+        Rows are fetched ``batch_size`` at a time with yield_per, so only
+        one batch is held in memory. Collection loaders must be
+        selectinload (joined/subquery collection loading cannot be
+        combined with yield_per).
+        """
+        query = select_rows(self.model, options, criteria,
+                            (self.model.created_at, self.model.id),
+                            **filters)
+        yield from self.session.scalars(
+            query.execution_options(yield_per=batch_size))
+
+    def existing_ids(self, ids) -> set:
+        """Return which of ``ids`` exist, in one query"""
+        ids = set(ids)
+        if not ids:
+            return set()
+        rows = self.session.query(self.model.id).filter(
+            self.model.id.in_(ids)).all()
+        return {row[0] for row in rows}
 
     def add(self, instance: db.Model) -> db.Model:
         self.session.add(instance)
-        self.session.commit()
+        self._commit()
         return instance
 
+    def add_many(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert plain column dicts with one executemany.
+
+        Skips the ORM unit of work (and its mapper events), so callers must
+        provide every derived column themselves.
+        """
+        if rows:
+            self.session.execute(insert(self.model.__table__), rows)
+        self._commit()
+
     def delete(self, instance: db.Model) -> None:
         self.session.delete(instance)
-        self.session.commit()
+        self._commit()
 
     def update(self, instance: db.Model, data: Dict[str, Any]) -> db.Model:
         for key, value in data.items():
             if hasattr(instance, key):
                 setattr(instance, key, value)
-        self.session.commit()
+        self._commit()
         return instance
@@ -1,13 +1,15 @@
 from typing import Optional
 
 from app.extensions import db
-from app.models.user import User
+from app.models.user import User, normalize_email
 from app.repositories.sqlalchemy_repository import SQLAlchemyRepository
 
 
 class UserRepository(SQLAlchemyRepository):
-    def __init__(self, session=None) -> None:
-        super().__init__(User, session=session or db.session)
+    def __init__(self, session=None, auto_commit: bool = True) -> None:
+        super().__init__(User, session=session or db.session,
+                         auto_commit=auto_commit)
 
     def get_by_email(self, email: str) -> Optional[User]:
-        return User.query.filter_by(email=email).one_or_none()
+        """Single-row lookup through the unique index on users.email"""
+        return User.query.filter_by(email=normalize_email(email)).one_or_none()
@@ -0,0 +1,141 @@
+"""
+revocation.py - JWT revocation checks that normally cost no query.
+
+Revoked ``jti`` values live in the compact ``revoked_tokens`` table. Each
+process mirrors them in a Bloom filter: a token the filter has never seen
+is certainly not revoked, so the usual request is answered from memory.
+Only a filter hit (a revoked token or a rare false positive) is confirmed
+with a primary-key lookup. The filter is topped up incrementally with rows
+revoked since the last refresh, so revocations made by another worker are
+visible after at most JWT_REVOCATION_REFRESH_SECONDS.
+
+When the filter is full it is rebuilt from the unexpired rows, sized for
+twice their number so it does not fill up again straight away. Expired
+rows are never read again; prune_revoked_tokens.py deletes them outside
+of any request.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete
+
+from app.extensions import db
+from app.models.revoked_token import RevokedToken
+
+
+# Incremental refreshes re-read this far behind the newest row seen, so a row
+# committed late (or stamped by a worker with a slower clock) is not missed
+REFRESH_LOOKBACK = timedelta(seconds=60)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate)
+                               / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7))
+                   for pos in self._positions(key))
+
+
+class RevocationList:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.capacity = 100000
+        self.error_rate = 0.001
+        self.refresh_seconds = 5.0
+        self._reset()
+
+    def init_app(self, app) -> None:
+        self.capacity = app.config.get('JWT_REVOCATION_CAPACITY', 100000)
+        self.error_rate = app.config.get('JWT_REVOCATION_ERROR_RATE', 0.001)
+        self.refresh_seconds = app.config.get(
+            'JWT_REVOCATION_REFRESH_SECONDS', 5.0
+        )
+        self._reset()
+
+    def _reset(self) -> None:
+        self._bloom = None
+        self._high_water = None
+        self._next_refresh = 0.0
+        self.db_checks = 0
+
+    def revoke(self, jti: str, expires_at: datetime) -> None:
+        """Persist a revocation and make it visible in this process at once"""
+        if db.session.get(RevokedToken, jti) is None:
+            db.session.add(RevokedToken(jti=jti, expires_at=expires_at))
+            db.session.commit()
+        self._refresh()
+        with self._lock:
+            if jti not in self._bloom:
+                self._bloom.add(jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        self._refresh()
+        if jti not in self._bloom:
+            return False
+        # Possible false positive: confirm against the table
+        self.db_checks += 1
+        return db.session.get(RevokedToken, jti) is not None
+
+    def _refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and self._bloom is not None and now < self._next_refresh:
+            return
+        with self._lock:
+            if self._bloom is None or self._bloom.count >= self._bloom.capacity:
+                self._rebuild()
+            else:
+                self._load(RevokedToken.revoked_at
+                           >= self._high_water - REFRESH_LOOKBACK)
+            self._next_refresh = now + self.refresh_seconds
+
+    def prune(self) -> int:
+        """Delete the expired revocations in a transaction of their own;
+        returns the number of rows deleted"""
+        with db.engine.begin() as conn:
+            result = conn.execute(delete(RevokedToken).where(
+                RevokedToken.expires_at < datetime.utcnow()))
+        return result.rowcount
+
+    def _rebuild(self) -> None:
+        """Start a new filter from the unexpired rows"""
+        rows = db.session.query(
+            RevokedToken.jti, RevokedToken.revoked_at
+        ).filter(RevokedToken.expires_at >= datetime.utcnow()).all()
+        self._bloom = BloomFilter(max(self.capacity, 2 * len(rows)),
+                                  self.error_rate)
+        self._high_water = datetime.min + REFRESH_LOOKBACK
+        self._add(rows)
+
+    def _load(self, criterion) -> None:
+        self._add(db.session.query(
+            RevokedToken.jti, RevokedToken.revoked_at
+        ).filter(criterion).all())
+
+    def _add(self, rows) -> None:
+        for jti, revoked_at in rows:
+            if jti not in self._bloom:
+                self._bloom.add(jti)
+            if revoked_at > self._high_water:
+                self._high_water = revoked_at
+
+revocation_list = RevocationList()
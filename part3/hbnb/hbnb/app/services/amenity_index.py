@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+amenity_index.py - In-memory bitmap index of the amenities of each place,
+behind the ?amenities= filter of the place list.
+
+Every place with amenities gets a bit position, every amenity a bitmap
+with the bits of its places set. "WiFi AND Parking AND Pool" is the AND of
+three bitmaps, a few tens of microseconds at a million places. When few
+places match, their ids reach SQL as an IN list served by the primary
+key; when many do, or before the index is built, the filter is left to
+EXISTS probes on place_amenity, which fill a page quickly when matches
+are that dense.
+
+The index is built by the first filtered query of each process and
+follows the facade's writes once they commit. Links changed by another
+worker bump their place's updated_at, so the places updated since the
+last refresh are re-read every AMENITY_INDEX_REFRESH_SECONDS. A place
+deleted by another worker keeps its bits until a restart, which is
+harmless: the SQL query no longer finds it.
+"""
+import itertools
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.models.amenity import Amenity, place_amenity
+from app.models.place import Place
+
+# Refreshes re-read this far behind the newest update seen, so a row
+# committed late (or stamped by a worker with a slower clock) is not missed
+REFRESH_LOOKBACK = timedelta(seconds=60)
+# Places whose links are read per query during a refresh
+REFRESH_BATCH_SIZE = 500
+
+
+def bit_positions(bitmap: int) -> list:
+    """Positions of the set bits of ``bitmap``, in increasing order"""
+    size = (bitmap.bit_length() + 63) // 64 * 8
+    words = array('Q', bitmap.to_bytes(size, 'little'))
+    if sys.byteorder == 'big':
+        words.byteswap()
+    positions = []
+    # Zero words are skipped in C; only the set bits cost Python steps
+    for index in itertools.compress(range(len(words)), words):
+        word = words[index]
+        base = index * 64
+        while word:
+            low = word & -word
+            positions.append(base + low.bit_length() - 1)
+            word ^= low
+    return positions
+
+
+class PlaceBitmaps:
+    """Bit positions of the places and one bitmap per amenity; not
+    thread-safe, AmenityIndex serializes the calls"""
+
+    def __init__(self) -> None:
+        # amenity id -> bytearray with one bit per place position, so a
+        # bit is set or tested in O(1)
+        self._bits = {}
+        # amenity id -> the same bitmap as an int, rebuilt after a change
+        self._bitmaps = {}
+        self.place_ids = []
+        self._positions = {}
+
+    def amenity_ids(self) -> set:
+        return set(self._bits)
+
+    def set(self, place_id: str, amenity_ids) -> None:
+        """Make the bits of ``place_id`` those of the set ``amenity_ids``"""
+        position = self._positions.get(place_id)
+        if position is None:
+            if not amenity_ids:
+                return
+            position = len(self.place_ids)
+            self.place_ids.append(place_id)
+            self._positions[place_id] = position
+            stale = ()
+        else:
+            stale = [amenity_id for amenity_id in self._bits
+                     if amenity_id not in amenity_ids]
+        byte, mask = position >> 3, 1 << (position & 7)
+        for amenity_id in stale:
+            bits = self._bits[amenity_id]
+            if byte < len(bits) and bits[byte] & mask:
+                bits[byte] &= ~mask
+                self._bitmaps.pop(amenity_id, None)
+        for amenity_id in amenity_ids:
+            bits = self._bits.setdefault(amenity_id, bytearray())
+            if byte >= len(bits):
+                # Grown geometrically, so building costs amortized O(1)
+                bits.extend(bytes(max(byte + 1 - len(bits), len(bits))))
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                self._bitmaps.pop(amenity_id, None)
+
+    def remove_amenity(self, amenity_id: str) -> None:
+        self._bits.pop(amenity_id, None)
+        self._bitmaps.pop(amenity_id, None)
+
+    def bitmap(self, amenity_id: str) -> int:
+        """The bitmap of an amenity as an int (0 for an unknown id)"""
+        bitmap = self._bitmaps.get(amenity_id)
+        if bitmap is None:
+            bits = self._bits.get(amenity_id)
+            bitmap = int.from_bytes(bits, 'little') if bits else 0
+            self._bitmaps[amenity_id] = bitmap
+        return bitmap
+
+
+class AmenityIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self.enabled = True
+        self.max_ids = 2000
+        self.refresh_seconds = 5.0
+        self._reset()
+
+    def init_app(self, app) -> None:
+        self.enabled = app.config.get('AMENITY_INDEX_ENABLED', True)
+        self.max_ids = app.config.get('AMENITY_INDEX_MAX_IDS', 2000)
+        self.refresh_seconds = app.config.get(
+            'AMENITY_INDEX_REFRESH_SECONDS', 5.0
+        )
+        self._reset()
+
+    def _reset(self) -> None:
+        with self._lock:
+            self._bitmaps = None
+            self._high_water = None
+            self._next_refresh = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.enabled and self._bitmaps is not None
+
+    def due(self) -> bool:
+        """True when refresh() should run before the next filtered query"""
+        return self.enabled and time.monotonic() >= self._next_refresh
+
+    def place_ids(self, amenity_ids):
+        """Ids of the places linked to every amenity of ``amenity_ids``,
+        or None when the index is not built or more than max_ids places
+        match (the caller then filters in SQL)"""
+        if not self.ready:
+            return None
+        with self._lock:
+            bitmaps = self._bitmaps
+            result = None
+            for amenity_id in dict.fromkeys(amenity_ids):
+                bitmap = bitmaps.bitmap(amenity_id)
+                result = bitmap if result is None else result & bitmap
+                if not result:
+                    return []
+        if result is None or result.bit_count() > self.max_ids:
+            return None
+        # Positions are only ever appended, so the list needs no lock
+        return [bitmaps.place_ids[position]
+                for position in bit_positions(result)]
+
+    def set_place(self, place_id: str, amenity_ids) -> None:
+        """Record the amenities a place has after a committed write"""
+        if self.ready:
+            with self._lock:
+                self._bitmaps.set(place_id, frozenset(amenity_ids))
+
+    def remove_place(self, place_id: str) -> None:
+        self.set_place(place_id, ())
+
+    def remove_amenity(self, amenity_id: str) -> None:
+        if self.ready:
+            with self._lock:
+                self._bitmaps.remove_amenity(amenity_id)
+
+    def refresh(self, session) -> None:
+        """Build the index, or re-read the places updated since the last
+        refresh. ``session`` is a Session or Connection; a refresh already
+        running in another thread or task is not waited for."""
+        if not self._refreshing.acquire(blocking=False):
+            return
+        try:
+            if self._bitmaps is None:
+                self._build(session)
+            else:
+                self._update(session)
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+        finally:
+            self._refreshing.release()
+
+    def _build(self, session) -> None:
+        """Load every link into new bitmaps, swapped in once complete so
+        queries are not held up meanwhile"""
+        high_water = session.scalar(select(func.max(Place.updated_at)))
+        rows = session.execute(
+            select(place_amenity.c.place_id, place_amenity.c.amenity_id)
+            .order_by(place_amenity.c.place_id)
+        )
+        bitmaps = PlaceBitmaps()
+        for place_id, links in itertools.groupby(rows, key=lambda row: row[0]):
+            bitmaps.set(place_id, frozenset(row[1] for row in links))
+        with self._lock:
+            self._bitmaps = bitmaps
+            self._high_water = high_water or datetime.min + REFRESH_LOOKBACK
+
+    def _update(self, session) -> None:
+        updated = session.execute(
+            select(Place.id, Place.updated_at).where(
+                Place.updated_at >= self._high_water - REFRESH_LOOKBACK)
+        ).all()
+        links = {place_id: set() for place_id, _ in updated}
+        for start in range(0, len(updated), REFRESH_BATCH_SIZE):
+            batch = [place_id for place_id, _
+                     in updated[start:start + REFRESH_BATCH_SIZE]]
+            for place_id, amenity_id in session.execute(
+                    select(place_amenity.c.place_id,
+                           place_amenity.c.amenity_id)
+                    .where(place_amenity.c.place_id.in_(batch))):
+                links[place_id].add(amenity_id)
+        # Amenities deleted elsewhere leave no updated place behind
+        existing = set(session.scalars(select(Amenity.id)))
+
+        with self._lock:
+            for place_id, amenity_ids in links.items():
+                self._bitmaps.set(place_id, frozenset(amenity_ids))
+            for amenity_id in self._bitmaps.amenity_ids() - existing:
+                self._bitmaps.remove_amenity(amenity_id)
+            if updated:
+                self._high_water = max(self._high_water,
+                                       max(row[1] for row in updated))
+
+
+amenity_index = AmenityIndex()
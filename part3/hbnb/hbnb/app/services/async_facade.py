@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+async_facade.py - Read side of HBnBFacade on an async engine.
+
+Used by the ASGI entry point (app/asgi.py) for the public GET endpoints.
+The methods have the same names, arguments and return values as their
+HBnBFacade counterparts and run the same statements; they are coroutines
+and every relationship the serializers touch is eager loaded, since lazy
+loads cannot run under asyncio. Writes stay on the synchronous facade.
+"""
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_scoped_session, async_sessionmaker
+
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.repositories.async_repository import AsyncRepository
+from app.repositories.place_repository import select_place_version
+from app.repositories.review_repository import select_review_version
+from app.services.amenity_index import amenity_index
+from app.services.facade import (
+    place_criteria, place_graph_options, review_graph_options
+)
+
+
+class AsyncHBnBFacade:
+    def __init__(self, engine) -> None:
+        self.engine = engine
+        # One session per asyncio task, i.e. per request
+        self.session = async_scoped_session(
+            async_sessionmaker(engine, expire_on_commit=False),
+            scopefunc=asyncio.current_task
+        )
+        self.places_repo = AsyncRepository(Place, self.session)
+        self.reviews_repo = AsyncRepository(Review, self.session)
+        self.amenities_repo = AsyncRepository(Amenity, self.session)
+
+    async def remove_session(self) -> None:
+        """Close the current task's session; called after each request"""
+        await self.session.remove()
+
+    # ---------- Places ----------
+    async def get_place(self, place_id: str) -> Place | None:
+        return await self.places_repo.get(
+            place_id, options=place_graph_options(batched=True))
+
+    async def get_place_version(self, place_id: str):
+        """Version parts of a place's serialized graph, or None if missing"""
+        return await self.places_repo.one_or_none(
+            select_place_version(place_id))
+
+    async def place_exists(self, place_id: str) -> bool:
+        """Check a place id without loading its relationships"""
+        return await self.places_repo.get(place_id) is not None
+
+    async def get_all_places(self, fields=None, **filters):
+        """Get all places; see HBnBFacade.get_all_places"""
+        await self._refresh_amenity_index(filters)
+        return await self.places_repo.list(
+            options=place_graph_options(fields, batched=True),
+            criteria=place_criteria(**filters)
+        )
+
+    async def get_places_page(self, limit: int, cursor: str | None = None,
+                              fields=None, **filters):
+        """Return (places, next_cursor) for one keyset page"""
+        await self._refresh_amenity_index(filters)
+        return await self.places_repo.page(
+            limit, cursor,
+            options=place_graph_options(fields, batched=True),
+            criteria=place_criteria(**filters)
+        )
+
+    async def _refresh_amenity_index(self, filters) -> None:
+        """HBnBFacade._refresh_amenity_index, with the queries awaited"""
+        if filters.get('amenities') and amenity_index.due():
+            await self.session().run_sync(amenity_index.refresh)
+
+    # ---------- Reviews ----------
+    async def get_review(self, review_id: str) -> Review | None:
+        return await self.reviews_repo.get(
+            review_id, options=review_graph_options())
+
+    async def get_review_version(self, review_id: str):
+        """Version parts of a serialized review, or None if missing"""
+        return await self.reviews_repo.one_or_none(
+            select_review_version(review_id))
+
+    async def get_all_reviews(self):
+        return await self.reviews_repo.list(options=review_graph_options())
+
+    async def get_reviews_page(self, limit: int, cursor: str | None = None):
+        """Return (reviews, next_cursor) for one keyset page"""
+        return await self.reviews_repo.page(
+            limit, cursor, options=review_graph_options()
+        )
+
+    async def get_reviews_by_place(self, place_id: str):
+        """Get the reviews of one place, oldest first"""
+        return await self.reviews_repo.list(
+            options=review_graph_options(),
+            order_by=(Review.created_at, Review.id),
+            place_id=place_id
+        )
+
+    async def get_reviews_by_place_page(self, place_id: str, limit: int,
+                                        cursor: str | None = None):
+        """Return (reviews, next_cursor) for one page of a place's reviews"""
+        return await self.reviews_repo.page(
+            limit, cursor, options=review_graph_options(), place_id=place_id
+        )
+
+    # ---------- Amenities ----------
+    async def get_amenity(self, amenity_id: str):
+        """Get amenity by ID"""
+        return await self.amenities_repo.get(amenity_id)
+
+    async def get_all_amenities(self):
+        """Get all amenities"""
+        return await self.amenities_repo.list()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+cache.py - Small in-process caches shared by the facade and the API.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe mapping that evicts the least recently used key once
+    ``maxsize`` entries are stored. With ``ttl`` (seconds), entries also
+    expire that long after they were set."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        expires = None
+        if self.ttl is not None:
+            expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ResponseCache:
+    """Cache of serialized GET responses, invalidated by tag.
+
+    Each entry is stored under the request path + query string and tagged
+    with the entities it was built from (e.g. ``places``, ``place:<id>``).
+    The facade invalidates tags after each write. A generation counter
+    guards the race where a response computed before a write would be
+    stored after that write's invalidation.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._entries = LRUCache(0)
+        self._tags = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def init_app(self, app) -> None:
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self._entries = LRUCache(
+            app.config.get('RESPONSE_CACHE_SIZE', 512),
+            ttl=app.config.get('RESPONSE_CACHE_TTL', 30),
+        )
+        with self._lock:
+            self._tags = {}
+            self.hits = self.misses = self.invalidations = 0
+
+    def get(self, key):
+        value = self._entries.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value, tags, generation: int) -> bool:
+        """Store ``value`` unless something was invalidated since
+        ``generation`` was read (the value may then be stale)"""
+        with self._lock:
+            if generation != self.generation:
+                return False
+            self._entries.set(key, value)
+            for tag in tags:
+                keys = self._tags.setdefault(tag, set())
+                keys.add(key)
+                if len(keys) > 2 * self._entries.maxsize:
+                    # Drop keys the LRU has already evicted
+                    keys.intersection_update(
+                        k for k in list(keys) if k in self._entries
+                    )
+        return True
+
+    def invalidate(self, *tags) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._entries.pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._tags = {}
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+            }
+
+
+response_cache = ResponseCache()
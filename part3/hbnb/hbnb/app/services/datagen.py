@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+datagen.py - Deterministic synthetic data for load and capacity testing.
+
+The same counts and seed always produce the same rows, ids included, so a
+benchmark database can be rebuilt on every run and compared across runs.
+Distributions aim to look like a real listings site:
+
+- places are clustered around a weighted list of cities;
+- prices are log-normal (most places are cheap, a long tail is not);
+- reviews pick their place from a Zipf distribution over a shuffled
+  popularity ranking, so a few places collect most of the reviews;
+- ratings lean towards 4 and 5 stars.
+
+Rows are generated lazily and bulk-loaded with one executemany INSERT per
+chunk, so memory stays bounded by the chunk size (plus the Zipf table,
+two entries per place).
+"""
+import bisect
+import itertools
+import math
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import bcrypt
+from sqlalchemy import func, insert, select, update
+
+from app import geo
+from app.extensions import db
+from app.models.amenity import Amenity, place_amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.repositories.search_repository import SearchRepository
+
+CHUNK_SIZE = 10000
+# Every generated user logs in with this password
+PASSWORD = 'password'
+START = datetime(2024, 1, 1)
+PERIOD_SECONDS = 2 * 365 * 24 * 3600
+
+PRICE_MEDIAN = 90
+PRICE_SIGMA = 0.7
+ZIPF_EXPONENT = 1.1
+# Weights of ratings 1..5
+RATING_WEIGHTS = (4, 6, 14, 36, 40)
+MAX_AMENITIES_PER_PLACE = 8
+
+# (city, country, latitude, longitude, weight, spread in degrees)
+CITIES = (
+    ('Paris', 'France', 48.8566, 2.3522, 10, 0.08),
+    ('London', 'United Kingdom', 51.5074, -0.1278, 10, 0.10),
+    ('New York', 'United States', 40.7128, -74.0060, 10, 0.10),
+    ('Tokyo', 'Japan', 35.6762, 139.6503, 8, 0.12),
+    ('Barcelona', 'Spain', 41.3874, 2.1686, 6, 0.05),
+    ('Rome', 'Italy', 41.9028, 12.4964, 6, 0.06),
+    ('Lisbon', 'Portugal', 38.7223, -9.1393, 4, 0.05),
+    ('Berlin', 'Germany', 52.5200, 13.4050, 5, 0.08),
+    ('Marrakesh', 'Morocco', 31.6295, -7.9811, 3, 0.05),
+    ('Dubai', 'United Arab Emirates', 25.2048, 55.2708, 4, 0.10),
+    ('Riyadh', 'Saudi Arabia', 24.7136, 46.6753, 3, 0.10),
+    ('Cairo', 'Egypt', 30.0444, 31.2357, 3, 0.08),
+    ('Sydney', 'Australia', -33.8688, 151.2093, 4, 0.10),
+    ('Rio de Janeiro', 'Brazil', -22.9068, -43.1729, 4, 0.08),
+    ('Mexico City', 'Mexico', 19.4326, -99.1332, 4, 0.10),
+    ('Cape Town', 'South Africa', -33.9249, 18.4241, 3, 0.06),
+    ('Bangkok', 'Thailand', 13.7563, 100.5018, 4, 0.10),
+    ('Reykjavik', 'Iceland', 64.1466, -21.9426, 1, 0.04),
+)
+AMENITIES = (
+    'WiFi', 'Kitchen', 'Air conditioning', 'Heating', 'Washer', 'Dryer',
+    'Free parking', 'Pool', 'Hot tub', 'Gym', 'TV', 'Workspace',
+    'Breakfast', 'Pets allowed', 'Balcony', 'Sea view', 'Elevator',
+    'Fireplace', 'EV charger', 'Crib',
+)
+FIRST_NAMES = ('Ahmed', 'Sara', 'John', 'Mei', 'Lucas', 'Fatima', 'Olga',
+               'Ravi', 'Ana', 'Kenji', 'Amina', 'Tom', 'Leila', 'Diego')
+LAST_NAMES = ('Smith', 'Haddad', 'Garcia', 'Tanaka', 'Müller', 'Rossi',
+              'Silva', 'Khan', 'Dubois', 'Kowalski', 'Nguyen', 'Ali')
+ADJECTIVES = ('Cozy', 'Sunny', 'Modern', 'Quiet', 'Spacious', 'Charming',
+              'Rustic', 'Bright', 'Stylish', 'Central')
+KINDS = ('studio', 'loft', 'apartment', 'house', 'villa', 'room',
+         'cottage', 'penthouse')
+REVIEW_TEXTS = {
+    1: ('Would not stay again.', 'Dirty and noisy.'),
+    2: ('Not as described.', 'Disappointing stay.'),
+    3: ('It was fine.', 'Average place, good location.'),
+    4: ('Nice place, would recommend.', 'Comfortable and clean.'),
+    5: ('Perfect stay!', 'Amazing host and location.'),
+}
+
+# Distinct salts keep ids of different tables apart
+_SALTS = {'users': 1, 'amenities': 2, 'places': 3, 'reviews': 4}
+_MIX = 0x9E3779B97F4A7C15
+
+
+def make_id(kind: str, index: int) -> str:
+    """Deterministic, unique, random-looking UUID4 for row ``index``.
+
+    Multiplying by an odd constant is a bijection modulo 2**62, so ids
+    never collide; the salt lives above the version bits.
+    """
+    mixed = (index * _MIX) & ((1 << 62) - 1)
+    return str(uuid.UUID(int=(_SALTS[kind] << 80) | mixed, version=4))
+
+
+def _timestamp(rng) -> datetime:
+    return START + timedelta(seconds=rng.randrange(PERIOD_SECONDS))
+
+
+def _users(count, rng, password_hash):
+    for i in range(count):
+        created = _timestamp(rng)
+        yield {
+            'id': make_id('users', i),
+            'email': f'user{i}@example.com',
+            'password': password_hash,
+            'first_name': rng.choice(FIRST_NAMES),
+            'last_name': rng.choice(LAST_NAMES),
+            'is_admin': False,
+            'created_at': created,
+            'updated_at': created,
+        }
+
+
+def _amenities():
+    for i, name in enumerate(AMENITIES):
+        yield {'id': make_id('amenities', i), 'name': name,
+               'created_at': START, 'updated_at': START}
+
+
+def _places(count, user_count, rng):
+    city_weights = list(itertools.accumulate(city[4] for city in CITIES))
+    mu = math.log(PRICE_MEDIAN)
+    for i in range(count):
+        city, country, lat, lon, _, spread = rng.choices(
+            CITIES, cum_weights=city_weights)[0]
+        latitude = max(-90.0, min(90.0, rng.gauss(lat, spread)))
+        longitude = max(-180.0, min(180.0, rng.gauss(lon, spread)))
+        created = _timestamp(rng)
+        yield {
+            'id': make_id('places', i),
+            'title': f'{rng.choice(ADJECTIVES)} {rng.choice(KINDS)} '
+                     f'in {city}',
+            'description': f'A place to stay in {city}, {country}.',
+            'price': max(10, min(10000, round(rng.lognormvariate(
+                mu, PRICE_SIGMA)))),
+            'latitude': latitude,
+            'longitude': longitude,
+            'country': country,
+            'geohash': geo.encode(latitude, longitude),
+            'review_count': 0,
+            'rating_sum': 0,
+            'avg_rating': None,
+            'owner_id': make_id('users', rng.randrange(user_count)),
+            'created_at': created,
+            'updated_at': created,
+        }
+
+
+def _place_amenities(place_count, rng):
+    amenity_ids = [make_id('amenities', i) for i in range(len(AMENITIES))]
+    for i in range(place_count):
+        place_id = make_id('places', i)
+        for amenity_id in rng.sample(
+                amenity_ids, rng.randint(0, MAX_AMENITIES_PER_PLACE)):
+            yield {'place_id': place_id, 'amenity_id': amenity_id}
+
+
+def _reviews(count, place_count, user_count, rng):
+    if not count:
+        return
+    # Zipf weights by popularity rank; ranks map to places through a
+    # seeded permutation so popular places are spread over the id space
+    zipf = list(itertools.accumulate(
+        1.0 / (rank ** ZIPF_EXPONENT) for rank in range(1, place_count + 1)))
+    total = zipf[-1]
+    ranking = list(range(place_count))
+    rng.shuffle(ranking)
+    rating_weights = list(itertools.accumulate(RATING_WEIGHTS))
+    rating_total = rating_weights[-1]
+    for i in range(count):
+        rank = min(bisect.bisect(zipf, rng.random() * total), place_count - 1)
+        rating = bisect.bisect(rating_weights,
+                               rng.random() * rating_total) + 1
+        created = _timestamp(rng)
+        yield {
+            'id': make_id('reviews', i),
+            'text': rng.choice(REVIEW_TEXTS[rating]),
+            'rating': rating,
+            'place_id': make_id('places', ranking[rank]),
+            'user_id': make_id('users', rng.randrange(user_count)),
+            'created_at': created,
+            'updated_at': created,
+        }
+
+
+def _load(table, rows, chunk_size) -> int:
+    count = 0
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return count
+        db.session.execute(insert(table), chunk)
+        db.session.commit()
+        count += len(chunk)
+
+
+def _rate_places() -> None:
+    """Set every place's rating aggregates from its reviews in one UPDATE,
+    keeping updated_at as generated"""
+    count = select(func.count(Review.id)).where(
+        Review.place_id == Place.id).scalar_subquery()
+    total = select(func.coalesce(func.sum(Review.rating), 0)).where(
+        Review.place_id == Place.id).scalar_subquery()
+    average = select(func.avg(Review.rating)).where(
+        Review.place_id == Place.id).scalar_subquery()
+    db.session.execute(update(Place).values(
+        review_count=count, rating_sum=total, avg_rating=average,
+        updated_at=Place.updated_at,
+    ))
+    db.session.commit()
+
+
+def generate(users: int, places: int, reviews: int, seed: int = 0,
+             chunk_size: int = CHUNK_SIZE, progress=None) -> dict:
+    """Insert ``users`` users, ``places`` places and ``reviews`` reviews
+    (plus the amenity catalogue and place/amenity links) into empty
+    tables, then rebuild the places' rating aggregates and the full-text
+    index.
+
+    ``progress`` is called with each table name once it is loaded.
+    Returns rows inserted per table.
+
+    Raises:
+        ValueError: If places or reviews are requested without the users
+            and places they need.
+    """
+    if places and not users:
+        raise ValueError("places need at least one user")
+    if reviews and not (users and places):
+        raise ValueError("reviews need at least one user and one place")
+
+    # One random stream per table, so changing one count does not
+    # reshuffle the rows of the others
+    def rng(table):
+        return random.Random(f'{seed}:{table}')
+
+    # Hashed once: bcrypt per user would dominate the run time
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'),
+                                  bcrypt.gensalt()).decode('utf-8')
+    steps = (
+        (User.__table__, lambda: _users(users, rng('users'), password_hash)),
+        (Amenity.__table__, _amenities),
+        (Place.__table__, lambda: _places(places, users, rng('places'))),
+        (place_amenity, lambda: _place_amenities(places, rng('amenities'))),
+        (Review.__table__, lambda: _reviews(reviews, places, users,
+                                            rng('reviews'))),
+    )
+    counts = {}
+    for table, rows in steps:
+        counts[table.name] = _load(table, rows(), chunk_size)
+        if progress is not None:
+            progress(table.name)
+    _rate_places()
+    SearchRepository().rebuild()
+    db.session.commit()
+    return counts
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+dataset.py - Stream the whole dataset to and from NDJSON.
+
+Each line holds one row: ``{"table": "users", "row": {...}}``. Tables are
+written in dependency order (users, amenities, places, place_amenity,
+reviews) so an import can insert them as they come without breaking a
+foreign key. Both directions work in fixed-size chunks: export iterates
+the tables with yield_per and import sends one executemany INSERT and one
+commit per chunk, so memory stays bounded by the chunk size.
+"""
+import json
+from datetime import datetime
+
+from sqlalchemy import insert, select, tuple_
+
+from app.extensions import db
+from app.models.amenity import Amenity, place_amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+CHUNK_SIZE = 5000
+TABLES = (
+    User.__table__,
+    Amenity.__table__,
+    Place.__table__,
+    place_amenity,
+    Review.__table__,
+)
+TABLES_BY_NAME = {table.name: table for table in TABLES}
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _decoders(table):
+    """Per-column functions turning JSON values back into column values"""
+    return {
+        column.name: datetime.fromisoformat
+        for column in table.columns
+        if isinstance(column.type, db.DateTime)
+    }
+
+
+def export_dataset(out, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Write every row to the text stream ``out``. Returns rows per table."""
+    counts = {}
+    for table in TABLES:
+        query = select(table).order_by(*table.primary_key.columns)
+        result = db.session.execute(
+            query.execution_options(yield_per=chunk_size))
+        keys = list(result.keys())
+        count = 0
+        for rows in result.partitions():
+            out.write(''.join(
+                json.dumps({'table': table.name,
+                            'row': dict(zip(keys, map(_encode, row)))}) + '\n'
+                for row in rows
+            ))
+            count += len(rows)
+        counts[table.name] = count
+    return counts
+
+
+def _existing_keys(table, rows) -> set:
+    """Return the primary keys of ``rows`` already stored, in one query"""
+    key_columns = list(table.primary_key.columns)
+    keys = [tuple(row[c.name] for c in key_columns) for row in rows]
+    if len(key_columns) == 1:
+        column = key_columns[0]
+        found = db.session.execute(
+            select(column).where(column.in_([key[0] for key in keys])))
+    else:
+        found = db.session.execute(
+            select(*key_columns).where(tuple_(*key_columns).in_(keys)))
+    return {tuple(row) for row in found}
+
+
+def _insert_chunk(table, rows, resume: bool) -> int:
+    if resume:
+        key_columns = [c.name for c in table.primary_key.columns]
+        existing = _existing_keys(table, rows)
+        rows = [row for row in rows
+                if tuple(row[name] for name in key_columns) not in existing]
+    if rows:
+        db.session.execute(insert(table), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def import_dataset(lines, chunk_size: int = CHUNK_SIZE,
+                   resume: bool = False) -> dict:
+    """Insert the rows read from ``lines`` (an iterable of NDJSON lines).
+
+    Each chunk is committed on its own. With ``resume``, rows whose primary
+    key already exists are skipped, so an interrupted import can be run
+    again on the same file. Returns rows inserted per table.
+
+    Raises:
+        ValueError: On a malformed line or an unknown table.
+    """
+    counts = {table.name: 0 for table in TABLES}
+    table = None
+    decoders = {}
+    chunk = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            name, row = record['table'], record['row']
+        except (ValueError, KeyError, TypeError):
+            raise ValueError(f"Line {number}: not a dataset record")
+        if name not in TABLES_BY_NAME:
+            raise ValueError(f"Line {number}: unknown table {name}")
+        if table is None or name != table.name:
+            if chunk:
+                counts[table.name] += _insert_chunk(table, chunk, resume)
+                chunk = []
+            table = TABLES_BY_NAME[name]
+            decoders = _decoders(table)
+        for key, decode in decoders.items():
+            if row.get(key) is not None:
+                row[key] = decode(row[key])
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            counts[table.name] += _insert_chunk(table, chunk, resume)
+            chunk = []
+    if chunk:
+        counts[table.name] += _insert_chunk(table, chunk, resume)
+    return counts
@@ -1,20 +1,284 @@
 #!/usr/bin/env python3
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
-from app.repositories.sqlalchemy_repository import SQLAlchemyRepository
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import joinedload, load_only, selectinload, subqueryload
+from app import geo
+from app.extensions import db
+from app.nplusone import query_detector
+from app.repositories.sqlalchemy_repository import (
+    UNIT_OF_WORK_KEY, SQLAlchemyRepository
+)
+from app.repositories.place_repository import PlaceRepository
+from app.repositories.review_repository import ReviewRepository
+from app.repositories.search_repository import SearchRepository
+from app.repositories.user_repository import UserRepository
+from app.services.amenity_index import amenity_index
+from app.services.cache import LRUCache, response_cache
 from app.models.review import Review
 from app.models.place import Place
-from app.models.user import User
-from app.models.amenity import Amenity
+from app.models.user import User, normalize_email
+from app.models.amenity import Amenity, place_amenity
+
+
+def place_graph_options(fields=None, batched=False):
+    """Loader options used to serialize places with Place.to_dict().
+
+    Many-to-one links are joined and collections are loaded with one
+    subquery each, so a list of places costs a fixed number of queries
+    whatever its size (selectinload would batch the IN list per 500 rows).
+
+    With ``fields``, the SELECT is narrowed to the requested columns and
+    only the requested relationships are loaded. ``batched`` loads the
+    collections with selectinload instead, which works with yield_per and
+    costs one query per collection per batch.
+    """
+    collection_load = selectinload if batched else subqueryload
+    if fields is None:
+        wanted = set(Place.RELATIONS)
+        options = []
+    else:
+        Place.validate_fields(fields)
+        wanted = set(fields)
+        # created_at is always needed to build pagination cursors
+        columns = {'id', 'created_at'} | (wanted - set(Place.RELATIONS))
+        options = [load_only(*(getattr(Place, c) for c in sorted(columns)))]
+    if 'owner' in wanted:
+        options.append(joinedload(Place.owner))
+    if 'amenities' in wanted:
+        options.append(collection_load(Place.amenities))
+    if 'reviews' in wanted:
+        options.append(
+            collection_load(Place.reviews).joinedload(Review.user))
+    return tuple(options)
+
+
+def geohash_criteria(cells):
+    """Match places whose geohash starts with one of ``cells``.
+
+    Each prefix is expressed as a range so it is served by ix_places_geohash.
+    """
+    return or_(*(
+        and_(Place.geohash >= cell, Place.geohash < cell + geo.PREFIX_END)
+        for cell in cells
+    ))
+
+
+def amenity_criteria(amenity_ids):
+    """Match places that have every amenity of ``amenity_ids``.
+
+    The ids of the matching places come from amenity_index when it is
+    built and they are few enough; otherwise each amenity becomes an
+    EXISTS probe on the place_amenity primary key.
+    """
+    place_ids = amenity_index.place_ids(amenity_ids)
+    if place_ids is not None:
+        return (Place.id.in_(place_ids),)
+    return tuple(
+        exists().where(place_amenity.c.place_id == Place.id,
+                       place_amenity.c.amenity_id == amenity_id)
+        for amenity_id in dict.fromkeys(amenity_ids)
+    )
+
+
+def place_criteria(min_price=None, max_price=None, bbox=None,
+                   amenities=None):
+    """SQL filters for the place list.
+
+    The price range uses ix_places_price. ``bbox`` is
+    (min_lat, min_lon, max_lat, max_lon): the covering geohash cells narrow
+    the scan through ix_places_geohash, then the exact bounds are checked.
+    ``amenities`` is a list of amenity ids, see amenity_criteria().
+    """
+    criteria = []
+    if amenities:
+        criteria.extend(amenity_criteria(amenities))
+    if bbox is not None:
+        min_lat, min_lon, max_lat, max_lon = bbox
+        cells = geo.bbox_cells(min_lat, min_lon, max_lat, max_lon)
+        if cells:
+            criteria.append(geohash_criteria(cells))
+        criteria.append(Place.latitude.between(min_lat, max_lat))
+        criteria.append(Place.longitude.between(min_lon, max_lon))
+    if min_price is not None:
+        criteria.append(Place.price >= min_price)
+    if max_price is not None:
+        criteria.append(Place.price <= max_price)
+    return tuple(criteria)
+
+
+# Largest array accepted by the bulk create methods
+BULK_MAX_ITEMS = 1000
+
+
+def _number(item: dict, name: str, required: bool = True):
+    value = item.get(name)
+    if value is None:
+        if required:
+            raise ValueError(f'{name} is required')
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f'{name} must be a number')
+    return value
+
+
+def _text(item: dict, name: str, required: bool = True):
+    value = item.get(name)
+    if value is None and not required:
+        return None
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f'{name} is required')
+    return value.strip()
+
+
+def clean_place_data(item) -> dict:
+    """Validate one bulk place item and return its column values"""
+    if not isinstance(item, dict):
+        raise ValueError('Item must be an object')
+    row = {
+        'title': _text(item, 'title'),
+        'description': _text(item, 'description', required=False),
+        'country': _text(item, 'country', required=False),
+        'price': _number(item, 'price'),
+        'latitude': _number(item, 'latitude'),
+        'longitude': _number(item, 'longitude'),
+    }
+    if row['price'] < 0:
+        raise ValueError('price must not be negative')
+    if not -90 <= row['latitude'] <= 90:
+        raise ValueError('latitude must be between -90 and 90')
+    if not -180 <= row['longitude'] <= 180:
+        raise ValueError('longitude must be between -180 and 180')
+    return row
+
+
+def clean_rating(value) -> int:
+    """Validate a review rating and return it as an int from 1 to 5;
+    integer strings such as "5" are accepted"""
+    if value is None:
+        raise ValueError('rating is required')
+    if isinstance(value, str):
+        try:
+            value = int(value.strip())
+        except ValueError:
+            raise ValueError(
+                'rating must be an integer between 1 and 5') from None
+    if isinstance(value, bool) or value not in (1, 2, 3, 4, 5):
+        raise ValueError('rating must be an integer between 1 and 5')
+    return int(value)
+
+
+def clean_review_data(item) -> dict:
+    """Validate one bulk review item and return its column values"""
+    if not isinstance(item, dict):
+        raise ValueError('Item must be an object')
+    row = {
+        'text': _text(item, 'text'),
+        'rating': clean_rating(_number(item, 'rating')),
+        'place_id': _text(item, 'place_id'),
+    }
+    return row
+
+
+def clean_amenity_data(item) -> dict:
+    """Validate one bulk amenity item and return its column values"""
+    if not isinstance(item, dict):
+        raise ValueError('Item must be an object')
+    return {'name': _text(item, 'name')}
+
+
+def _check_bulk_size(items) -> None:
+    if not isinstance(items, list) or not items:
+        raise ValueError('Expected a non-empty array')
+    if len(items) > BULK_MAX_ITEMS:
+        raise ValueError(f'At most {BULK_MAX_ITEMS} items per request')
+
+
+def _clean_all(items, clean) -> tuple:
+    """Run ``clean`` on every item; return (rows, per-item errors)"""
+    rows, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            rows.append(clean(item))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+    return rows, errors
+
+
+def _stamp(rows: list) -> None:
+    """Give bulk rows the id and timestamps the ORM would have set"""
+    now = datetime.utcnow()
+    for row in rows:
+        row['id'] = str(uuid.uuid4())
+        row['created_at'] = now
+        row['updated_at'] = now
+
+
+def review_graph_options():
+    """Loader options used to serialize reviews with Review.to_dict()."""
+    return (joinedload(Review.user),)
+
+
+# Number of email -> user id entries kept for the login path
+USER_EMAIL_CACHE_SIZE = 1024
+# Session.info key collecting cache tags to invalidate after the commit
+PENDING_TAGS_KEY = "unit_of_work_cache_tags"
+# Rows fetched per round trip when streaming a collection
+STREAM_BATCH_SIZE = 200
+# Place columns copied into the full-text index
+SEARCHED_PLACE_FIELDS = frozenset(('title', 'description'))
 
 
 class HBnBFacade:
     def __init__(self) -> None:
         # استخدام SQLAlchemy بدلاً من InMemory
-        self.users_repo = SQLAlchemyRepository(User)
-        self.places_repo = SQLAlchemyRepository(Place)
-        self.reviews_repo = SQLAlchemyRepository(Review)
+        self.users_repo = UserRepository()
+        self.user_ids_by_email = LRUCache(USER_EMAIL_CACHE_SIZE)
+        self.places_repo = PlaceRepository()
+        self.reviews_repo = ReviewRepository()
         self.amenities_repo = SQLAlchemyRepository(Amenity)
+        self.search_repo = SearchRepository()
+        self.session = db.session
+
+    @contextmanager
+    def unit_of_work(self):
+        """Run several repository writes as one transaction.
+
+        Inside the block repository writes only stage their changes; the
+        outermost block commits once when it exits and rolls back if an
+        exception escapes. Nested blocks join the enclosing transaction.
+        Response-cache invalidations are held back until after the commit
+        so a concurrent reader cannot re-cache the old rows.
+        """
+        info = self.session.info
+        depth = info.get(UNIT_OF_WORK_KEY, 0)
+        outermost = depth == 0
+        if outermost:
+            info[PENDING_TAGS_KEY] = set()
+        info[UNIT_OF_WORK_KEY] = depth + 1
+        try:
+            yield self
+            if outermost:
+                self.session.commit()
+        except BaseException:
+            if outermost:
+                self.session.rollback()
+            raise
+        finally:
+            info[UNIT_OF_WORK_KEY] = depth
+            tags = info.pop(PENDING_TAGS_KEY, ()) if outermost else ()
+        if tags:
+            response_cache.invalidate(*tags)
+
+    def _invalidate(self, *tags) -> None:
+        """Invalidate cached responses now, or after the open unit of work
+        commits"""
+        pending = self.session.info.get(PENDING_TAGS_KEY)
+        if pending is not None and self.session.info.get(UNIT_OF_WORK_KEY):
+            pending.update(tags)
+        else:
+            response_cache.invalidate(*tags)
 
     # ---------- Users ----------
     def create_user(self, data: dict) -> User:
@@ -25,102 +289,495 @@ class HBnBFacade:
         user.updated_at = datetime.utcnow()
         if 'password' in data:
             user.hash_password(data['password'])
-        self.users_repo.add(user)
+        with self.unit_of_work():
+            self.users_repo.add(user)
         return user
 
     def get_user(self, user_id: str) -> User | None:
         return self.users_repo.get(user_id)
 
     def get_user_by_email(self, email: str) -> User | None:
-        """Get user by email address"""
-        users = self.users_repo.list(email=email.lower().strip())
-        return users[0] if users else None
+        """Get user by email address
+
+        A cached id is resolved with a primary-key lookup; otherwise the
+        unique email index is probed and the id remembered. Either way a
+        single query is issued.
+        """
+        email = normalize_email(email)
+        user_id = self.user_ids_by_email.get(email)
+        if user_id is not None:
+            user = self.users_repo.get(user_id)
+            if user is not None and user.email == email:
+                return user
+            # Stale entry (user deleted or email changed elsewhere)
+            self.user_ids_by_email.pop(email)
+
+        user = self.users_repo.get_by_email(email)
+        if user is not None:
+            self.user_ids_by_email.set(email, user.id)
+        return user
 
     def get_all_users(self):
         return self.users_repo.list()
 
+    def get_users_page(self, limit: int, cursor: str | None = None):
+        """Return (users, next_cursor) for one keyset page"""
+        return self.users_repo.page(limit, cursor)
+
+    def stream_users(self, batch_size: int = STREAM_BATCH_SIZE):
+        """Iterate over every user, ``batch_size`` rows at a time"""
+        return self.users_repo.stream(batch_size)
+
     def update_user(self, user_id: str, data: dict) -> User | None:
         """Update user data"""
-        return self.users_repo.update(user_id, data)
+        user = self.users_repo.get(user_id)
+        if user is None:
+            return None
+        self.user_ids_by_email.pop(user.email)
+        with self.unit_of_work():
+            updated = self.users_repo.update(user, data)
+            # Owner and reviewer names are embedded in place/review responses
+            self._invalidate_user_responses(user)
+        return updated
 
     def delete_user(self, user_id: str) -> bool:
         """Delete user by ID"""
-        return self.users_repo.delete(user_id)
+        user = self.users_repo.get(user_id)
+        if user is None:
+            return False
+        self.user_ids_by_email.pop(user.email)
+        with self.unit_of_work():
+            self._invalidate('places', 'reviews', *self._user_place_tags(user))
+            # Their places and reviews are deleted with them
+            place_ids = [place.id for place in user.places]
+            self.search_repo.remove_places(place_ids)
+            self.search_repo.remove_reviews(
+                review.id for review in user.reviews)
+            self.users_repo.delete(user)
+        for place_id in place_ids:
+            amenity_index.remove_place(place_id)
+        return True
+
+    def _user_place_tags(self, user: User) -> list:
+        """Cache tags of the places a user owns or reviewed"""
+        place_ids = {place.id for place in user.places}
+        place_ids.update(review.place_id for review in user.reviews)
+        return [f'place:{place_id}' for place_id in place_ids]
+
+    def _invalidate_user_responses(self, user: User) -> None:
+        self._invalidate('places', 'reviews', *self._user_place_tags(user))
 
     # ---------- Places ----------
     def create_place(self, data: dict) -> Place:
-        place = Place(**data)
-        place.id = str(uuid.uuid4())
-        place.created_at = datetime.utcnow()
-        place.updated_at = datetime.utcnow()
-        self.places_repo.add(place)
+        """Create a place; ``amenities`` may list amenity ids (or objects
+        with an ``id``) to attach in the same transaction.
+
+        Raises:
+            ValueError: If a field is invalid or an amenity does not exist.
+        """
+        data = dict(data)
+        amenity_refs = data.pop('amenities', None)
+        with self.unit_of_work():
+            place = Place(**data)
+            place.id = str(uuid.uuid4())
+            place.created_at = datetime.utcnow()
+            place.updated_at = datetime.utcnow()
+            self.places_repo.add(place)
+            if amenity_refs:
+                place.amenities = self._resolve_amenities(amenity_refs)
+            amenity_ids = [amenity.id for amenity in place.amenities]
+            self.search_repo.index_places([place])
+            self._invalidate('places')
+        amenity_index.set_place(place.id, amenity_ids)
         return place
 
+    def _resolve_amenities(self, refs) -> list:
+        """Load the amenities named by ids or {id: ...} objects in one query"""
+        if not isinstance(refs, list):
+            raise ValueError("amenities must be a list")
+        ids = [ref.get('id') if isinstance(ref, dict) else ref
+               for ref in refs]
+        if not all(isinstance(amenity_id, str) for amenity_id in ids):
+            raise ValueError("amenities must be ids")
+        found = {amenity.id: amenity for amenity in self.amenities_repo.list(
+            criteria=[Amenity.id.in_(set(ids))])}
+        missing = [amenity_id for amenity_id in ids
+                   if amenity_id not in found]
+        if missing:
+            raise ValueError(f"Amenity {missing[0]} not found")
+        return [found[amenity_id] for amenity_id in dict.fromkeys(ids)]
+
     def get_place(self, place_id: str) -> Place | None:
-        return self.places_repo.get(place_id)
+        return self.places_repo.get(place_id, options=place_graph_options())
+
+    def get_place_version(self, place_id: str):
+        """Version parts of a place's serialized graph, or None if missing"""
+        return self.places_repo.version(place_id)
+
+    def place_exists(self, place_id: str) -> bool:
+        """Check a place id without loading its relationships"""
+        return self.places_repo.get(place_id) is not None
+
+    def get_all_places(self, fields=None, **filters):
+        """Get all places; ``fields`` limits the columns and relationships
+        loaded (raises ValueError for unknown names) and ``filters`` are
+        passed to place_criteria()"""
+        self._refresh_amenity_index(filters)
+        return self.places_repo.list(
+            options=place_graph_options(fields),
+            criteria=place_criteria(**filters)
+        )
+
+    def get_places_page(self, limit: int, cursor: str | None = None,
+                        fields=None, **filters):
+        """Return (places, next_cursor) for one keyset page"""
+        self._refresh_amenity_index(filters)
+        return self.places_repo.page(
+            limit, cursor,
+            options=place_graph_options(fields),
+            criteria=place_criteria(**filters)
+        )
+
+    def stream_places(self, fields=None, batch_size: int = STREAM_BATCH_SIZE,
+                      **filters):
+        """Iterate over every matching place, ``batch_size`` rows at a time.
 
-    def get_all_places(self):
-        return self.places_repo.list()
+        Arguments are checked before the first row is fetched, so an
+        invalid ``fields`` raises ValueError here rather than mid-stream.
+        """
+        self._refresh_amenity_index(filters)
+        return self.places_repo.stream(
+            batch_size,
+            options=place_graph_options(fields, batched=True),
+            criteria=place_criteria(**filters)
+        )
+
+    def _refresh_amenity_index(self, filters) -> None:
+        """Build or top up the amenity index before a filtered query"""
+        if filters.get('amenities') and amenity_index.due():
+            amenity_index.refresh(self.session)
+
+    def get_places_nearby(self, latitude: float, longitude: float,
+                          radius_km: float, limit: int, fields=None):
+        """Return [(place, distance_km)] within ``radius_km``, nearest first.
+
+        Candidates come from the geohash cells around the point as bare
+        coordinates; the exact haversine distance is only computed for
+        those rows, and only the ``limit`` nearest places are loaded.
+        """
+        cells = geo.nearby_cells(latitude, longitude, radius_km)
+        criteria = [Place.geohash.isnot(None)]
+        if cells:
+            criteria.append(geohash_criteria(cells))
+        matches = []
+        for place_id, place_lat, place_lon in self.places_repo.coordinates(
+                criteria):
+            distance = geo.haversine_km(latitude, longitude,
+                                        place_lat, place_lon)
+            if distance <= radius_km:
+                matches.append((distance, place_id))
+        matches.sort()
+        matches = matches[:limit]
+        if not matches:
+            return []
+        places = {place.id: place for place in self.places_repo.list(
+            options=place_graph_options(fields),
+            criteria=[Place.id.in_([place_id for _, place_id in matches])]
+        )}
+        return [(places[place_id], distance) for distance, place_id
+                in matches if place_id in places]
+
+    def create_places_bulk(self, items: list, owner_id: str) -> tuple:
+        """Validate and insert many places owned by ``owner_id`` in one
+        transaction. Returns (ids, errors); if any item is invalid nothing
+        is inserted and errors lists {index, error} per bad item.
+
+        Raises:
+            ValueError: If ``items`` is empty, not a list or too long.
+        """
+        _check_bulk_size(items)
+        rows, errors = _clean_all(items, clean_place_data)
+        if errors:
+            return [], errors
+        _stamp(rows)
+        for row in rows:
+            # Mapper events do not run for executemany inserts
+            row['owner_id'] = owner_id
+            row['geohash'] = geo.encode(row['latitude'], row['longitude'])
+            row['review_count'] = 0
+            row['rating_sum'] = 0
+        with self.unit_of_work():
+            self.places_repo.add_many(rows)
+            self.search_repo.index_places(rows)
+            self._invalidate('places')
+        return [row['id'] for row in rows], []
 
     def update_place(self, place_id: str, data: dict) -> Place | None:
         """Update place data"""
-        return self.places_repo.update(place_id, data)
+        place = self.places_repo.get(place_id)
+        if place is None:
+            return None
+        data = dict(data)
+        amenity_refs = data.pop('amenities', None)
+        with self.unit_of_work():
+            updated = self.places_repo.update(place, data)
+            if amenity_refs is not None:
+                place.amenities = self._resolve_amenities(amenity_refs)
+                amenity_ids = [amenity.id for amenity in place.amenities]
+            if SEARCHED_PLACE_FIELDS & data.keys():
+                self.search_repo.index_places([place])
+            self._invalidate('places', f'place:{place_id}')
+        # The index only follows committed links
+        if amenity_refs is not None:
+            amenity_index.set_place(place_id, amenity_ids)
+        return updated
 
     def delete_place(self, place_id: str) -> bool:
         """Delete place by ID"""
-        return self.places_repo.delete(place_id)
+        place = self.places_repo.get(place_id)
+        if place is None:
+            return False
+        with self.unit_of_work():
+            self.search_repo.remove_places([place_id])
+            self.places_repo.delete(place)
+            # Its reviews are deleted with it
+            self._invalidate('places', f'place:{place_id}', 'reviews')
+        amenity_index.remove_place(place_id)
+        return True
+
+    def search_places(self, query: str, limit: int,
+                      cursor: str | None = None, reviews: bool = False,
+                      fields=None):
+        """Full-text search: return ([(place, score)], next_cursor), best
+        match first. ``reviews`` also matches the places' review texts.
+
+        Raises:
+            ValueError: If the query, cursor or ``fields`` is invalid.
+            NotImplementedError: On a database without full-text search.
+            SearchIndexMissing: If the index was never built; run
+                reindex_search.py.
+        """
+        options = place_graph_options(fields)
+        hits, next_cursor = self.search_repo.search(query, limit, cursor,
+                                                    reviews)
+        if not hits:
+            return [], next_cursor
+        places = {place.id: place for place in self.places_repo.list(
+            options=options,
+            criteria=[Place.id.in_([place_id for place_id, _ in hits])]
+        )}
+        return [(places[place_id], score) for place_id, score in hits
+                if place_id in places], next_cursor
+
+    def rebuild_search_index(self) -> int:
+        """Reindex every place and review; returns the documents written"""
+        with self.unit_of_work():
+            written = self.search_repo.rebuild()
+            self._invalidate('places')
+        return written
 
     # ---------- Reviews ----------
     def create_review(self, data: dict) -> Review:
+        # Checked before the rating reaches the place aggregates
+        data = {**data, 'rating': clean_rating(data.get('rating'))}
         review = Review(**data)
         review.id = str(uuid.uuid4())
         review.created_at = datetime.utcnow()
         review.updated_at = datetime.utcnow()
-        self.reviews_repo.add(review)
+        # The aggregate change is committed together with the review
+        with self.unit_of_work():
+            self._apply_rating(review.place_id, 1, review.rating)
+            self.reviews_repo.add(review)
+            self.search_repo.index_reviews([review])
+            self._invalidate_review_responses(review.place_id)
         return review
 
+    def create_reviews_bulk(self, items: list, user_id: str) -> tuple:
+        """Validate and insert many reviews by ``user_id`` in one
+        transaction, together with the rating aggregates of their places.
+        Returns (ids, errors) like create_places_bulk.
+        """
+        _check_bulk_size(items)
+        rows, errors = _clean_all(items, clean_review_data)
+        known = self.places_repo.existing_ids(row['place_id'] for row in rows)
+        if not errors:
+            errors = [
+                {'index': index, 'error': 'Place not found'}
+                for index, row in enumerate(rows)
+                if row['place_id'] not in known
+            ]
+        if errors:
+            return [], errors
+        _stamp(rows)
+        deltas = {}
+        for row in rows:
+            row['user_id'] = user_id
+            count, total = deltas.get(row['place_id'], (0, 0))
+            deltas[row['place_id']] = (count + 1, total + row['rating'])
+        with self.unit_of_work():
+            # Locked in id order so concurrent imports cannot deadlock;
+            # one locking read per place is deliberate
+            with query_detector.allowed():
+                for place_id in sorted(deltas):
+                    self._apply_rating(place_id, *deltas[place_id])
+            self.reviews_repo.add_many(rows)
+            self.search_repo.index_reviews(rows)
+            self._invalidate('reviews', 'places',
+                             *(f'place:{place_id}' for place_id in deltas))
+        return [row['id'] for row in rows], []
+
     def get_review(self, review_id: str) -> Review | None:
-        return self.reviews_repo.get(review_id)
+        return self.reviews_repo.get(review_id, options=review_graph_options())
+
+    def get_review_version(self, review_id: str):
+        """Version parts of a serialized review, or None if missing"""
+        return self.reviews_repo.version(review_id)
 
     def get_all_reviews(self):
-        return self.reviews_repo.get_all()
+        return self.reviews_repo.list(options=review_graph_options())
+
+    def get_reviews_page(self, limit: int, cursor: str | None = None):
+        """Return (reviews, next_cursor) for one keyset page"""
+        return self.reviews_repo.page(
+            limit, cursor, options=review_graph_options()
+        )
+
+    def stream_reviews(self, batch_size: int = STREAM_BATCH_SIZE):
+        """Iterate over every review, ``batch_size`` rows at a time"""
+        return self.reviews_repo.stream(
+            batch_size, options=review_graph_options()
+        )
 
     def update_review(self, review_id: str, data: dict) -> Review | None:
-        # لازم يكون عندك update داخل InMemoryRepository
-        return self.reviews_repo.update(review_id, data)
+        review = self.reviews_repo.get(review_id)
+        if review is None:
+            return None
+        if 'rating' in data:
+            data = {**data, 'rating': clean_rating(data['rating'])}
+        with self.unit_of_work():
+            if 'rating' in data and data['rating'] != review.rating:
+                self._apply_rating(review.place_id, 0,
+                                   data['rating'] - review.rating)
+            updated = self.reviews_repo.update(review, data)
+            if 'text' in data:
+                self.search_repo.index_reviews([review])
+            self._invalidate_review_responses(review.place_id)
+        return updated
 
     def delete_review(self, review_id: str) -> bool:
-        return self.reviews_repo.delete(review_id)
+        review = self.reviews_repo.get(review_id)
+        if review is None:
+            return False
+        with self.unit_of_work():
+            self._apply_rating(review.place_id, -1, -review.rating)
+            self.search_repo.remove_reviews([review_id])
+            self.reviews_repo.delete(review)
+            self._invalidate_review_responses(review.place_id)
+        return True
+
+    def _invalidate_review_responses(self, place_id: str) -> None:
+        # Reviews and rating aggregates are embedded in their place
+        self._invalidate('reviews', 'places', f'place:{place_id}')
+
+    def _apply_rating(self, place_id: str, count_delta: int,
+                      rating_delta: int) -> None:
+        """Update a place's rating aggregates inside the current transaction;
+        the row is locked so concurrent reviews cannot lose an update."""
+        place = self.places_repo.get(place_id, for_update=True)
+        if place is not None:
+            place.apply_rating_delta(count_delta, rating_delta)
+
+    def recompute_rating_aggregates(self) -> int:
+        """Rebuild every place's rating aggregates from the reviews table"""
+        with self.unit_of_work():
+            rated = self.places_repo.recompute_ratings()
+        response_cache.clear()
+        return rated
 
     def get_reviews_by_place(self, place_id: str):
-        return [
-            r for r in self.get_all_reviews()
-            if getattr(r, "place_id", None) == place_id
-        ]
+        """Get the reviews of one place, oldest first"""
+        return self.reviews_repo.list(
+            options=review_graph_options(),
+            order_by=(Review.created_at, Review.id),
+            place_id=place_id
+        )
+
+    def get_reviews_by_place_page(self, place_id: str, limit: int,
+                                  cursor: str | None = None):
+        """Return (reviews, next_cursor) for one page of a place's reviews"""
+        return self.reviews_repo.page(
+            limit, cursor, options=review_graph_options(), place_id=place_id
+        )
 
     # ---------- Amenities ----------
     def create_amenity(self, data: dict):
         """Create a new amenity"""
-        from app.models.amenity import Amenity
-        amenity = Amenity(**data)
-        self.amenities_repo.add(amenity)
+        with self.unit_of_work():
+            amenity = Amenity(**data)
+            self.amenities_repo.add(amenity)
+            self._invalidate('amenities')
         return amenity
 
+    def create_amenities_bulk(self, items: list) -> tuple:
+        """Validate and insert many amenities in one transaction.
+        Returns (ids, errors) like create_places_bulk; names must be new
+        and unique within the batch.
+        """
+        _check_bulk_size(items)
+        rows, errors = _clean_all(items, clean_amenity_data)
+        if errors:
+            return [], errors
+        names = [row['name'] for row in rows]
+        taken = {a.name for a in self.amenities_repo.list(
+            criteria=[Amenity.name.in_(names)])}
+        seen = set()
+        for index, name in enumerate(names):
+            if name in taken or name in seen:
+                errors.append({'index': index,
+                               'error': f'Amenity {name} already exists'})
+            seen.add(name)
+        if errors:
+            return [], errors
+        _stamp(rows)
+        with self.unit_of_work():
+            self.amenities_repo.add_many(rows)
+            self._invalidate('amenities')
+        return [row['id'] for row in rows], []
+
     def get_amenity(self, amenity_id: str):
         """Get amenity by ID"""
         return self.amenities_repo.get(amenity_id)
 
     def get_all_amenities(self):
         """Get all amenities"""
-        return self.amenities_repo.get_all()
+        return self.amenities_repo.list()
 
     def update_amenity(self, amenity_id: str, data: dict):
         """Update amenity data"""
-        return self.amenities_repo.update(amenity_id, data)
+        amenity = self.amenities_repo.get(amenity_id)
+        if amenity is None:
+            return None
+        with self.unit_of_work():
+            updated = self.amenities_repo.update(amenity, data)
+            self._invalidate_amenity_responses(amenity)
+        return updated
 
     def delete_amenity(self, amenity_id: str) -> bool:
         """Delete amenity by ID"""
-        return self.amenities_repo.delete(amenity_id)
+        amenity = self.amenities_repo.get(amenity_id)
+        if amenity is None:
+            return False
+        with self.unit_of_work():
+            self._invalidate('amenities', 'places',
+                             *(f'place:{place.id}' for place in amenity.places))
+            self.amenities_repo.delete(amenity)
+        amenity_index.remove_amenity(amenity_id)
+        return True
+
+    def _invalidate_amenity_responses(self, amenity: Amenity) -> None:
+        # Amenity names are embedded in the places that offer them
+        self._invalidate('amenities', 'places',
+                         *(f'place:{place.id}' for place in amenity.places))
 
 
 # ✅ هذا أهم سطر لحل مشكلة ImportError
@@ -0,0 +1,32 @@
+"""
+session.py - Session class that can send plain reads to a replica.
+
+When ``info[REPLICA_KEY]`` holds the bind key of a replica engine (set per
+request by ``replica_router`` in app/database.py), SELECTs go to that
+replica. Everything else stays on the primary: flushes, INSERT/UPDATE/
+DELETE, ``SELECT ... FOR UPDATE`` and textual SQL. The first such
+statement also clears the key, so the rest of the session reads what it
+just wrote.
+"""
+from flask_sqlalchemy.session import Session
+
+REPLICA_KEY = 'replica_bind'
+
+
+def is_plain_read(clause) -> bool:
+    """True for a SELECT that neither locks rows nor writes"""
+    return (clause is not None
+            and getattr(clause, 'is_select', False)
+            and getattr(clause, '_for_update_arg', None) is None)
+
+
+class RoutingSession(Session):
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = self.info.get(REPLICA_KEY)
+        if replica is not None and bind is None:
+            if not self._flushing and is_plain_read(clause):
+                return self._db.engines[replica]
+            del self.info[REPLICA_KEY]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind,
+                                **kwargs)
@@ -29,6 +29,10 @@ CREATE TABLE places (
     price INT NOT NULL,
     latitude FLOAT,
     longitude FLOAT,
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    avg_rating FLOAT,
+    geohash VARCHAR(12),
     owner_id VARCHAR(60) NOT NULL,
     created_at DATETIME NOT NULL,
     updated_at DATETIME NOT NULL,
@@ -70,3 +74,32 @@ CREATE TABLE place_amenity (
     FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE,
     FOREIGN KEY (amenity_id) REFERENCES amenities(id) ON DELETE CASCADE
 );
+
+-- ======================
+-- REVOKED_TOKENS (logged-out JWTs, kept until they expire)
+-- ======================
+CREATE TABLE revoked_tokens (
+    jti VARCHAR(36) PRIMARY KEY,
+    revoked_at DATETIME NOT NULL,
+    expires_at DATETIME NOT NULL,
+    INDEX ix_revoked_tokens_revoked_at (revoked_at),
+    INDEX ix_revoked_tokens_expires_at (expires_at)
+);
+
+-- ======================
+-- INDEXES
+-- ======================
+-- Keyset pagination orders every collection by (created_at, id)
+CREATE INDEX ix_users_created_at_id ON users (created_at, id);
+CREATE INDEX ix_places_created_at_id ON places (created_at, id);
+CREATE INDEX ix_amenities_created_at_id ON amenities (created_at, id);
+CREATE INDEX ix_reviews_created_at_id ON reviews (created_at, id);
+
+-- Server-side price range filtering on the places list
+CREATE INDEX ix_places_price ON places (price);
+
+-- Nearby and bounding-box search scan geohash prefix ranges
+CREATE INDEX ix_places_geohash ON places (geohash);
+
+-- Reviews of one place, in pagination order
+CREATE INDEX ix_reviews_place_id_created_at ON reviews (place_id, created_at, id);
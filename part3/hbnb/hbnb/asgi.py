@@ -0,0 +1,15 @@
+"""
+Async entry point: the public read endpoints run on an event loop, the
+rest of the API on the Flask app (see app/asgi.py).
+
+    uvicorn asgi:app --workers 4
+    python asgi.py
+"""
+from app.asgi import create_asgi_app
+
+app = create_asgi_app()
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host='127.0.0.1', port=5000)
@@ -0,0 +1,401 @@
+"""
+Benchmark every API namespace and compare the results with a baseline
+
+    python benchmark.py                          # test client, seeded DB
+    python benchmark.py --server http://127.0.0.1:5000 --concurrency 8
+    python benchmark.py --baseline baseline.json # exit 1 on regressions
+
+The test-client mode rebuilds the BenchmarkConfig database with
+generate_data's generator first (--no-seed keeps it). Against a real
+server, seed its database beforehand with generate_data.py. Either way
+the users created by the generator are used to log in.
+
+Results are written as JSON (--output). Keep a known-good run as the
+baseline: an endpoint regresses when its p95 latency grows, or its
+throughput drops, by more than --tolerance, or when it starts failing.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import platform
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+API = '/api/v1'
+DEFAULT_REQUESTS = 200
+DEFAULT_TOLERANCE = 0.25
+WARMUP_REQUESTS = 5
+LOGIN_EMAIL = 'user0@example.com'
+
+# ``scale`` shrinks the request count of slow endpoints (bcrypt logins)
+Endpoint = namedtuple('Endpoint', 'name method path auth body scale')
+
+
+def _new_place(ctx, i):
+    return {'title': f'Benchmark place {i}', 'price': 50 + i % 200,
+            'latitude': 48.85, 'longitude': 2.35}
+
+
+ENDPOINTS = (
+    Endpoint('auth.login', 'POST', '/auth/login', False,
+             lambda ctx, i: {'email': LOGIN_EMAIL,
+                             'password': ctx['password']}, 0.1),
+    Endpoint('users.list', 'GET', '/users/?limit=50', True, None, 1),
+    Endpoint('users.get', 'GET', '/users/{user_id}', True, None, 1),
+    Endpoint('places.list', 'GET', '/places/?limit=50', False, None, 1),
+    Endpoint('places.filter', 'GET',
+             '/places/?limit=50&max_price=80&fields=id,title,price',
+             False, None, 1),
+    Endpoint('places.nearby', 'GET',
+             '/places/nearby?lat=48.8566&lon=2.3522&radius_km=3&limit=20',
+             False, None, 1),
+    Endpoint('places.get', 'GET', '/places/{place_id}', False, None, 1),
+    Endpoint('places.reviews', 'GET', '/places/{place_id}/reviews?limit=50',
+             False, None, 1),
+    Endpoint('places.create', 'POST', '/places/', True, _new_place, 1),
+    Endpoint('reviews.list', 'GET', '/reviews/?limit=50', False, None, 1),
+    Endpoint('reviews.get', 'GET', '/reviews/{review_id}', False, None, 1),
+    Endpoint('amenities.list', 'GET', '/amenities/', False, None, 1),
+    Endpoint('amenities.get', 'GET', '/amenities/{amenity_id}',
+             False, None, 1),
+)
+
+
+class FlaskClient:
+    """Drives the app in-process through Flask's test client.
+
+    ``threads`` caps the requests handled at once, like a WSGI worker
+    with that many threads; further requests wait for a free one.
+    """
+
+    def __init__(self, app, threads=None):
+        self.client = app.test_client()
+        self.slots = threading.BoundedSemaphore(threads) if threads else None
+
+    def request(self, method, path, headers, body):
+        with self.slots or contextlib.nullcontext():
+            response = self.client.open(API + path, method=method,
+                                        headers=headers, json=body)
+        return response.status_code, response.get_json(silent=True)
+
+
+class ASGIClient:
+    """Drives an ASGI app in-process. Requests run as tasks of one event
+    loop on a background thread, as under a single ASGI server worker."""
+
+    def __init__(self, app):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever,
+                                       daemon=True)
+        self.thread.start()
+
+    def request(self, method, path, headers, body):
+        raw = b'' if body is None else json.dumps(body).encode('utf-8')
+        headers = dict(headers)
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+            headers['Content-Length'] = str(len(raw))
+        path, _, query = (API + path).partition('?')
+        status, data = asyncio.run_coroutine_threadsafe(
+            self._call(method, path, query, headers, raw), self.loop
+        ).result()
+        try:
+            return status, json.loads(data)
+        except ValueError:
+            return status, None
+
+    async def _call(self, method, path, query, headers, raw):
+        response = {'status': None, 'body': []}
+
+        async def receive():
+            return {'type': 'http.request', 'body': raw, 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            else:
+                response['body'].append(message.get('body', b''))
+
+        await self.app({
+            'type': 'http', 'method': method, 'path': path,
+            'query_string': query.encode('latin-1'), 'root_path': '',
+            'scheme': 'http', 'http_version': '1.1',
+            'server': ('localhost', 80),
+            'headers': [(name.lower().encode('latin-1'),
+                         value.encode('latin-1'))
+                        for name, value in headers.items()],
+        }, receive, send)
+        return response['status'], b''.join(response['body'])
+
+    def close(self):
+        """Send the lifespan shutdown (closing the app's engine) and stop
+        the loop"""
+        async def shutdown():
+            async def receive():
+                return {'type': 'lifespan.shutdown'}
+
+            async def send(message):
+                pass
+
+            await self.app({'type': 'lifespan'}, receive, send)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+class HTTPClient:
+    """Drives a running server over HTTP"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, headers, body):
+        data = None
+        headers = dict(headers)
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        req = urllib.request.Request(self.base_url + API + path, data=data,
+                                     headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req) as response:
+                status, raw = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, raw = e.code, e.read()
+        try:
+            return status, json.loads(raw)
+        except ValueError:
+            return status, None
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, errors, elapsed):
+    """Turn per-request latencies (seconds) into the stored statistics"""
+    values = sorted(latencies)
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 3)
+
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'throughput_rps': round(len(values) / elapsed, 2) if elapsed else 0,
+        'p50_ms': ms(percentile(values, 50)),
+        'p95_ms': ms(percentile(values, 95)),
+        'p99_ms': ms(percentile(values, 99)),
+        'max_ms': ms(values[-1] if values else None),
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return a message per endpoint that regressed against ``baseline``"""
+    regressions = []
+    for name, base in baseline.get('endpoints', {}).items():
+        current = results['endpoints'].get(name)
+        if current is None:
+            regressions.append(f'{name}: missing from this run')
+            continue
+        if current['errors'] and not base['errors']:
+            regressions.append(f"{name}: {current['errors']} errors")
+        if base['p95_ms'] and current['p95_ms'] is not None:
+            limit = base['p95_ms'] * (1 + tolerance)
+            if current['p95_ms'] > limit:
+                regressions.append(
+                    f"{name}: p95 {current['p95_ms']:.1f}ms > "
+                    f"{limit:.1f}ms (baseline {base['p95_ms']:.1f}ms)")
+        if base['throughput_rps']:
+            floor = base['throughput_rps'] * (1 - tolerance)
+            if current['throughput_rps'] < floor:
+                regressions.append(
+                    f"{name}: {current['throughput_rps']:.1f} req/s < "
+                    f"{floor:.1f} req/s "
+                    f"(baseline {base['throughput_rps']:.1f} req/s)")
+    return regressions
+
+
+def discover(client, password):
+    """Log in and collect ids for the parameterized paths"""
+    status, body = client.request('POST', '/auth/login', {},
+                                  {'email': LOGIN_EMAIL, 'password': password})
+    if status != 200:
+        raise RuntimeError(f'Login as {LOGIN_EMAIL} failed ({status}); '
+                           f'is the database seeded?')
+    headers = {'Authorization': f"Bearer {body['access_token']}"}
+
+    def ids(path, auth=False):
+        _, body = client.request('GET', path, headers if auth else {}, None)
+        items = body['items'] if isinstance(body, dict) else body or []
+        return [item['id'] for item in items]
+
+    ctx = {
+        'password': password,
+        'headers': headers,
+        'user_id': ids('/users/?limit=100', auth=True),
+        'place_id': ids('/places/?limit=100&fields=id'),
+        'review_id': ids('/reviews/?limit=100'),
+        'amenity_id': ids('/amenities/'),
+    }
+    for key in ('user_id', 'place_id', 'review_id', 'amenity_id'):
+        if not ctx[key]:
+            raise RuntimeError(f'No {key} found; is the database seeded?')
+    return ctx
+
+
+def run_endpoint(client, endpoint, ctx, requests, concurrency):
+    """Time ``requests`` calls of one endpoint. Returns its statistics."""
+    headers = ctx['headers'] if endpoint.auth else {}
+    count = max(1, int(requests * endpoint.scale))
+    counter = iter(range(WARMUP_REQUESTS, WARMUP_REQUESTS + count))
+    lock = threading.Lock()
+    latencies = []
+    errors = [0]
+
+    def call(i):
+        path = endpoint.path.format(**{
+            key: values[i % len(values)] for key, values in ctx.items()
+            if key.endswith('_id')
+        })
+        body = endpoint.body(ctx, i) if endpoint.body else None
+        start = time.perf_counter()
+        status, _ = client.request(endpoint.method, path, headers, body)
+        return time.perf_counter() - start, status
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            latency, status = call(i)
+            with lock:
+                latencies.append(latency)
+                if status >= 400:
+                    errors[0] += 1
+
+    # Fills connection pools and caches before anything is timed
+    for i in range(WARMUP_REQUESTS):
+        call(i)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        workers = [pool.submit(worker) for _ in range(concurrency)]
+    for future in workers:
+        future.result()
+    elapsed = time.perf_counter() - start
+    return summarize(latencies, errors[0], elapsed)
+
+
+def run(client, password, requests=DEFAULT_REQUESTS, concurrency=1,
+        only=None, progress=None):
+    """Benchmark every endpoint (or those named in ``only``)"""
+    ctx = discover(client, password)
+    results = {}
+    for endpoint in ENDPOINTS:
+        if only and endpoint.name not in only:
+            continue
+        results[endpoint.name] = run_endpoint(client, endpoint, ctx,
+                                              requests, concurrency)
+        if progress is not None:
+            progress(endpoint.name, results[endpoint.name])
+    return results
+
+
+def _print_row(name, stats):
+    print(f"{name:<16} {stats['throughput_rps']:>9.1f} "
+          f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+          f"{stats['p99_ms']:>9.2f} {stats['errors']:>6}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--server', help='base URL of a running server; '
+                        'default is the in-process test client')
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS,
+                        help='measured requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--only', nargs='+', metavar='ENDPOINT',
+                        help='benchmark only these endpoints')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--places', type=int, default=5000)
+    parser.add_argument('--reviews', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-seed', action='store_true',
+                        help='reuse the benchmark database as it is')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', help='results JSON to compare with')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed relative regression '
+                             '(default %(default)s)')
+    args = parser.parse_args(argv)
+
+    from app.services.datagen import PASSWORD
+    meta = {
+        'started_at': datetime.utcnow().isoformat(),
+        'target': args.server or 'test-client',
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'python': platform.python_version(),
+    }
+    if args.server:
+        client = HTTPClient(args.server)
+    else:
+        from app import create_app
+        from app.extensions import db
+        from app.services.datagen import generate
+        app = create_app('config.BenchmarkConfig')
+        if not args.no_seed:
+            with app.app_context():
+                db.drop_all()
+                db.create_all()
+                generate(args.users, args.places, args.reviews,
+                         seed=args.seed)
+            meta['dataset'] = {'users': args.users, 'places': args.places,
+                               'reviews': args.reviews, 'seed': args.seed}
+        client = FlaskClient(app)
+
+    print(f"{'endpoint':<16} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'errors':>6}")
+    endpoints = run(client, PASSWORD, args.requests, args.concurrency,
+                    args.only, progress=_print_row)
+    results = {'meta': meta, 'endpoints': endpoints}
+    with open(args.output, 'w', encoding='utf-8') as out:
+        json.dump(results, out, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if args.only:
+            baseline['endpoints'] = {
+                name: stats for name, stats in baseline['endpoints'].items()
+                if name in args.only
+            }
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) against "
+                  f"{args.baseline}:", file=sys.stderr)
+            for message in regressions:
+                print(f"  {message}", file=sys.stderr)
+            return 1
+        print(f"✅ No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Compare the sync (Flask) and async (ASGI) modes on slow queries
+
+    python benchmark_async.py
+    python benchmark_async.py --query-delay 0.1 --concurrency 64 --threads 8
+
+Both modes run in-process against the same seeded BenchmarkConfig
+database, with --query-delay seconds added before every SQL statement to
+stand in for a slow database. The sync mode handles at most --threads
+requests at a time, like a WSGI worker with that many threads; the async
+mode runs every request as a task on one event loop, like one uvicorn
+worker. Only the endpoints that asgi.py serves asynchronously are
+measured, with the response cache off so that every request hits the
+database, and with a connection pool large enough for --concurrency.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from benchmark import ASGIClient, FlaskClient, run
+
+READ_ENDPOINTS = ('places.list', 'places.get', 'places.reviews',
+                  'reviews.list', 'reviews.get', 'amenities.list',
+                  'amenities.get')
+
+
+def slow_config(delay, pool_size):
+    """BenchmarkConfig with the statement delay and a pool that does not
+    limit either mode"""
+    from config import BenchmarkConfig
+
+    class SlowQueryConfig(BenchmarkConfig):
+        QUERY_DELAY_SECONDS = delay
+        RESPONSE_CACHE_ENABLED = False
+        SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': pool_size,
+                                     'max_overflow': 0}
+    return SlowQueryConfig
+
+
+def seed(users, places, reviews, seed_value):
+    from app import create_app
+    from app.extensions import db
+    from app.services.datagen import generate
+    app = create_app('config.BenchmarkConfig')
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        generate(users, places, reviews, seed=seed_value)
+        db.engine.dispose()
+
+
+def speedup(sync, asynchronous):
+    if not sync['throughput_rps']:
+        return None
+    return round(asynchronous['throughput_rps'] / sync['throughput_rps'], 2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--query-delay', type=float, default=0.05,
+                        help='seconds added before every SQL statement')
+    parser.add_argument('--concurrency', type=int, default=32,
+                        help='requests kept in flight by the client')
+    parser.add_argument('--threads', type=int, default=8,
+                        help='requests the sync worker handles at once')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='measured requests per endpoint')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--places', type=int, default=1000)
+    parser.add_argument('--reviews', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-seed', action='store_true',
+                        help='reuse the benchmark database as it is')
+    parser.add_argument('--output', default='benchmark-async-results.json')
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    from app.asgi import create_asgi_app
+    from app.services.datagen import PASSWORD
+
+    if not args.no_seed:
+        seed(args.users, args.places, args.reviews, args.seed)
+    config = slow_config(args.query_delay, args.concurrency)
+
+    print(f"Sync mode ({args.threads} threads)...")
+    sync = run(FlaskClient(create_app(config), threads=args.threads),
+               PASSWORD, args.requests, args.concurrency, READ_ENDPOINTS)
+
+    print("Async mode (one event loop)...")
+    client = ASGIClient(create_asgi_app(config))
+    try:
+        asynchronous = run(client, PASSWORD, args.requests,
+                           args.concurrency, READ_ENDPOINTS)
+    finally:
+        client.close()
+
+    print(f"\n{'endpoint':<16} {'sync req/s':>10} {'async req/s':>11} "
+          f"{'speedup':>8} {'sync p95':>9} {'async p95':>9}")
+    comparison = {}
+    for name in READ_ENDPOINTS:
+        s, a = sync[name], asynchronous[name]
+        comparison[name] = {'sync': s, 'async': a, 'speedup': speedup(s, a)}
+        ratio = comparison[name]['speedup']
+        print(f"{name:<16} {s['throughput_rps']:>10.1f} "
+              f"{a['throughput_rps']:>11.1f} "
+              f"{'-' if ratio is None else f'{ratio:.2f}x':>8} "
+              f"{s['p95_ms']:>9.1f} {a['p95_ms']:>9.1f}")
+
+    results = {
+        'meta': {
+            'started_at': datetime.utcnow().isoformat(),
+            'query_delay': args.query_delay,
+            'concurrency': args.concurrency,
+            'threads': args.threads,
+            'requests': args.requests,
+        },
+        'endpoints': comparison,
+    }
+    with open(args.output, 'w', encoding='utf-8') as out:
+        json.dump(results, out, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
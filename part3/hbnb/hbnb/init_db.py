@@ -7,6 +7,7 @@ from app.models.user import User
 from app.models.place import Place
 from app.models.amenity import Amenity
 from app.models.review import Review
+from app.services import facade
 
 def init_database():
     app = create_app()
@@ -162,6 +163,8 @@ def init_database():
             db.session.add(review)
         
         db.session.commit()
+        facade.recompute_rating_aggregates()
+        facade.rebuild_search_index()
         print(f"✅ {len(reviews_data)} reviews created")
         
         print("\n" + "="*50)
@@ -0,0 +1,17 @@
+"""
+Delete the revoked tokens that have expired
+"""
+from app import create_app
+from app.revocation import revocation_list
+
+
+def prune_revoked_tokens():
+    app = create_app()
+
+    with app.app_context():
+        deleted = revocation_list.prune()
+        print(f"✅ Expired revocations deleted ({deleted} rows)")
+
+
+if __name__ == '__main__':
+    prune_revoked_tokens()
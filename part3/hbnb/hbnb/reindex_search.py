@@ -0,0 +1,17 @@
+"""
+Rebuild the full-text search index of places and reviews from their tables
+"""
+from app import create_app
+from app.services import facade
+
+
+def reindex_search():
+    app = create_app()
+
+    with app.app_context():
+        written = facade.rebuild_search_index()
+        print(f"✅ Search index rebuilt ({written} documents)")
+
+
+if __name__ == '__main__':
+    reindex_search()
@@ -0,0 +1,17 @@
+"""
+Recompute the rating aggregates stored on places from the reviews table
+"""
+from app import create_app
+from app.services import facade
+
+
+def repair_ratings():
+    app = create_app()
+
+    with app.app_context():
+        rated = facade.recompute_rating_aggregates()
+        print(f"✅ Rating aggregates rebuilt ({rated} places with reviews)")
+
+
+if __name__ == '__main__':
+    repair_ratings()
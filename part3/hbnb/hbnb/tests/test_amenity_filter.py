@@ -0,0 +1,170 @@
+import random
+import unittest
+from datetime import datetime
+
+from sqlalchemy import insert, update
+
+from app import create_app
+from app.extensions import db
+from app.models.amenity import place_amenity
+from app.models.place import Place
+from app.services import facade
+from app.services.amenity_index import (
+    AmenityIndex, PlaceBitmaps, amenity_index, bit_positions
+)
+
+
+class TestBitPositions(unittest.TestCase):
+
+    def test_positions_in_order(self):
+        rng = random.Random(0)
+        expected = sorted(rng.sample(range(200000), 500))
+        bitmap = sum(1 << position for position in expected)
+        self.assertEqual(bit_positions(bitmap), expected)
+        self.assertEqual(bit_positions(0), [])
+        self.assertEqual(bit_positions(1 << 63 | 1 << 64), [63, 64])
+
+
+class TestPlaceBitmaps(unittest.TestCase):
+
+    def test_set_and_clear(self):
+        bitmaps = PlaceBitmaps()
+        bitmaps.set("p1", frozenset({"wifi", "pool"}))
+        bitmaps.set("p2", frozenset({"wifi"}))
+        bitmaps.set("p3", frozenset())
+        self.assertEqual(bitmaps.place_ids, ["p1", "p2"])
+        self.assertEqual(bitmaps.bitmap("wifi"), 0b11)
+        self.assertEqual(bitmaps.bitmap("pool"), 0b01)
+
+        bitmaps.set("p1", frozenset({"wifi"}))
+        self.assertEqual(bitmaps.bitmap("pool"), 0)
+        self.assertEqual(bitmaps.bitmap("unknown"), 0)
+        bitmaps.remove_amenity("wifi")
+        self.assertEqual(bitmaps.bitmap("wifi"), 0)
+
+    def test_intersection(self):
+        index = AmenityIndex()
+        index._bitmaps = PlaceBitmaps()
+        for number in range(10000):
+            amenities = {"wifi"} if number % 2 else set()
+            if number % 3 == 0:
+                amenities.add("parking")
+            index._bitmaps.set(f"p{number}", frozenset(amenities))
+        ids = index.place_ids(["wifi", "parking"])
+        self.assertEqual(ids, [f"p{n}" for n in range(10000)
+                               if n % 2 and n % 3 == 0])
+        self.assertEqual(index.place_ids(["wifi", "missing"]), [])
+        index.max_ids = 100
+        self.assertIsNone(index.place_ids(["wifi"]))
+
+
+class TestAmenityFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.owner = facade.create_user({
+            "first_name": "Jane", "last_name": "Doe",
+            "email": "jane@example.com", "password": "secret"})
+        self.wifi = facade.create_amenity({"name": "WiFi"}).id
+        self.parking = facade.create_amenity({"name": "Parking"}).id
+        self.pool = facade.create_amenity({"name": "Pool"}).id
+        self.places = {
+            "all": self._place("All", [self.wifi, self.parking, self.pool]),
+            "wifi": self._place("Wifi only", [self.wifi]),
+            "both": self._place("Wifi and parking",
+                                [self.wifi, self.parking]),
+            "none": self._place("Nothing", []),
+        }
+
+    def tearDown(self):
+        facade.user_ids_by_email.clear()
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _place(self, title, amenities):
+        return facade.create_place({
+            "title": title, "price": 100, "latitude": 1.0, "longitude": 1.0,
+            "owner_id": self.owner.id, "amenities": amenities}).id
+
+    def _titles(self, *amenities, query=""):
+        response = self.client.get(
+            f"/api/v1/places/?fields=title&amenities={','.join(amenities)}"
+            f"{query}")
+        self.assertEqual(response.status_code, 200, response.get_json())
+        body = response.get_json()
+        if isinstance(body, dict):
+            body = body["items"]
+        return sorted(place["title"] for place in body)
+
+    def test_filter_by_amenities(self):
+        self.assertEqual(self._titles(self.wifi),
+                         ["All", "Wifi and parking", "Wifi only"])
+        self.assertEqual(self._titles(self.wifi, self.parking),
+                         ["All", "Wifi and parking"])
+        self.assertEqual(self._titles(self.wifi, self.parking, self.pool),
+                         ["All"])
+        self.assertEqual(self._titles("unknown"), [])
+        self.assertTrue(amenity_index.ready)
+
+    def test_sql_fallback_gives_same_results(self):
+        expected = self._titles(self.wifi, self.parking)
+        amenity_index.max_ids = 0
+        self.assertEqual(self._titles(self.wifi, self.parking), expected)
+        self.assertEqual(self._titles(self.wifi, self.parking,
+                                      query="&limit=1&max_price=500"),
+                         ["All"])
+
+    def test_filter_with_pagination_and_price(self):
+        seen = []
+        cursor = ""
+        while True:
+            body = self.client.get(
+                f"/api/v1/places/?amenities={self.wifi}&limit=2"
+                f"&cursor={cursor}").get_json()
+            seen.extend(place["id"] for place in body["items"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(self._titles(self.wifi, query="&max_price=50"), [])
+
+    def test_index_follows_writes(self):
+        self.assertEqual(self._titles(self.pool), ["All"])
+        facade.update_place(self.places["none"], {"amenities": [self.pool]})
+        facade.update_place(self.places["all"], {"amenities": [self.wifi]})
+        self.assertEqual(self._titles(self.pool), ["Nothing"])
+
+        facade.delete_place(self.places["none"])
+        self.assertEqual(self._titles(self.pool), [])
+        facade.delete_amenity(self.wifi)
+        self.assertEqual(self._titles(self.wifi), [])
+
+    def test_changes_by_other_workers_are_picked_up(self):
+        self.assertEqual(self._titles(self.pool), ["All"])
+        # Another worker links the pool, which bumps the place's updated_at
+        db.session.execute(insert(place_amenity).values(
+            place_id=self.places["wifi"], amenity_id=self.pool))
+        db.session.execute(update(Place).where(
+            Place.id == self.places["wifi"]).values(
+            updated_at=datetime.utcnow()))
+        db.session.commit()
+        self.assertEqual(self._titles(self.pool), ["All"])
+
+        amenity_index._next_refresh = 0
+        self.assertEqual(self._titles(self.pool), ["All", "Wifi only"])
+
+    def test_invalid_filter(self):
+        for query in ("amenities=", "amenities=,,",
+                      "amenities=" + ",".join(str(n) for n in range(21))):
+            with self.subTest(query=query):
+                response = self.client.get(f"/api/v1/places/?{query}")
+                self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
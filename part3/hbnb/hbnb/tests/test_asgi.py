@@ -0,0 +1,193 @@
+import asyncio
+import importlib.util
+import inspect
+import os
+import tempfile
+import time
+import unittest
+
+from app.extensions import db
+from app.services import facade
+from app.services.async_facade import AsyncHBnBFacade
+from app.services.facade import HBnBFacade
+from config import TestingConfig
+
+HAS_ASYNC_STACK = all(importlib.util.find_spec(name)
+                      for name in ("aiosqlite", "asgiref"))
+
+
+async def call(app, method, path, query=b"", headers=(), body=b""):
+    """Drive an ASGI app once; returns (status, headers, body)"""
+    sent = []
+    received = []
+    if body:
+        headers = list(headers) + [("Content-Length", str(len(body)))]
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "http.response.body":
+            received.append(message.get("body", b""))
+
+    await app({
+        "type": "http", "method": method, "path": path,
+        "query_string": query, "root_path": "", "scheme": "http",
+        "http_version": "1.1", "server": ("testserver", 80),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+    }, receive, send)
+    start = sent[0]
+    return (start["status"],
+            {k.decode(): v.decode() for k, v in start["headers"]},
+            b"".join(received))
+
+
+class TestFacadeContract(unittest.TestCase):
+
+    def test_async_methods_mirror_sync_facade(self):
+        for name, method in inspect.getmembers(AsyncHBnBFacade,
+                                               inspect.iscoroutinefunction):
+            if name.startswith("_") or name == "remove_session":
+                continue
+            sync = getattr(HBnBFacade, name)
+            self.assertEqual(inspect.signature(method),
+                             inspect.signature(sync), name)
+
+
+@unittest.skipUnless(HAS_ASYNC_STACK, "aiosqlite and asgiref are required")
+class TestAsyncReads(unittest.TestCase):
+
+    delay = 0
+
+    def setUp(self):
+        from app.asgi import create_asgi_app
+
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "hbnb.db")
+        delay = self.delay
+
+        class FileConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+            QUERY_DELAY_SECONDS = delay
+
+        self.loop = asyncio.new_event_loop()
+        self.asgi = create_asgi_app(FileConfig)
+        self.app = self.asgi.flask_app
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self._seed()
+
+    def _seed(self):
+        owner = facade.create_user({"first_name": "Jane", "last_name": "Doe",
+                                    "email": "jane@example.com",
+                                    "password": "secret"})
+        wifi = facade.create_amenity({"name": "Wifi"})
+        self.place = facade.create_place({
+            "title": "Loft", "price": 80, "latitude": 48.85,
+            "longitude": 2.35, "owner_id": owner.id, "amenities": [wifi.id]})
+        self.review = facade.create_review({
+            "text": "Great", "rating": 5, "user_id": owner.id,
+            "place_id": self.place.id})
+        self.amenity = wifi
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.asgi.facade.engine.dispose())
+        self.loop.close()
+        facade.user_ids_by_email.clear()
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        self.tmp.cleanup()
+
+    def _get(self, path, query=b"", headers=()):
+        return self.loop.run_until_complete(
+            call(self.asgi, "GET", path, query, headers))
+
+
+class TestAsyncEndpoints(TestAsyncReads):
+
+    def test_responses_match_flask(self):
+        place_id = self.place.id
+        cases = [
+            ("/api/v1/places/", b""),
+            ("/api/v1/places/", b"limit=1&fields=id,title,amenities"),
+            ("/api/v1/places/", b"max_price=50"),
+            ("/api/v1/places/", b"min_price=9&max_price=1"),
+            ("/api/v1/places/", f"amenities={self.amenity.id}".encode()),
+            ("/api/v1/places/", b"amenities=missing&limit=5"),
+            (f"/api/v1/places/{place_id}", b""),
+            ("/api/v1/places/missing", b""),
+            (f"/api/v1/places/{place_id}/reviews", b""),
+            (f"/api/v1/places/{place_id}/reviews", b"limit=1"),
+            ("/api/v1/reviews/", b""),
+            ("/api/v1/reviews/", b"limit=5"),
+            (f"/api/v1/reviews/{self.review.id}", b""),
+            ("/api/v1/amenities/", b""),
+            (f"/api/v1/amenities/{self.amenity.id}", b""),
+        ]
+        for path, query in cases:
+            with self.subTest(path=path, query=query):
+                status, _, body = self._get(path, query)
+                expected = self.client.get(
+                    path, query_string=query.decode())
+                self.assertEqual(status, expected.status_code)
+                self.assertEqual(body, expected.get_data())
+
+    def test_conditional_get(self):
+        path = f"/api/v1/places/{self.place.id}"
+        status, headers, _ = self._get(path)
+        self.assertEqual(status, 200)
+        status, _, body = self._get(
+            path, headers=[("If-None-Match", headers["etag"])])
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b"")
+
+    def test_other_requests_go_to_flask(self):
+        status, _, body = self.loop.run_until_complete(call(
+            self.asgi, "POST", "/api/v1/amenities/",
+            headers=[("Content-Type", "application/json")],
+            body=b'{"name": "Pool"}'))
+        self.assertEqual(status, 201, body)
+        _, _, body = self._get("/api/v1/amenities/")
+        self.assertIn(b"Pool", body)
+
+        status, _, _ = self._get("/api/v1/places/nearby",
+                                 b"lat=48.85&lon=2.35&radius_km=1")
+        self.assertEqual(status, 200)
+        status, _, _ = self._get("/api/v1/places")
+        self.assertEqual(status, 308)
+
+    def test_streamed_list_served_by_flask(self):
+        status, headers, body = self._get(
+            "/api/v1/reviews/", headers=[("Accept", "application/x-ndjson")])
+        self.assertEqual(status, 200)
+        self.assertTrue(headers["content-type"].startswith(
+            "application/x-ndjson"))
+        self.assertEqual(len(body.splitlines()), 1)
+
+
+class TestSlowQueries(TestAsyncReads):
+
+    delay = 0.1
+
+    def test_slow_queries_overlap(self):
+        requests = 10
+
+        async def burst():
+            await asyncio.gather(*(
+                call(self.asgi, "GET", "/api/v1/amenities/")
+                for _ in range(requests)))
+
+        start = time.perf_counter()
+        self.loop.run_until_complete(burst())
+        elapsed = time.perf_counter() - start
+        # One statement per request: run one after another this would take
+        # requests * delay
+        self.assertLess(elapsed, requests * self.delay / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
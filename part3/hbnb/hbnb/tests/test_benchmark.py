@@ -0,0 +1,108 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import benchmark
+import benchmark_async
+from app import create_app
+from app.extensions import db
+from app.services.datagen import PASSWORD, generate
+from config import TestingConfig
+
+
+class TestStatistics(unittest.TestCase):
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 95), 95)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertEqual(benchmark.percentile([7], 99), 7)
+        self.assertIsNone(benchmark.percentile([], 50))
+
+    def test_compare(self):
+        stats = benchmark.summarize([0.010] * 100, 0, 1.0)
+        baseline = {"endpoints": {"a": stats, "b": stats, "c": stats}}
+        slower = benchmark.summarize([0.020] * 100, 0, 1.0)
+        fewer = benchmark.summarize([0.010] * 50, 0, 1.0)
+        failing = benchmark.summarize([0.010] * 100, 3, 1.0)
+        results = {"endpoints": {"a": slower, "b": fewer, "c": failing}}
+
+        regressions = benchmark.compare(results, baseline, tolerance=0.25)
+        self.assertEqual(len(regressions), 3)
+        self.assertTrue(regressions[0].startswith("a: p95"))
+        self.assertTrue(regressions[1].startswith("b: 50.0 req/s"))
+        self.assertEqual(regressions[2], "c: 3 errors")
+
+        self.assertEqual(benchmark.compare(baseline, baseline), [])
+        self.assertEqual(benchmark.compare({"endpoints": {}}, baseline)[0],
+                         "a: missing from this run")
+
+
+class TestRun(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        with self.app.app_context():
+            db.create_all()
+            generate(5, 20, 50)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_every_namespace_answers(self):
+        only = {"users.get", "places.get", "places.create", "reviews.get",
+                "amenities.list"}
+        results = benchmark.run(benchmark.FlaskClient(self.app), PASSWORD,
+                                requests=5, only=only)
+        self.assertEqual(set(results), only)
+        for stats in results.values():
+            self.assertEqual(stats["requests"], 5)
+            self.assertEqual(stats["errors"], 0)
+            self.assertLessEqual(stats["p50_ms"], stats["p99_ms"])
+
+
+
+@unittest.skipUnless(importlib.util.find_spec("aiosqlite")
+                     and importlib.util.find_spec("asgiref"),
+                     "aiosqlite and asgiref are required")
+class TestASGIClient(unittest.TestCase):
+
+    def setUp(self):
+        from app.asgi import create_asgi_app
+
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "bench.db")
+
+        class FileConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+        self.asgi = create_asgi_app(FileConfig)
+        with self.asgi.flask_app.app_context():
+            db.create_all()
+            generate(5, 20, 50)
+
+    def tearDown(self):
+        with self.asgi.flask_app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_async_read_endpoints_answer(self):
+        client = benchmark.ASGIClient(self.asgi)
+        try:
+            results = benchmark.run(client, PASSWORD, requests=5,
+                                    concurrency=4,
+                                    only=benchmark_async.READ_ENDPOINTS)
+        finally:
+            client.close()
+        self.assertEqual(set(results), set(benchmark_async.READ_ENDPOINTS))
+        for stats in results.values():
+            self.assertEqual(stats["errors"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+
+class TestBulkCreate(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.user = User(email="owner@example.com", password="x")
+        db.session.add(self.user)
+        db.session.commit()
+        self.headers = {"Authorization":
+                        f"Bearer {create_access_token(identity=self.user.id)}"}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _places(self, count):
+        return [{"title": f"Place {i}", "price": 10 + i,
+                 "latitude": 40.0, "longitude": -74.0}
+                for i in range(count)]
+
+    def test_places(self):
+        response = self.client.post("/api/v1/places/bulk",
+                                    json=self._places(3), headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()["created"], 3)
+        places = Place.query.all()
+        self.assertEqual(len(places), 3)
+        self.assertTrue(all(p.owner_id == self.user.id for p in places))
+        self.assertTrue(all(p.geohash.startswith("dr") for p in places))
+
+    def test_invalid_item_rejects_whole_batch(self):
+        items = self._places(3)
+        items[1]["price"] = "cheap"
+        del items[2]["title"]
+        response = self.client.post("/api/v1/places/bulk", json=items,
+                                    headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        errors = response.get_json()["errors"]
+        self.assertEqual([e["index"] for e in errors], [1, 2])
+        self.assertEqual(Place.query.count(), 0)
+
+    def test_reviews_update_rating_aggregates(self):
+        ids = self.client.post("/api/v1/places/bulk", json=self._places(2),
+                               headers=self.headers).get_json()["ids"]
+        items = [{"text": "Good", "rating": 4, "place_id": ids[0]},
+                 {"text": "Bad", "rating": 1, "place_id": ids[0]},
+                 {"text": "Fine", "rating": 3, "place_id": ids[1]}]
+        response = self.client.post("/api/v1/reviews/bulk", json=items,
+                                    headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Review.query.count(), 3)
+        place = db.session.get(Place, ids[0])
+        self.assertEqual((place.review_count, place.avg_rating), (2, 2.5))
+
+    def test_reviews_across_many_places(self):
+        ids = self.client.post("/api/v1/places/bulk", json=self._places(8),
+                               headers=self.headers).get_json()["ids"]
+        items = [{"text": "Good", "rating": 5, "place_id": place_id}
+                 for place_id in ids]
+        response = self.client.post("/api/v1/reviews/bulk", json=items,
+                                    headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Place.query.filter_by(review_count=1).count(), 8)
+
+    def test_reviews_unknown_place(self):
+        response = self.client.post(
+            "/api/v1/reviews/bulk", headers=self.headers,
+            json=[{"text": "Good", "rating": 4, "place_id": "nope"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["errors"][0]["index"], 0)
+
+    def test_amenities_reject_duplicates(self):
+        db.session.add(Amenity(name="WiFi"))
+        db.session.commit()
+        response = self.client.post("/api/v1/amenities/bulk", json=[
+            {"name": "Pool"}, {"name": "WiFi"}, {"name": "Pool"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e["index"] for e in response.get_json()["errors"]],
+                         [1, 2])
+
+    def test_bulk_inserts_in_one_statement(self):
+        # Throughput is measured by benchmark.py; here only the batching
+        inserts = []
+
+        def record(conn, cursor, statement, parameters, context,
+                   executemany):
+            if statement.lstrip().upper().startswith("INSERT INTO AMENITIES"):
+                inserts.append(statement)
+
+        items = [{"name": f"Amenity {i}"} for i in range(100)]
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            response = self.client.post("/api/v1/amenities/bulk", json=items)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Amenity.query.count(), 100)
+        self.assertEqual(len(inserts), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services import facade
+
+
+class TestConditionalGet(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.owner = User(email="owner@example.com", password="x")
+        self.wifi = Amenity(name="WiFi")
+        db.session.add_all([self.owner, self.wifi])
+        db.session.flush()
+        self.place = Place(title="Place", price=10, owner_id=self.owner.id)
+        db.session.add(self.place)
+        db.session.commit()
+        self.url = f"/api/v1/places/{self.place.id}"
+        self.statements = []
+        event.listen(db.engine, "before_cursor_execute", self._count)
+
+    def tearDown(self):
+        event.remove(db.engine, "before_cursor_execute", self._count)
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.last_modified)
+        return response.headers["ETag"]
+
+    def test_if_none_match_returns_304_with_one_query(self):
+        etag = self._etag()
+        del self.statements[:]
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(len(self.statements), 1)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.url).headers["Last-Modified"]
+        response = self.client.get(
+            self.url, headers={"If-Modified-Since": last_modified})
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_review_changes_etag(self):
+        etag = self._etag()
+        db.session.add(Review(text="Nice", rating=5, place_id=self.place.id,
+                              user_id=self.owner.id))
+        db.session.commit()
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_amenity_link_changes_etag(self):
+        etag = self._etag()
+        self.place.amenities.append(self.wifi)
+        db.session.commit()
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_deleted_amenity_changes_etag(self):
+        pool = Amenity(name="Pool")
+        db.session.add(pool)
+        self.place.amenities.extend([self.wifi, pool])
+        db.session.commit()
+        # The remaining amenity is the newest, so only the count changes
+        self.wifi.name = "Fast WiFi"
+        db.session.commit()
+        etag = self._etag()
+
+        self.assertTrue(facade.delete_amenity(pool.id))
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([amenity["name"] for amenity
+                          in response.get_json()["amenities"]], ["Fast WiFi"])
+
+    def test_amenity_detail(self):
+        url = f"/api/v1/amenities/{self.wifi.id}"
+        etag = self.client.get(url).headers["ETag"]
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_place(self):
+        response = self.client.get("/api/v1/places/nope")
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
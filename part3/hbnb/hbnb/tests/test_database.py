@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+
+from app import create_app
+from app.database import TimedQueuePool
+from app.extensions import db
+from app.metrics import request_metrics
+from config import ProductionConfig, TestingConfig
+
+
+class TestSQLiteFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "hbnb.db")
+
+        class FileConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+            SQLALCHEMY_ENGINE_OPTIONS = {"pool_size": 1, "max_overflow": 0}
+
+        self.app = create_app(FileConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        self.tmp.cleanup()
+
+    def _pragma(self, name):
+        return db.session.execute(text(f"PRAGMA {name}")).scalar()
+
+    def test_pragmas_applied_on_connect(self):
+        self.assertEqual(self._pragma("journal_mode"), "wal")
+        self.assertEqual(self._pragma("synchronous"), 1)  # NORMAL
+        self.assertEqual(self._pragma("busy_timeout"), 5000)
+        self.assertGreater(self._pragma("mmap_size"), 0)
+
+    def test_checkout_wait_recorded(self):
+        self.assertIsInstance(db.engine.pool, TimedQueuePool)
+        self.assertEqual(db.engine.pool.size(), 1)
+        before = request_metrics.pool_checkout_wait.count()
+
+        def query(_):
+            with self.app.app_context():
+                return db.session.execute(text("SELECT 1")).scalar()
+
+        # Two threads share one connection, so one of them has to wait
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            self.assertEqual(list(pool.map(query, range(4))), [1] * 4)
+        self.assertGreaterEqual(
+            request_metrics.pool_checkout_wait.count() - before, 4)
+
+        body = self.client.get("/metrics").get_data(as_text=True)
+        self.assertIn("hbnb_db_pool_checkout_wait_seconds_count", body)
+        self.assertIn('hbnb_db_pool_size{bind="default"} 1', body)
+
+
+class TestEngineOptions(unittest.TestCase):
+
+    def test_production_pool_settings(self):
+        options = ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS
+        self.assertTrue(options["pool_pre_ping"])
+        self.assertLess(options["pool_recycle"], 8 * 3600)
+        self.assertGreater(options["pool_size"], 5)
+        self.assertIn("connect_timeout", options["connect_args"])
+
+    def test_memory_database_untouched(self):
+        app = create_app("config.TestingConfig")
+        with app.app_context():
+            self.assertNotIsInstance(db.engine.pool, TimedQueuePool)
+            self.assertEqual(
+                db.session.execute(text("PRAGMA journal_mode")).scalar(),
+                "memory")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+from sqlalchemy import func
+
+from app import create_app
+from app.extensions import db
+from app.models.amenity import place_amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services.datagen import generate
+
+
+class TestDatagen(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _generate(self, seed):
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        counts = generate(50, 200, 2000, seed=seed, chunk_size=300)
+        rows = {
+            table.name: sorted(tuple(row) for row in db.session.execute(
+                table.select()).all())
+            for table in (Place.__table__, place_amenity, Review.__table__)
+        }
+        return counts, rows
+
+    def test_deterministic(self):
+        counts, first = self._generate(7)
+        self.assertEqual(
+            (counts["users"], counts["places"], counts["reviews"]),
+            (50, 200, 2000))
+        self.assertEqual(self._generate(7)[1], first)
+        self.assertNotEqual(self._generate(8)[1], first)
+
+    def test_distributions(self):
+        generate(50, 200, 2000, seed=1)
+        counts = sorted(
+            (row[0] for row in db.session.query(Place.review_count)),
+            reverse=True)
+        # Zipf: the busiest place gets far more reviews than the median one
+        self.assertGreater(counts[0], 10 * max(1, counts[len(counts) // 2]))
+        self.assertEqual(sum(counts), 2000)
+
+        prices = sorted(row[0] for row in db.session.query(Place.price))
+        median = prices[len(prices) // 2]
+        self.assertGreater(prices[-1], 3 * median)
+        self.assertTrue(all(p.geohash for p in Place.query.limit(20)))
+
+        ratings = dict(db.session.query(
+            Review.rating, func.count()).group_by(Review.rating).all())
+        self.assertGreater(ratings[5], ratings[1])
+
+    def test_users_can_log_in(self):
+        generate(2, 0, 0)
+        user = User.query.filter_by(email="user0@example.com").one()
+        self.assertTrue(user.verify_password("password"))
+
+    def test_requires_parents(self):
+        with self.assertRaises(ValueError):
+            generate(0, 10, 0)
+        with self.assertRaises(ValueError):
+            generate(10, 0, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
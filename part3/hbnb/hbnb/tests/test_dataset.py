@@ -0,0 +1,88 @@
+import io
+import unittest
+
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity, place_amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services.dataset import export_dataset, import_dataset
+
+
+class TestDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        user = User(email="owner@example.com", password="x")
+        wifi = Amenity(name="WiFi")
+        db.session.add_all([user, wifi])
+        db.session.flush()
+        for i in range(7):
+            place = Place(title=f"Place {i}", price=i, latitude=1.0,
+                          longitude=2.0, owner_id=user.id)
+            place.amenities.append(wifi)
+            db.session.add(place)
+            db.session.flush()
+            db.session.add(Review(text="ok", rating=4, place_id=place.id,
+                                  user_id=user.id))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _snapshot(self):
+        return {
+            table.name: sorted(tuple(row) for row in
+                               db.session.execute(table.select()).all())
+            for table in (User.__table__, Amenity.__table__,
+                          Place.__table__, place_amenity, Review.__table__)
+        }
+
+    def _reset(self):
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+    def test_round_trip(self):
+        before = self._snapshot()
+        out = io.StringIO()
+        counts = export_dataset(out, chunk_size=3)
+        self.assertEqual(counts, {"users": 1, "amenities": 1, "places": 7,
+                                  "place_amenity": 7, "reviews": 7})
+        self.assertEqual(len(out.getvalue().splitlines()), 23)
+
+        self._reset()
+        lines = io.StringIO(out.getvalue())
+        self.assertEqual(import_dataset(lines, chunk_size=3), counts)
+        self.assertEqual(self._snapshot(), before)
+
+    def test_resume(self):
+        before = self._snapshot()
+        out = io.StringIO()
+        export_dataset(out)
+        lines = out.getvalue().splitlines(keepends=True)
+
+        self._reset()
+        # Simulate an import that stopped partway through the places
+        import_dataset(lines[:5], chunk_size=2)
+        counts = import_dataset(lines, chunk_size=2, resume=True)
+        self.assertEqual(counts["users"], 0)
+        self.assertEqual(counts["places"], 4)
+        self.assertEqual(counts["reviews"], 7)
+        self.assertEqual(self._snapshot(), before)
+
+    def test_rejects_bad_lines(self):
+        with self.assertRaises(ValueError):
+            import_dataset(['{"table": "secrets", "row": {}}\n'])
+        with self.assertRaises(ValueError):
+            import_dataset(['not json\n'])
+
+
+if __name__ == "__main__":
+    unittest.main()
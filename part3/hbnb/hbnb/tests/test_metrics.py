@@ -0,0 +1,117 @@
+import time
+import unittest
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from app.extensions import db, password_hasher
+from app.metrics import request_metrics as metrics
+from app.models.place import Place
+from app.models.user import User
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        user = User(email="owner@example.com", password="x")
+        db.session.add(user)
+        db.session.flush()
+        self.place = Place(title="Place", price=10, latitude=1.0,
+                           longitude=2.0, owner_id=user.id)
+        db.session.add(self.place)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_requests_labelled_by_route(self):
+        self.client.get(f"/api/v1/places/{self.place.id}")
+        self.client.get("/api/v1/places/missing")
+        self.client.get("/no/such/path")
+
+        route = "/api/v1/places/<place_id>"
+        self.assertEqual(
+            metrics.request_duration.count("GET", route, "200"), 1)
+        self.assertEqual(
+            metrics.request_duration.count("GET", route, "404"), 1)
+        self.assertEqual(
+            metrics.request_duration.count("GET", "unmatched", "404"), 1)
+        self.assertEqual(metrics.in_flight.value(), 0)
+        self.assertEqual(metrics.response_size.count("GET", route), 2)
+
+    def test_sql_statements_per_request(self):
+        before = metrics.statements.value()
+        self.client.get("/api/v1/places/")
+        self.assertGreater(metrics.statements.value(), before)
+        self.assertEqual(
+            metrics.request_statements.count("GET", "/api/v1/places/"), 1)
+        self.assertGreater(metrics.statement_time.value(), 0)
+
+    def test_failed_statement_does_not_skew_timing(self):
+        with db.engine.connect() as conn:
+            statements = metrics.statements.value()
+            info = repr(conn.info)
+            with self.assertRaises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+            self.assertEqual(metrics.statements.value(), statements)
+            # Nothing is left behind on the pooled connection
+            self.assertEqual(repr(conn.info), info)
+
+            # A leftover start from the failure would inflate this one
+            time.sleep(0.05)
+            before = metrics.statement_time.value()
+            start = time.perf_counter()
+            conn.execute(text("SELECT 1"))
+            elapsed = time.perf_counter() - start
+            self.assertEqual(metrics.statements.value(), statements + 1)
+            self.assertLessEqual(metrics.statement_time.value() - before,
+                                 elapsed)
+
+    def test_exposition(self):
+        self.client.get("/api/v1/amenities/")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        body = response.get_data(as_text=True)
+        self.assertIn("# TYPE hbnb_http_request_duration_seconds histogram",
+                      body)
+        self.assertIn('hbnb_http_request_duration_seconds_bucket{method="GET",'
+                      'route="/api/v1/amenities/",status="200",le="+Inf"} 1',
+                      body)
+        self.assertIn("hbnb_http_requests_in_flight 1", body)
+        self.assertIn("hbnb_password_hash_rejected_total 0", body)
+        self.assertIn("hbnb_response_cache_hits_total", body)
+
+    def test_password_hash_latency_histogram(self):
+        password_hasher.run(time.sleep, 0.07)
+        completed = password_hasher.metrics()["completed"]
+        body = self.client.get("/metrics").get_data(as_text=True)
+        samples = dict(line.rsplit(" ", 1) for line in body.splitlines()
+                       if line.startswith("hbnb_password_hash_seconds"))
+        self.assertIn("# TYPE hbnb_password_hash_seconds histogram", body)
+        name = "hbnb_password_hash_seconds"
+        self.assertEqual(int(samples[name + "_count"]), completed)
+        self.assertEqual(int(samples[name + '_bucket{le="+Inf"}']), completed)
+        self.assertGreaterEqual(float(samples[name + "_sum"]), 0.07)
+        self.assertGreater(int(samples[name + '_bucket{le="0.1"}']),
+                           int(samples[name + '_bucket{le="0.05"}']))
+
+    def test_disabled(self):
+        app = create_app(type("NoMetrics", (), {
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "JWT_SECRET_KEY": "x",
+            "METRICS_ENABLED": False,
+        }))
+        self.assertEqual(app.test_client().get("/metrics").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.nplusone import NPlusOneError, normalize, query_detector
+
+
+class TestNPlusOne(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+
+        @self.app.route("/naive-places")
+        def naive_places():
+            # Lazy-loads owner, amenities and reviews once per place
+            return [place.to_dict() for place in Place.query.all()]
+
+        @self.app.route("/allowed-places")
+        def allowed_places():
+            with query_detector.allowed():
+                return [place.to_dict() for place in Place.query.all()]
+
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        users = [User(email=f"user{i}@example.com", password="x")
+                 for i in range(10)]
+        db.session.add_all(users)
+        db.session.flush()
+        for user in users:
+            place = Place(title="Place", price=10, latitude=1.0,
+                          longitude=2.0, owner_id=user.id)
+            db.session.add(place)
+            db.session.flush()
+            db.session.add(Review(text="ok", rating=4, place_id=place.id,
+                                  user_id=user.id))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_raises_with_route_and_call_site(self):
+        with self.assertRaises(NPlusOneError) as caught:
+            self.client.get("/naive-places")
+        message = str(caught.exception)
+        self.assertIn("GET /naive-places", message)
+        self.assertIn("app/models/place.py", message)
+        self.assertIn("FROM users", message)
+
+    def test_log_mode(self):
+        query_detector.mode = "log"
+        try:
+            with self.assertLogs(self.app.logger, "WARNING") as logs:
+                response = self.client.get("/naive-places")
+        finally:
+            query_detector.mode = "raise"
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("N+1 queries in GET /naive-places", logs.output[0])
+
+    def test_allowed_block(self):
+        self.assertEqual(self.client.get("/allowed-places").status_code, 200)
+
+    def test_list_endpoints_stay_flat(self):
+        place_id = Place.query.first().id
+        for path in ("/api/v1/places/", "/api/v1/places/?limit=5",
+                     "/api/v1/reviews/", f"/api/v1/places/{place_id}",
+                     f"/api/v1/places/{place_id}/reviews",
+                     "/api/v1/places/?stream=1"):
+            response = self.client.get(path)
+            response.get_data()
+            self.assertEqual(response.status_code, 200, path)
+
+    def test_normalize(self):
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE id IN (?, ?, ?)\n  AND x = 'a'"),
+            normalize("SELECT * FROM t WHERE id IN (?) AND x = 'bb'"))
+        self.assertEqual(normalize("SELECT 1 LIMIT 10"),
+                         normalize("SELECT 2 LIMIT 20"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from datetime import datetime
+
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+
+class TestPlacePagination(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        owner = User(email="owner@example.com", password="x")
+        db.session.add(owner)
+        db.session.flush()
+        # Several places share a timestamp so the id tie-breaker is exercised
+        stamp = datetime(2024, 1, 1)
+        for i in range(7):
+            db.session.add(Place(title=f"Place {i}", price=10 * i,
+                                 owner_id=owner.id, created_at=stamp))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_walks_every_place_once(self):
+        seen = []
+        cursor = None
+        while True:
+            url = "/api/v1/places/?limit=3"
+            if cursor:
+                url += f"&cursor={cursor}"
+            body = self.client.get(url).get_json()
+            self.assertLessEqual(len(body["items"]), 3)
+            seen.extend(item["id"] for item in body["items"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(seen, sorted(seen))
+
+    def test_without_limit_returns_plain_list(self):
+        body = self.client.get("/api/v1/places/").get_json()
+        self.assertIsInstance(body, list)
+        self.assertEqual(len(body), 7)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/v1/places/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_limit(self):
+        response = self.client.get("/api/v1/places/?limit=0")
+        self.assertEqual(response.status_code, 400)
+
+
+class TestReviewsByPlace(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        owner = User(email="owner@example.com", password="x")
+        db.session.add(owner)
+        db.session.flush()
+        self.places = []
+        for i in range(2):
+            place = Place(title=f"Place {i}", price=10, owner_id=owner.id)
+            for j in range(5):
+                place.reviews.append(Review(text=f"Review {i}-{j}", rating=4,
+                                            user_id=owner.id))
+            db.session.add(place)
+            self.places.append(place)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_only_returns_reviews_of_the_place(self):
+        place = self.places[0]
+        for url in (f"/api/v1/places/{place.id}/reviews",
+                    f"/api/v1/reviews/places/{place.id}/reviews"):
+            body = self.client.get(url).get_json()
+            self.assertEqual(len(body), 5)
+            self.assertTrue(all(r["place_id"] == place.id for r in body))
+
+    def test_paginated(self):
+        place = self.places[1]
+        url = f"/api/v1/places/{place.id}/reviews?limit=3"
+        first = self.client.get(url).get_json()
+        self.assertEqual(len(first["items"]), 3)
+        second = self.client.get(
+            f"{url}&cursor={first['next_cursor']}").get_json()
+        self.assertEqual(len(second["items"]), 2)
+        self.assertIsNone(second["next_cursor"])
+        ids = [r["id"] for r in first["items"] + second["items"]]
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_unknown_place(self):
+        response = self.client.get("/api/v1/places/nope/reviews")
+        self.assertEqual(response.status_code, 404)
+
+    def test_place_id_is_indexed(self):
+        indexes = {tuple(c.name for c in ix.columns)
+                   for ix in Review.__table__.indexes}
+        self.assertIn(("place_id", "created_at", "id"), indexes)
+
+
+if __name__ == "__main__":
+    unittest.main()
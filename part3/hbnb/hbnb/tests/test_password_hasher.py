@@ -0,0 +1,89 @@
+import threading
+import time
+import unittest
+
+from flask import Flask
+
+from app import create_app
+from app.extensions import db
+from app.hashing import PasswordHasher, PasswordHasherBusy
+from app.services import facade
+
+
+class TestPasswordHasher(unittest.TestCase):
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE=1,
+                          PASSWORD_HASH_TIMEOUT=5)
+        self.hasher = PasswordHasher()
+        self.hasher.init_app(app)
+
+    def test_runs_on_pool_and_records_latency(self):
+        name = self.hasher.run(lambda: threading.current_thread().name)
+        self.assertTrue(name.startswith("bcrypt"))
+        metrics = self.hasher.metrics()
+        self.assertEqual(metrics["completed"], 1)
+        self.assertEqual(metrics["queue_depth"], 0)
+
+    def test_rejects_when_queue_is_full(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+
+        # One running, one queued: the pool and its queue are full
+        workers = [threading.Thread(target=self.hasher.run, args=(slow,))
+                   for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        started.wait(5)
+        deadline = time.monotonic() + 5
+        while (self.hasher.metrics()["queue_depth"] < 1
+               and time.monotonic() < deadline):
+            time.sleep(0.01)
+        try:
+            self.assertEqual(self.hasher.metrics()["queue_depth"], 1)
+            with self.assertRaises(PasswordHasherBusy):
+                self.hasher.run(slow)
+            self.assertEqual(self.hasher.metrics()["rejected"], 1)
+        finally:
+            release.set()
+            for worker in workers:
+                worker.join()
+        self.assertEqual(self.hasher.metrics()["completed"], 2)
+
+
+class TestLogin(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        facade.create_user({"first_name": "Jane", "last_name": "Doe",
+                            "email": "jane@example.com",
+                            "password": "secret"})
+
+    def tearDown(self):
+        facade.user_ids_by_email.clear()
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_login(self):
+        response = self.client.post("/api/v1/auth/login", json={
+            "email": "jane@example.com", "password": "secret"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access_token", response.get_json())
+
+        response = self.client.post("/api/v1/auth/login", json={
+            "email": "jane@example.com", "password": "wrong"})
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.user import User
+
+
+class TestPlaceFilters(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        owner = User(email="owner@example.com", password="x")
+        db.session.add(owner)
+        db.session.flush()
+        for price in (5, 10, 50, 100, 300):
+            db.session.add(Place(title=f"Place {price}", price=price,
+                                 owner_id=owner.id))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _prices(self, query):
+        response = self.client.get(f"/api/v1/places/?fields=price&{query}")
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        if isinstance(body, dict):
+            body = body["items"]
+        return sorted(place["price"] for place in body)
+
+    def test_price_range(self):
+        self.assertEqual(self._prices("max_price=50"), [5, 10, 50])
+        self.assertEqual(self._prices("min_price=50"), [50, 100, 300])
+        self.assertEqual(self._prices("min_price=10&max_price=100"),
+                         [10, 50, 100])
+
+    def test_price_range_with_pagination(self):
+        self.assertEqual(self._prices("min_price=10&limit=2"), [10, 50])
+
+    def test_invalid_price_range(self):
+        response = self.client.get("/api/v1/places/?min_price=abc")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/v1/places/?min_price=100&max_price=10")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["error"],
+                         "min_price cannot be greater than max_price")
+        for query, error in (("max_price=-1", "max_price cannot be negative"),
+                             ("min_price=-5", "min_price cannot be negative")):
+            with self.subTest(query=query):
+                response = self.client.get(f"/api/v1/places/?{query}")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json()["error"], error)
+
+    def test_single_bound(self):
+        self.assertEqual(self._prices("max_price=0"), [])
+        self.assertEqual(self._prices("min_price=0"), [5, 10, 50, 100, 300])
+
+    def test_price_is_indexed(self):
+        indexes = {tuple(c.name for c in ix.columns)
+                   for ix in Place.__table__.indexes}
+        self.assertIn(("price",), indexes)
+
+
+class TestPlaceGeoSearch(unittest.TestCase):
+
+    # (title, latitude, longitude)
+    PLACES = [
+        ("Times Square", 40.7580, -73.9855),
+        ("Brooklyn", 40.6782, -73.9442),
+        ("Newark", 40.7357, -74.1724),
+        ("Philadelphia", 39.9526, -75.1652),
+        ("Los Angeles", 34.0522, -118.2437),
+    ]
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        owner = User(email="owner@example.com", password="x")
+        db.session.add(owner)
+        db.session.flush()
+        for title, lat, lon in self.PLACES:
+            db.session.add(Place(title=title, price=100, latitude=lat,
+                                 longitude=lon, owner_id=owner.id))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_nearby_orders_by_distance(self):
+        response = self.client.get(
+            "/api/v1/places/nearby?lat=40.7128&lon=-74.0060&radius_km=20"
+            "&fields=title")
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual([p["title"] for p in body],
+                         ["Times Square", "Brooklyn", "Newark"])
+        distances = [p["distance_km"] for p in body]
+        self.assertEqual(distances, sorted(distances))
+        self.assertNotIn("latitude", body[0])
+
+    def test_nearby_large_radius(self):
+        response = self.client.get(
+            "/api/v1/places/nearby?lat=40.7128&lon=-74.0060&radius_km=5000")
+        self.assertEqual(len(response.get_json()), 5)
+
+    def test_nearby_loads_only_the_nearest_places(self):
+        loaded = []
+
+        def record(place, context):
+            loaded.append(place.title)
+
+        db.session.remove()
+        event.listen(Place, "load", record)
+        try:
+            response = self.client.get(
+                "/api/v1/places/nearby?lat=40.7128&lon=-74.0060"
+                "&radius_km=5000&limit=2")
+        finally:
+            event.remove(Place, "load", record)
+        self.assertEqual([p["title"] for p in response.get_json()],
+                         ["Times Square", "Brooklyn"])
+        self.assertEqual(sorted(loaded), ["Brooklyn", "Times Square"])
+
+    def test_nearby_requires_coordinates(self):
+        response = self.client.get("/api/v1/places/nearby?lat=40&radius_km=5")
+        self.assertEqual(response.status_code, 400)
+
+    def test_geohash_follows_coordinates(self):
+        place = Place.query.filter_by(title="Newark").one()
+        before = place.geohash
+        place.latitude = 34.05
+        place.longitude = -118.24
+        db.session.commit()
+        self.assertNotEqual(place.geohash, before)
+        self.assertTrue(place.geohash.startswith("9q5"))
+
+    def test_bbox(self):
+        response = self.client.get(
+            "/api/v1/places/?fields=title&bbox=-74.1,40.6,-73.9,40.8")
+        self.assertEqual(response.status_code, 200)
+        titles = sorted(p["title"] for p in response.get_json())
+        self.assertEqual(titles, ["Brooklyn", "Times Square"])
+
+    def test_invalid_bbox(self):
+        response = self.client.get("/api/v1/places/?bbox=1,2,3")
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+import textwrap
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+
+class TestPlaceQueryCount(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.statements = []
+        event.listen(db.engine, "before_cursor_execute", self._count)
+
+    def tearDown(self):
+        event.remove(db.engine, "before_cursor_execute", self._count)
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _seed(self, count):
+        owner = User(email=f"owner{count}@example.com", password="x",
+                     first_name="Owner", last_name="Test")
+        wifi = Amenity(name=f"WiFi {count}")
+        db.session.add_all([owner, wifi])
+        db.session.flush()
+        for i in range(count):
+            place = Place(title=f"Place {i}", price=100, owner_id=owner.id)
+            place.amenities.append(wifi)
+            place.reviews.append(Review(text="Nice", rating=5, user_id=owner.id))
+            db.session.add(place)
+        db.session.commit()
+        db.session.expunge_all()
+
+    def _list_query_count(self):
+        del self.statements[:]
+        response = self.client.get("/api/v1/places/")
+        self.assertEqual(response.status_code, 200)
+        return len(self.statements), len(response.get_json())
+
+    def test_list_query_count_is_constant(self):
+        self._seed(10)
+        small, rows = self._list_query_count()
+        self.assertEqual(rows, 10)
+
+        self._seed(10000 - 10)
+        large, rows = self._list_query_count()
+        self.assertEqual(rows, 10000)
+
+        self.assertEqual(small, large)
+        self.assertLessEqual(small, 4)
+
+    def test_detail_query_count(self):
+        self._seed(3)
+        place_id = Place.query.first().id
+        db.session.expunge_all()
+        del self.statements[:]
+        response = self.client.get(f"/api/v1/places/{place_id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()["reviews"]), 1)
+        self.assertLessEqual(len(self.statements), 4)
+
+    def test_sparse_fieldset_selects_only_requested_columns(self):
+        self._seed(5)
+        del self.statements[:]
+        response = self.client.get("/api/v1/places/?fields=title,price")
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(set(body[0]), {"id", "title", "price"})
+        # One SELECT on places, no relationship loads
+        self.assertEqual(len(self.statements), 1)
+        self.assertNotIn("description", self.statements[0])
+
+    def test_sparse_fieldset_rejects_unknown_field(self):
+        response = self.client.get("/api/v1/places/?fields=title,password")
+        self.assertEqual(response.status_code, 400)
+
+
+class TestFreshProcess(unittest.TestCase):
+
+    def test_list_places_before_any_model_is_used(self):
+        # Mappers are configured once per process, so this needs a new one
+        script = textwrap.dedent("""
+            from app import create_app
+            from app.extensions import db
+
+            app = create_app("config.TestingConfig")
+            with app.app_context():
+                db.create_all()
+                response = app.test_client().get("/api/v1/places/")
+                print(response.status_code, response.get_json())
+        """)
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "200 []")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services import facade
+
+
+class TestRatingAggregates(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.user = User(email="owner@example.com", password="x")
+        db.session.add(self.user)
+        db.session.flush()
+        self.place = Place(title="Place", price=10, owner_id=self.user.id)
+        db.session.add(self.place)
+        db.session.commit()
+        self.client = self.app.test_client()
+        self.headers = {"Authorization":
+                        f"Bearer {create_access_token(identity=self.user.id)}"}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _review(self, rating):
+        return facade.create_review({"text": "ok", "rating": rating,
+                                     "place_id": self.place.id,
+                                     "user_id": self.user.id})
+
+    def _aggregates(self):
+        db.session.expire_all()
+        place = db.session.get(Place, self.place.id)
+        return place.review_count, place.rating_sum, place.avg_rating
+
+    def test_new_place_has_no_rating(self):
+        self.assertEqual(self._aggregates(), (0, 0, None))
+
+    def test_create_update_delete(self):
+        first = self._review(5)
+        self._review(2)
+        self.assertEqual(self._aggregates(), (2, 7, 3.5))
+
+        facade.update_review(first.id, {"rating": 3})
+        self.assertEqual(self._aggregates(), (2, 5, 2.5))
+
+        self.assertTrue(facade.delete_review(first.id))
+        self.assertEqual(self._aggregates(), (1, 2, 2.0))
+
+    def test_recompute_from_scratch(self):
+        # Reviews inserted behind the facade's back leave stale aggregates
+        db.session.add_all([
+            Review(text="a", rating=4, place_id=self.place.id,
+                   user_id=self.user.id),
+            Review(text="b", rating=1, place_id=self.place.id,
+                   user_id=self.user.id),
+        ])
+        db.session.commit()
+        self.assertEqual(self._aggregates(), (0, 0, None))
+
+        self.assertEqual(facade.recompute_rating_aggregates(), 1)
+        self.assertEqual(self._aggregates(), (2, 5, 2.5))
+
+    def test_string_rating_is_coerced(self):
+        response = self.client.post("/api/v1/reviews/", headers=self.headers,
+                                    json={"text": "ok", "rating": "5",
+                                          "place_id": self.place.id})
+        self.assertEqual(response.status_code, 201, response.get_json())
+        self.assertEqual(response.get_json()["rating"], 5)
+        review_id = response.get_json()["id"]
+
+        response = self.client.put(f"/api/v1/reviews/{review_id}",
+                                   headers=self.headers, json={"rating": "4"})
+        self.assertEqual(response.status_code, 200, response.get_json())
+        self.assertEqual(self._aggregates(), (1, 4, 4.0))
+
+    def test_invalid_rating_leaves_aggregates_alone(self):
+        review = self._review(3)
+        for rating in ("five", None, 0, 99, 4.5, True):
+            with self.subTest(rating=rating):
+                body = {"text": "ok", "place_id": self.place.id}
+                if rating is not None:
+                    body["rating"] = rating
+                response = self.client.post("/api/v1/reviews/",
+                                            headers=self.headers, json=body)
+                self.assertEqual(response.status_code, 400)
+
+                response = self.client.put(f"/api/v1/reviews/{review.id}",
+                                           headers=self.headers,
+                                           json={"rating": rating})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(self._aggregates(), (1, 3, 3.0))
+        self.assertEqual(db.session.query(Review).count(), 1)
+
+    def test_facade_rejects_invalid_rating(self):
+        with self.assertRaises(ValueError):
+            self._review("abc")
+        with self.assertRaises(ValueError):
+            facade.create_review({"text": "ok", "place_id": self.place.id,
+                                  "user_id": self.user.id})
+        self.assertEqual(self._aggregates(), (0, 0, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import time
+import unittest
+
+from sqlalchemy import insert, select
+
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.services import facade
+from app.session import is_plain_read
+from config import TestingConfig
+
+
+class TestReadReplica(unittest.TestCase):
+    """The replica is a second SQLite file that is never synchronized, so
+    where a row shows up tells which database served the read"""
+
+    response_cache = False
+
+    def setUp(self):
+        cache = self.response_cache
+        self.tmp = tempfile.TemporaryDirectory()
+        primary = os.path.join(self.tmp.name, "primary.db")
+        replica = os.path.join(self.tmp.name, "replica.db")
+
+        class ReplicaConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{primary}"
+            SQLALCHEMY_REPLICA_URIS = [f"sqlite:///{replica}"]
+            READ_YOUR_WRITES_SECONDS = 0.5
+            RESPONSE_CACHE_ENABLED = cache
+
+        self.app = create_app(ReplicaConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.replica = db.engines["replica0"]
+        db.metadata.create_all(self.replica)
+
+        facade.create_amenity({"name": "Wifi"})
+        facade.create_user({"first_name": "Jane", "last_name": "Doe",
+                            "email": "jane@example.com",
+                            "password": "secret"})
+        with self.replica.begin() as conn:
+            conn.execute(insert(Amenity.__table__).values(
+                id="replica-only", name="Sauna"))
+
+    def tearDown(self):
+        facade.user_ids_by_email.clear()
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+        self.ctx.pop()
+        self.tmp.cleanup()
+
+    def _names(self, client, headers=None):
+        response = client.get("/api/v1/amenities/", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return sorted(item["name"] for item in response.get_json())
+
+    def _token(self):
+        response = self.app.test_client().post("/api/v1/auth/login", json={
+            "email": "jane@example.com", "password": "secret"})
+        return {"Authorization":
+                f"Bearer {response.get_json()['access_token']}"}
+
+    def test_get_reads_from_replica(self):
+        self.assertEqual(self._names(self.client), ["Sauna"])
+
+    def test_writes_go_to_primary(self):
+        response = self.client.post("/api/v1/amenities/",
+                                    json={"name": "Pool"})
+        self.assertEqual(response.status_code, 201)
+        with self.replica.connect() as conn:
+            names = conn.execute(select(Amenity.name)).scalars().all()
+        self.assertEqual(names, ["Sauna"])
+        self.assertIsNotNone(db.session.get(Amenity, response.get_json()["id"]))
+
+    def test_cookie_reads_own_writes(self):
+        self.client.post("/api/v1/amenities/", json={"name": "Pool"})
+        self.assertEqual(self._names(self.client), ["Pool", "Wifi"])
+        # Another client without the cookie still reads the replica
+        self.assertEqual(self._names(self.app.test_client()), ["Sauna"])
+
+    def test_identity_reads_own_writes(self):
+        headers = self._token()
+        response = self.app.test_client().post(
+            "/api/v1/places/", headers=headers,
+            json={"title": "Loft", "price": 80,
+                  "latitude": 48.85, "longitude": 2.35})
+        self.assertEqual(response.status_code, 201)
+        # Same user from a client that never saw the cookie
+        self.assertEqual(self._names(self.app.test_client(), headers),
+                         ["Wifi"])
+        self.assertEqual(self._names(self.app.test_client()), ["Sauna"])
+
+    def test_window_expires(self):
+        self.client.post("/api/v1/amenities/", json={"name": "Pool"})
+        time.sleep(0.6)
+        self.assertEqual(self._names(self.client), ["Sauna"])
+
+    def test_failed_write_opens_no_window(self):
+        response = self.client.post("/api/v1/amenities/",
+                                    json={"name": "  "})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._names(self.client), ["Sauna"])
+
+
+class TestReplicaResponseCache(TestReadReplica):
+    """The same databases with the response cache on"""
+
+    response_cache = True
+
+    def test_writer_never_gets_a_replica_response_from_cache(self):
+        writer = self.app.test_client()
+        response = writer.post("/api/v1/amenities/", json={"name": "Pool"})
+        self.assertEqual(response.status_code, 201)
+
+        response = self.app.test_client().get("/api/v1/amenities/")
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        response = writer.get("/api/v1/amenities/")
+        self.assertNotEqual(response.headers.get("X-Cache"), "HIT")
+        self.assertEqual(sorted(item["name"] for item in response.get_json()),
+                         ["Pool", "Wifi"])
+
+    def test_replica_responses_are_not_stored(self):
+        for _ in range(2):
+            response = self.client.get("/api/v1/amenities/")
+            self.assertEqual(response.headers["X-Cache"], "MISS")
+
+
+class TestPlainRead(unittest.TestCase):
+
+    def test_locking_and_textual_statements_use_primary(self):
+        query = select(Amenity)
+        self.assertTrue(is_plain_read(query))
+        self.assertFalse(is_plain_read(query.with_for_update()))
+        self.assertFalse(is_plain_read(insert(Amenity.__table__)))
+        self.assertFalse(is_plain_read(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.user import User
+from app.services import facade
+from app.services.cache import LRUCache, response_cache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+    def test_ttl(self):
+        cache = LRUCache(2, ttl=0)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.app.config["RESPONSE_CACHE_ENABLED"] = True
+        response_cache.init_app(self.app)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        owner = User(email="owner@example.com", password="x")
+        db.session.add(owner)
+        db.session.flush()
+        self.place = Place(title="Place", price=10, owner_id=owner.id)
+        db.session.add(self.place)
+        db.session.commit()
+        self.statements = []
+        event.listen(db.engine, "before_cursor_execute", self._count)
+
+    def tearDown(self):
+        event.remove(db.engine, "before_cursor_execute", self._count)
+        response_cache.init_app(self.app)
+        response_cache.enabled = False
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def test_hit_after_miss_and_invalidated_by_facade(self):
+        first = self.client.get("/api/v1/amenities/")
+        self.assertEqual(first.headers["X-Cache"], "MISS")
+        del self.statements[:]
+        second = self.client.get("/api/v1/amenities/")
+        self.assertEqual(second.headers["X-Cache"], "HIT")
+        self.assertEqual(second.get_json(), first.get_json())
+        self.assertEqual(self.statements, [])
+
+        facade.create_amenity({"name": "WiFi"})
+        third = self.client.get("/api/v1/amenities/")
+        self.assertEqual(third.headers["X-Cache"], "MISS")
+        self.assertEqual([a["name"] for a in third.get_json()], ["WiFi"])
+        self.assertEqual(response_cache.stats()["hits"], 1)
+
+    def test_query_string_is_part_of_the_key(self):
+        self.client.get("/api/v1/places/?fields=title")
+        response = self.client.get("/api/v1/places/?fields=price")
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        self.assertEqual(set(response.get_json()[0]), {"id", "price"})
+
+    def test_cached_detail_answers_304_without_queries(self):
+        url = f"/api/v1/places/{self.place.id}"
+        etag = self.client.get(url).headers["ETag"]
+        del self.statements[:]
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.statements, [])
+
+    def test_place_update_invalidates_detail(self):
+        url = f"/api/v1/places/{self.place.id}"
+        self.client.get(url)
+        facade.update_place(self.place.id, {"title": "Renamed"})
+        response = self.client.get(url)
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        self.assertEqual(response.get_json()["title"], "Renamed")
+
+    def test_disabled(self):
+        response_cache.enabled = False
+        response = self.client.get("/api/v1/amenities/")
+        self.assertNotIn("X-Cache", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import unittest
+
+from sqlalchemy import text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateIndex
+
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.search import places_fts, reviews_fts
+from app.repositories.search_repository import (
+    _fts_ready, match_expression, search_terms, select_search
+)
+from app.services import facade
+
+
+class TestPlaceSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.owner = facade.create_user({
+            "first_name": "Jane", "last_name": "Doe",
+            "email": "jane@example.com", "password": "secret"})
+        self.cottage = self._place("Seaside cottage", "Two rooms by the sea")
+        self.loft = self._place("City loft", "A quiet cottage feel downtown")
+        self.cabin = self._place("Mountain cabin", "Wood stove and views")
+
+    def tearDown(self):
+        facade.user_ids_by_email.clear()
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _place(self, title, description):
+        return facade.create_place({
+            "title": title, "description": description, "price": 100,
+            "latitude": 10.0, "longitude": 10.0, "owner_id": self.owner.id})
+
+    def _search(self, query):
+        response = self.client.get(f"/api/v1/places/search?{query}")
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return response.get_json()
+
+    def _titles(self, query):
+        return [place["title"] for place in self._search(query)["items"]]
+
+    def test_title_match_ranks_first(self):
+        body = self._search("q=cottage")
+        self.assertEqual([place["title"] for place in body["items"]],
+                         ["Seaside cottage", "City loft"])
+        self.assertIsNone(body["next_cursor"])
+        scores = [place["score"] for place in body["items"]]
+        self.assertGreater(scores[0], scores[1])
+
+    def test_stemming_prefix_and_accents(self):
+        self.assertEqual(self._titles("q=cottages"),
+                         ["Seaside cottage", "City loft"])
+        self.assertEqual(self._titles("q=mount"), ["Mountain cabin"])
+        self.assertEqual(self._titles("q=CABIN"), ["Mountain cabin"])
+        self._place("Café in Montréal", "Near the old port")
+        self.assertEqual(self._titles("q=montreal cafe"),
+                         ["Café in Montréal"])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self._titles("q=cottage sea"), ["Seaside cottage"])
+        self.assertEqual(self._titles("q=cottage cabin"), [])
+
+    def test_operators_are_ignored(self):
+        self.assertEqual(self._titles('q="cabin"^(*'),
+                         ["Mountain cabin"])
+
+    def test_review_matches(self):
+        facade.create_review({"text": "Perfect for skiing", "rating": 5,
+                              "user_id": self.owner.id,
+                              "place_id": self.cabin.id})
+        self.assertEqual(self._titles("q=skiing"), [])
+        self.assertEqual(self._titles("q=skiing&reviews=1"),
+                         ["Mountain cabin"])
+
+    def test_pagination(self):
+        for number in range(5):
+            self._place(f"Cabin {number}", "")
+        seen = []
+        cursor = ""
+        while True:
+            body = self._search(f"q=cabin&limit=2&cursor={cursor}")
+            seen.extend(place["id"] for place in body["items"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set(seen)), 6)
+
+    def test_fields(self):
+        items = self._search("q=cabin&fields=title")["items"]
+        self.assertEqual(set(items[0]), {"id", "title", "score"})
+
+    def test_index_follows_writes(self):
+        facade.update_place(self.cabin.id, {"title": "Mountain chalet"})
+        self.assertEqual(self._titles("q=cabin"), [])
+        self.assertEqual(self._titles("q=chalet"), ["Mountain chalet"])
+
+        review = facade.create_review({
+            "text": "Lovely fireplace", "rating": 4,
+            "user_id": self.owner.id, "place_id": self.cabin.id})
+        facade.update_review(review.id, {"text": "Lovely sauna"})
+        self.assertEqual(self._titles("q=fireplace&reviews=1"), [])
+        self.assertEqual(self._titles("q=sauna&reviews=1"),
+                         ["Mountain chalet"])
+
+        facade.delete_place(self.cabin.id)
+        self.assertEqual(self._titles("q=chalet"), [])
+        self.assertEqual(db.session.query(reviews_fts).count(), 0)
+
+    def test_deleting_user_removes_documents(self):
+        facade.create_review({"text": "Great sea view", "rating": 5,
+                              "user_id": self.owner.id,
+                              "place_id": self.loft.id})
+        facade.delete_user(self.owner.id)
+        self.assertEqual(db.session.query(places_fts).count(), 0)
+        self.assertEqual(db.session.query(reviews_fts).count(), 0)
+
+    def test_bulk_create_and_rebuild(self):
+        ids, errors = facade.create_places_bulk([
+            {"title": "Tree house", "price": 40, "latitude": 1.0,
+             "longitude": 1.0}], self.owner.id)
+        self.assertEqual(errors, [])
+        self.assertEqual(self._titles("q=tree"), ["Tree house"])
+
+        db.session.execute(places_fts.delete())
+        db.session.commit()
+        self.assertEqual(facade.rebuild_search_index(), 4)
+        self.assertEqual(self._titles("q=tree"), ["Tree house"])
+
+    def test_missing_index_answers_503_until_rebuilt(self):
+        # A database created before the index, opened by a new process
+        db.session.execute(text("DROP TABLE places_fts"))
+        db.session.execute(text("DROP TABLE reviews_fts"))
+        db.session.commit()
+        _fts_ready.discard(db.engine)
+
+        response = self.client.get("/api/v1/places/search?q=cottage")
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("reindex_search.py", response.get_json()["error"])
+        self.assertEqual(facade.rebuild_search_index(), 3)
+        self.assertEqual(self._titles("q=cottage"),
+                         ["Seaside cottage", "City loft"])
+
+    def test_invalid_queries(self):
+        for query in ("", "q=", "q=%20*%22", "q=cabin&cursor=abc",
+                      "q=cabin&limit=0", "q=cabin&fields=nope"):
+            with self.subTest(query=query):
+                response = self.client.get(f"/api/v1/places/search?{query}")
+                self.assertEqual(response.status_code, 400)
+
+
+class TestSearchStatements(unittest.TestCase):
+
+    def test_match_expression(self):
+        terms = search_terms('old "town" -loft')
+        self.assertEqual(terms, ["old", "town", "loft"])
+        self.assertEqual(match_expression("sqlite", terms),
+                         '"old" "town" "loft"*')
+        self.assertEqual(match_expression("mysql", terms),
+                         "+old +town +loft*")
+
+    def test_mysql_uses_fulltext(self):
+        sql = str(select_search("mysql", "loft", 10, reviews=True).compile(
+            dialect=mysql.dialect()))
+        self.assertIn("MATCH (places.title, places.description) AGAINST",
+                      sql)
+        self.assertIn("MATCH (reviews.text) AGAINST", sql)
+        self.assertIn("IN BOOLEAN MODE", sql)
+
+        index = next(ix for ix in Place.__table__.indexes
+                     if ix.name == "ft_places_title_description")
+        ddl = str(CreateIndex(index).compile(dialect=mysql.dialect()))
+        self.assertTrue(ddl.startswith("CREATE FULLTEXT INDEX"))
+
+    def test_other_databases_are_rejected(self):
+        with self.assertRaises(NotImplementedError):
+            select_search("postgresql", "loft", 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import unittest
+
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services import facade
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        user = User(email="owner@example.com", password="x")
+        wifi = Amenity(name="WiFi")
+        db.session.add_all([user, wifi])
+        db.session.flush()
+        for i in range(250):
+            place = Place(title=f"Place {i}", price=i, latitude=1.0,
+                          longitude=2.0, owner_id=user.id)
+            place.amenities.append(wifi)
+            db.session.add(place)
+            db.session.flush()
+            db.session.add(Review(text="ok", rating=4, place_id=place.id,
+                                  user_id=user.id))
+        db.session.commit()
+        db.session.expunge_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_json_array(self):
+        response = self.client.get("/api/v1/places/?stream=1")
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, "application/json")
+        places = response.get_json()
+        self.assertEqual(len(places), 250)
+        self.assertEqual(places, self.client.get("/api/v1/places/").get_json())
+
+    def test_ndjson(self):
+        response = self.client.get(
+            "/api/v1/reviews/", headers={"Accept": "application/x-ndjson"})
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual(len(lines), 250)
+        self.assertEqual(json.loads(lines[0])["rating"], 4)
+
+    def test_fields_and_filters(self):
+        response = self.client.get(
+            "/api/v1/places/?stream=1&fields=id,title&max_price=9")
+        places = response.get_json()
+        self.assertEqual(len(places), 10)
+        self.assertEqual(set(places[0]), {"id", "title"})
+
+        response = self.client.get("/api/v1/places/?stream=1&fields=nope")
+        self.assertEqual(response.status_code, 400)
+
+    def test_empty(self):
+        response = self.client.get("/api/v1/places/?stream=1&min_price=1000")
+        self.assertEqual(response.get_json(), [])
+
+    def test_only_one_batch_in_session(self):
+        # yield_per drops each batch once it has been consumed
+        tracked = 0
+        for place in facade.stream_places(batch_size=50):
+            self.assertEqual(len(place.amenities), 1)
+            tracked = max(tracked, len(db.session.identity_map))
+        self.assertLess(tracked, 150)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.revoked_token import RevokedToken
+from app.revocation import BloomFilter, revocation_list
+from app.services import facade
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"jti-{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(f"other-{i}" in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+
+class TestLogout(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        facade.create_user({"first_name": "Jane", "last_name": "Doe",
+                            "email": "jane@example.com",
+                            "password": "secret"})
+        self.statements = []
+        event.listen(db.engine, "before_cursor_execute", self._count)
+
+    def tearDown(self):
+        event.remove(db.engine, "before_cursor_execute", self._count)
+        facade.user_ids_by_email.clear()
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _login(self):
+        response = self.client.post("/api/v1/auth/login", json={
+            "email": "jane@example.com", "password": "secret"})
+        return {"Authorization":
+                f"Bearer {response.get_json()['access_token']}"}
+
+    def test_valid_token_check_costs_no_query(self):
+        headers = self._login()
+        self.client.get("/api/v1/users/", headers=headers)
+        del self.statements[:]
+        response = self.client.get("/api/v1/users/", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any("revoked_tokens" in s for s in self.statements))
+        self.assertEqual(revocation_list.db_checks, 0)
+
+    def test_logout_revokes_token(self):
+        headers = self._login()
+        response = self.client.post("/api/v1/auth/logout", headers=headers)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get("/api/v1/users/", headers=headers)
+        self.assertEqual(response.status_code, 401)
+
+        # A fresh login still works
+        response = self.client.get("/api/v1/users/", headers=self._login())
+        self.assertEqual(response.status_code, 200)
+
+
+class TestRevocationList(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _add(self, count, expires_in, prefix="jti"):
+        expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
+        db.session.add_all(RevokedToken(jti=f"{prefix}-{i}",
+                                        expires_at=expires_at)
+                           for i in range(count))
+        db.session.commit()
+
+    def test_full_filter_is_rebuilt_larger(self):
+        revocation_list.capacity = 4
+        self._add(10, 3600)
+        revocation_list._refresh(force=True)
+        bloom = revocation_list._bloom
+        self.assertEqual(bloom.capacity, 20)
+        self.assertTrue(revocation_list.is_revoked("jti-9"))
+
+        # No longer full, so later refreshes only top it up
+        revocation_list._refresh(force=True)
+        self.assertIs(revocation_list._bloom, bloom)
+
+    def test_requests_never_prune(self):
+        self._add(3, -60, prefix="expired")
+        self._add(2, 3600)
+        revocation_list._refresh(force=True)
+        self.assertFalse(revocation_list.is_revoked("expired-0"))
+        self.assertEqual(RevokedToken.query.count(), 5)
+
+        self.assertEqual(revocation_list.prune(), 3)
+        self.assertEqual(RevokedToken.query.count(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+from app.repositories.sqlalchemy_repository import SQLAlchemyRepository
+from app.services import facade
+from app.services.cache import response_cache
+
+
+class TestUnitOfWork(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.user = User(email="owner@example.com", password="x")
+        self.wifi = Amenity(name="WiFi")
+        db.session.add_all([self.user, self.wifi])
+        db.session.commit()
+        self.commits = []
+        event.listen(db.session(), "after_commit", self.commits.append)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _place_data(self, **extra):
+        return dict(title="Place", price=10, latitude=1.0, longitude=2.0,
+                    owner_id=self.user.id, **extra)
+
+    def test_commits_once(self):
+        with facade.unit_of_work():
+            place = facade.create_place(self._place_data())
+            facade.create_amenity({"name": "Pool"})
+            facade.update_place(place.id, {"title": "Renamed"})
+            self.assertEqual(self.commits, [])
+        self.assertEqual(len(self.commits), 1)
+        self.assertEqual(Place.query.one().title, "Renamed")
+
+    def test_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with facade.unit_of_work():
+                facade.create_place(self._place_data())
+                facade.create_amenity({"name": "Pool"})
+                raise RuntimeError("boom")
+        self.assertEqual(self.commits, [])
+        self.assertEqual(Place.query.count(), 0)
+        self.assertEqual(Amenity.query.count(), 1)
+
+    def test_create_place_with_amenities_is_atomic(self):
+        place = facade.create_place(
+            self._place_data(amenities=[{"id": self.wifi.id}]))
+        self.assertEqual(len(self.commits), 1)
+        self.assertEqual([a.name for a in place.amenities], ["WiFi"])
+
+        with self.assertRaises(ValueError):
+            facade.create_place(
+                self._place_data(amenities=[self.wifi.id, "missing"]))
+        self.assertEqual(Place.query.count(), 1)
+
+    def test_cache_invalidated_after_commit(self):
+        self.app.config["RESPONSE_CACHE_ENABLED"] = True
+        response_cache.init_app(self.app)
+        generation = response_cache.generation
+        with facade.unit_of_work():
+            facade.create_amenity({"name": "Pool"})
+            self.assertEqual(response_cache.generation, generation)
+        self.assertGreater(response_cache.generation, generation)
+
+    def test_repository_flag(self):
+        repo = SQLAlchemyRepository(Amenity, auto_commit=False)
+        repo.add(Amenity(name="Pool"))
+        self.assertEqual(self.commits, [])
+        db.session.rollback()
+        self.assertEqual(Amenity.query.count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
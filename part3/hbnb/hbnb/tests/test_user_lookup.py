@@ -0,0 +1,66 @@
+import unittest
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.services import facade
+
+
+class TestUserEmailLookup(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        facade.user_ids_by_email.clear()
+        self.user = facade.create_user({
+            "first_name": "Jane", "last_name": "Doe",
+            "email": "  Jane.Doe@Example.COM ", "password": "secret"
+        })
+        self.user_id = self.user.id
+        self.statements = []
+        event.listen(db.engine, "before_cursor_execute", self._count)
+
+    def tearDown(self):
+        event.remove(db.engine, "before_cursor_execute", self._count)
+        facade.user_ids_by_email.clear()
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def test_email_is_stored_normalized(self):
+        self.assertEqual(self.user.email, "jane.doe@example.com")
+
+    def test_lookup_ignores_case(self):
+        user = facade.get_user_by_email("JANE.DOE@example.com")
+        self.assertEqual(user.id, self.user.id)
+        self.assertIsNone(facade.get_user_by_email("john@example.com"))
+
+    def test_lookup_is_one_query_and_cached(self):
+        db.session.expunge_all()
+        facade.get_user_by_email("jane.doe@example.com")
+        self.assertEqual(len(self.statements), 1)
+        self.assertEqual(
+            facade.user_ids_by_email.get("jane.doe@example.com"),
+            self.user_id)
+
+        db.session.expunge_all()
+        del self.statements[:]
+        facade.get_user_by_email("jane.doe@example.com")
+        self.assertEqual(len(self.statements), 1)
+        self.assertIn("users.id =", self.statements[0])
+
+    def test_cache_invalidated_on_delete(self):
+        facade.get_user_by_email("jane.doe@example.com")
+        self.assertTrue(facade.delete_user(self.user.id))
+        self.assertIsNone(facade.user_ids_by_email.get("jane.doe@example.com"))
+        self.assertIsNone(facade.get_user_by_email("jane.doe@example.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 // File: part4/scripts/auth.js
+import { API_BASE } from "./config.js";
 
 export function setCookie(name, value, days = 1) {
   const expires = new Date(Date.now() + days * 864e5).toUTCString();
@@ -54,6 +55,23 @@ export function requireAuth(redirect = "login.html") {
 }
 
 export function logout(redirect = "index.html") {
-  deleteCookie("token");
-  window.location.href = redirect;
+  const token = getToken();
+  const done = () => {
+    deleteCookie("token");
+    window.location.href = redirect;
+  };
+
+  if (!token) {
+    done();
+    return;
+  }
+
+  // Revoke the token server-side so a leaked copy stops working too
+  fetch(`${API_BASE}/auth/logout`, {
+    method: "POST",
+    headers: { Authorization: `Bearer ${token}` },
+    keepalive: true
+  })
+    .catch(() => {})
+    .finally(done);
 }
@@ -29,9 +29,10 @@ function checkAuthentication() {
 }
 
 /**
- * Fetch places from API with authentication token if available
+ * Fetch places from API with authentication token if available.
+ * maxPrice ("all" or a number) is applied by the server.
  */
-async function fetchPlaces() {
+async function fetchPlaces(maxPrice = "all") {
   try {
     const token = getToken();
     const headers = {
@@ -43,7 +44,12 @@ async function fetchPlaces() {
       headers["Authorization"] = `Bearer ${token}`;
     }
 
-    const res = await fetch(`${API_BASE}/places/`, { headers });
+    const params = new URLSearchParams({ fields: "id,title,price" });
+    if (maxPrice !== "all") {
+      params.set("max_price", maxPrice);
+    }
+
+    const res = await fetch(`${API_BASE}/places/?${params}`, { headers });
 
     const data = await res.json().catch(() => []);
     if (!res.ok) {
@@ -90,23 +96,7 @@ function renderPlaces(places) {
  * Filter places by price without reloading the page
  */
 function filterPlacesByPrice() {
-  const selectedPrice = priceFilter.value;
-  const placeCards = document.querySelectorAll(".place-card");
-
-  placeCards.forEach((card) => {
-    const cardPrice = parseFloat(card.dataset.price) || 0;
-
-    if (selectedPrice === "all") {
-      card.style.display = "";
-    } else {
-      const maxPrice = parseFloat(selectedPrice);
-      if (cardPrice <= maxPrice) {
-        card.style.display = "";
-      } else {
-        card.style.display = "none";
-      }
-    }
-  });
+  fetchPlaces(priceFilter.value);
 }
 
 // Event listener for price filter